@@ -2,9 +2,12 @@ import os
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from werkzeug.middleware.proxy_fix import ProxyFix
 from config import Config
+from app.replicas import RoutingSession
 
-db = SQLAlchemy()
+# Die Routing-Session lenkt Lesezugriffe öffentlicher Seiten auf Replikate (DB_REPLICA_URLS)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 
 
@@ -12,8 +15,27 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # Client-IP und Schema hinter Reverse-Proxies aus X-Forwarded-For/-Proto (TRUSTED_PROXY_HOPS)
+    hops = app.config['TRUSTED_PROXY_HOPS']
+    if hops:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+
+    # Pool-Einstellungen und Statement-Timeout aus DB_* übernehmen (vor db.init_app)
+    from app import database
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = database.engine_options(app.config)
+    # Replikate als zusätzliche Binds (replica_0, replica_1, ...)
+    from app import replicas
+    app.config['SQLALCHEMY_BINDS'] = replicas.replica_binds(app.config)
+
     # Initialisiere Extensions
     db.init_app(app)
+    # Abfragen pro Request und Pool-Zustand erfassen (Admin-Endpoint /admin/metrics/db)
+    database.init_app(app)
+    # Abfrage-Profiler (Debug-Modus, Tests): N+1-Verdacht, EXPLAIN langsamer Abfragen, assert_max_queries
+    from app import profiler
+    profiler.init_app(app)
+    # Routing auf Replikate samt Health-Checks (Zustand unter /admin/metrics/db)
+    replicas.init_app(app)
     login_manager.init_app(app)
     login_manager.login_view = 'main.login'
     login_manager.login_message_category = 'info'
@@ -21,14 +43,79 @@ def create_app(config_class=Config):
     # Flask-Login user_loader Funktion
     @login_manager.user_loader
     def load_user(user_id):
-        from app.models import User
-        # Die empfohlene Methode zur Abfrage über die ID
-        return db.session.get(User, int(user_id))
+        from app.principals import load_principal
+        # Zwischengespeicherter Principal statt einer DB-Abfrage pro Request
+        return load_principal(user_id)
+
+    # Rate-Limit für Logins (Passwort-Hashing siehe app/passwords.py)
+    from app import passwords
+    passwords.init_app(app)
+
+    # Principal-Cache und Schnellweg für anonyme Besucher ohne Cookies
+    from app import principals
+    principals.init_app(app)
 
     # Stelle sicher, dass der UPLOAD_FOLDER existiert
     if not os.path.exists(app.config['UPLOAD_FOLDER']):
         os.makedirs(app.config['UPLOAD_FOLDER'])
 
+    # Statische Assets mit Fingerprint-URLs (url_for in Templates, CLI-Befehl 'flask assets build')
+    from app import assets
+    assets.init_app(app)
+
+    # Datei-Speicher für Uploads (Route /uploads/<key>, CLI-Befehle 'flask storage gc|recount')
+    from app import storage
+    storage.init_app(app)
+
+    # Uploads in Teilen und Prüfung der Magic Bytes (Routen im Admin-Blueprint)
+    from app import uploads
+    uploads.init_app(app)
+
+    # Bild-Derivate (Template-Helfer und CLI-Befehl 'flask images backfill')
+    from app import images
+    images.init_app(app)
+
+    # Hintergrund-Jobs (CLI-Befehl 'flask worker')
+    from app import tasks
+    tasks.init_app(app)
+
+    # Seiten-Cache (wird über das Signal post_changed invalidiert)
+    from app import cache
+    cache.init_app(app)
+
+    # Fragment-Cache ({% cache %} in Templates) und Bytecode-Cache ('flask templates compile')
+    from app import fragments
+    fragments.init_app(app)
+
+    # Abgeleitete Beitragsfelder (CLI-Befehl 'flask posts backfill')
+    from app import content
+    content.init_app(app)
+
+    # Import und Export von Beiträgen in Batches (CLI-Befehle 'flask posts import|export')
+    from app import bulk
+    bulk.init_app(app)
+
+    # Volltextsuche (CLI-Befehl 'flask search reindex', Sync über post_changed)
+    from app import search
+    search.init_app(app)
+
+    # Atom- und JSON-Feed unter /feed.atom und /feed.json (Aktualisierung als Job über post_changed)
+    from app import feeds
+    feeds.init_app(app)
+
+    # Öffentliche Seiten für Reverse-Proxy/CDN: Surrogate-Keys, Purge über post_changed
+    # (CLI-Befehle 'flask edge proxy|purge')
+    from app import edge
+    edge.init_app(app)
+
+    # Schema-Verwaltung und Startdaten (CLI-Befehle 'flask schema upgrade|seed', Migrationen über 'flask db')
+    from app import schema
+    schema.init_app(app)
+
+    # Prometheus-Metriken (Latenz, DB, Templates, Uploads, Seiten-Cache) unter /metrics
+    from app import metrics
+    metrics.init_app(app)
+
     # Blueprints registrieren
     from app.blueprints.main.routes import main as main_bp
     app.register_blueprint(main_bp)
@@ -36,43 +123,4 @@ def create_app(config_class=Config):
     from app.blueprints.admin.routes import admin as admin_bp
     app.register_blueprint(admin_bp, url_prefix='/admin')
 
-    with app.app_context():
-        # Füge db.create_all() wieder hinzu, um die Datenbank zu erstellen.
-        db.create_all()
-
-        from app.models import Post, User
-
-        # Beispielbeiträge nur hinzufügen, wenn die Datenbank leer ist
-        if not Post.query.first():
-            print("Füge Beispielbeitrag hinzu...")
-            admin_user = User.query.filter_by(is_admin=True).first()
-            user_id_for_posts = admin_user.id if admin_user else None
-
-            post1 = Post(
-                title='Erster Prototypen-Update',
-                content='Heute haben wir mit dem Bau des Hauptrahmens begonnen. Es läuft gut!',
-                image_file='prototype_1.jpg',  # Hier den echten Dateinamen rein
-                user_id=user_id_for_posts
-            )
-
-            db.session.add(post1)
-            db.session.commit()
-
-        # NEU: Erstelle einen Admin-Benutzer, falls noch keiner existiert (Sichere Methode)
-        admin_init_password = os.environ.get('ADMIN_INIT_PASSWORD')
-
-        if not User.query.filter_by(is_admin=True).first():
-            if admin_init_password:
-                print("Erstelle Standart-Admin-Benutzer...")
-                admin_user = User(email='admin@nautilus.com', is_admin=True)
-                # Das Passwort wird sicher aus der Umgebungsvariable geladen
-                admin_user.set_password(admin_init_password)
-                db.session.add(admin_user)
-                db.session.commit()
-                print("Standart-Admin-Benutzer hinzugefügt: admin@nautilus.com")
-                print("BITTE ÄNDERE DAS PASSWORT IM NÄCHSTEN SCHRITT!")
-            else:
-                # Wichtiger Hinweis bei fehlendem Passwort
-                print("!!! SICHERHEITS-WARNUNG: ADMIN_INIT_PASSWORD fehlt in .env. Es wurde kein Admin erstellt. !!!")
-
     return app
\ No newline at end of file
@@ -0,0 +1,193 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from urllib.parse import quote
+import click
+from flask import current_app, request, send_file, abort, url_for
+from flask.cli import AppGroup
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # Brotli ist optional, gzip gibt es immer
+    brotli = None
+
+assets_cli = AppGroup('assets', help='Statische Assets vorbereiten.')
+
+# Textdateien, die beim Build vorkomprimiert werden
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.svg', '.json', '.txt', '.map', '.html'}
+# Vorkomprimierte Varianten in der Reihenfolge der Präferenz: (Dateiendung, Content-Encoding)
+PRECOMPRESSED = (('.br', 'br'), ('.gz', 'gzip'))
+# Unterordner von static/, die keine Build-Assets enthalten
+EXCLUDED_DIRS = {'uploads'}
+# Länge des Fingerprints in der URL (Hex-Zeichen des SHA-256)
+FINGERPRINT_LENGTH = 12
+
+
+class AssetManifest:
+    """Fingerprints (Inhalts-Hash) der Dateien in static/, zwischengespeichert pro Datei.
+
+    Ein Eintrag wird nur neu berechnet, wenn sich Änderungszeit oder Größe der
+    Datei geändert haben; pro url_for() bleibt es damit bei einem stat().
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._entries = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def fingerprint(self, filename):
+        path = safe_join(self.root, filename)
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        entry = self._entries.get(filename)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b''):
+                digest.update(chunk)
+        fingerprint = digest.hexdigest()[:FINGERPRINT_LENGTH]
+        with self._lock:
+            self._entries[filename] = (signature, fingerprint)
+        return fingerprint
+
+    def build_assets(self):
+        """Relative Pfade aller Build-Assets (ohne Uploads und vorkomprimierte Varianten)."""
+        for folder, dirs, files in os.walk(self.root):
+            if folder == self.root:
+                dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+            for name in sorted(files):
+                if name.endswith(tuple(ext for ext, _ in PRECOMPRESSED)):
+                    continue
+                yield os.path.relpath(os.path.join(folder, name), self.root).replace(os.sep, '/')
+
+    def version(self, reload=False):
+        """Gemeinsamer Hash aller Build-Assets; fließt in ETags und Cache-Schlüssel der Seiten ein.
+
+        Assets ändern sich nur mit einem Deploy (Neustart), daher wird der Wert
+        einmal pro Prozess berechnet; mit reload=True (Debug-Modus) bei jedem Aufruf.
+        """
+        if self._version is None or reload:
+            raw = '|'.join(f'{name}:{self.fingerprint(name)}' for name in sorted(self.build_assets()))
+            self._version = hashlib.sha1(raw.encode('utf-8')).hexdigest()[:FINGERPRINT_LENGTH]
+        return self._version
+
+
+def get_manifest():
+    return current_app.extensions['assets']
+
+
+def assets_version():
+    return get_manifest().version(reload=current_app.debug)
+
+
+def asset_url_for(endpoint, **values):
+    """Ersetzt url_for in den Templates: url_for('static', ...) wird zur Fingerprint-URL."""
+    if endpoint == 'static' and 'filename' in values:
+        fingerprint = get_manifest().fingerprint(values['filename'])
+        if fingerprint is not None:
+            return url_for('assets', fingerprint=fingerprint, **values)
+    return url_for(endpoint, **values)
+
+
+# ----------------- Auslieferung -----------------
+
+def _precompressed(path):
+    """Passende vorkomprimierte Variante für den Request, sofern aktuell: (Pfad, Encoding) oder (None, None)."""
+    accepted = request.accept_encodings
+    for ext, encoding in PRECOMPRESSED:
+        variant = path + ext
+        if accepted[encoding] and os.path.isfile(variant) and os.path.getmtime(variant) >= os.path.getmtime(path):
+            return variant, encoding
+    return None, None
+
+
+def send_asset(directory, filename, immutable, accel_prefix=None):
+    """Liefert eine Datei mit passenden Cache-Headern aus.
+
+    Mit accel_prefix übernimmt nginx die Bytes (X-Accel-Redirect auf eine
+    interne Location); mit USE_X_SENDFILE setzt send_file den X-Sendfile-Header.
+    Sonst werden vorkomprimierte .br/.gz-Varianten bevorzugt.
+    """
+    path = safe_join(directory, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    max_age = current_app.config['ASSET_MAX_AGE'] if immutable else 0
+
+    if accel_prefix:
+        response = current_app.response_class(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + quote(filename)
+    else:
+        variant, encoding = _precompressed(path)
+        response = send_file(variant or path, mimetype=mimetype, conditional=True, max_age=max_age)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if os.path.splitext(filename)[1] in COMPRESSIBLE_EXTENSIONS:
+            response.vary.add('Accept-Encoding')
+
+    if immutable:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+
+def serve_asset(fingerprint, filename):
+    current = get_manifest().fingerprint(filename)
+    if current is None:
+        abort(404)
+    # Veralteter Fingerprint (z.B. aus einer älteren, noch gecachten Seite): aktuelle Datei, aber nicht dauerhaft cachen
+    return send_asset(current_app.static_folder, filename, immutable=current == fingerprint,
+                      accel_prefix=current_app.config['X_ACCEL_STATIC_PREFIX'])
+
+
+# ----------------- Build -----------------
+
+def compress_file(path):
+    """Schreibt .gz (und .br, falls verfügbar) neben die Datei, sofern die Variante kleiner ist."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data, quality=11)
+    written = []
+    for ext, compressed in variants.items():
+        if len(compressed) < len(data):
+            with open(path + ext, 'wb') as f:
+                f.write(compressed)
+            written.append(path + ext)
+    return written
+
+
+@assets_cli.command('build')
+def build_command():
+    """Komprimiert Text-Assets vor (gzip/brotli) und zeigt die Fingerprints an."""
+    manifest = get_manifest()
+    if brotli is None:
+        click.echo("Hinweis: Paket 'brotli' nicht installiert, es wird nur gzip erzeugt.")
+    for name in manifest.build_assets():
+        compressed = ''
+        if os.path.splitext(name)[1] in COMPRESSIBLE_EXTENSIONS:
+            written = compress_file(os.path.join(manifest.root, name))
+            compressed = ' (' + ', '.join(os.path.splitext(path)[1] for path in written) + ')' if written else ''
+        click.echo(f'{manifest.fingerprint(name)}  {name}{compressed}')
+
+
+def init_app(app):
+    app.extensions['assets'] = AssetManifest(app.static_folder)
+    app.add_url_rule('/assets/<fingerprint>/<path:filename>', 'assets', serve_asset)
+    app.jinja_env.globals['url_for'] = asset_url_for
+    app.cli.add_command(assets_cli)
@@ -1,7 +1,23 @@
+import os
 from flask_wtf import FlaskForm
 from flask_wtf.file import FileField, FileAllowed, FileRequired
-from wtforms import StringField, TextAreaField, SubmitField
-from wtforms.validators import DataRequired, Length, ValidationError
+from wtforms import StringField, TextAreaField, SubmitField, HiddenField
+from wtforms.validators import DataRequired, Length, Regexp, ValidationError
+from app.uploads import InvalidUpload, SNIFF_BYTES, check_image
+
+
+def image_content(form, field):
+    # Prüft die Magic Bytes am Dateianfang, ohne die ganze Datei zu lesen
+    if not field.data:
+        return
+    stream = field.data.stream
+    head = stream.read(SNIFF_BYTES)
+    stream.seek(0)
+    try:
+        check_image(head, os.path.splitext(field.data.filename)[1])
+    except InvalidUpload as e:
+        raise ValidationError(str(e))
+
 
 class PostForm(FlaskForm):
     # Titel des Beitrags: Muss vorhanden sein und zwischen 2 und 100 Zeichen lang
@@ -20,7 +36,12 @@ class PostForm(FlaskForm):
     # Da dies ein Blogbeitrag ist, ist das Bild nicht zwingend erforderlich.
     image = FileField('Beitragsbild (Optional)',
                       validators=[FileAllowed(['jpg', 'jpeg', 'png', 'gif'],
-                                              'Nur Bilder (JPG, PNG, GIF) sind erlaubt.')])
+                                              'Nur Bilder (JPG, PNG, GIF) sind erlaubt.'),
+                                  image_content])
+
+    # Schlüssel eines bereits in Teilen hochgeladenen Bildes (POST /admin/uploads, siehe upload.js)
+    image_key = HiddenField(validators=[Regexp(r'^([0-9a-f]{64}\.(jpg|jpeg|png|gif))?$',
+                                               message='Ungültiger Bild-Schlüssel.')])
 
     # Button zum Absenden des Formulars
     submit = SubmitField('Speichern')
\ No newline at end of file
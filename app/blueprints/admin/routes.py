@@ -1,15 +1,29 @@
 import os
-from uuid import uuid4
-from flask import Blueprint, render_template, redirect, url_for, flash, request, abort, current_app
+from flask import (Blueprint, render_template, redirect, url_for, flash, request, abort, current_app, jsonify,
+                   Response, stream_with_context)
 from flask_login import login_required, current_user
 from app import db  # Stelle sicher, dass db importiert wird
 from app.models import Post
+from app.tasks import enqueue
+from app.signals import post_changed
+from app.queries import post_rows, get_post_or_404
+from app.models import Upload
+from app.storage import acquire, release, upload_url
+from app.uploads import (store_image, get_upload_sessions, InvalidUpload, UploadBusy, UploadOffsetMismatch,
+                         UploadTooLarge)
+from app.database import snapshot as db_snapshot
+from app.images import image_fields
+from app.bulk import FORMATS, export_posts, format_for_mimetype, import_stream
 from app.blueprints.admin.forms import PostForm  # Angenommen, du hast ein PostForm im Admin-Blueprint
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
 
 
 admin = Blueprint('admin', __name__)
 
+# Anzahl der Beiträge pro Seite im Dashboard (begrenzt Speicher und Render-Zeit)
+ADMIN_POSTS_PER_PAGE = 50
+
 
 # --- Dekorator zur Überprüfung der Admin-Rolle (Zugangskontrolle) ---
 
@@ -31,12 +45,24 @@ def save_picture(form_picture):
     if not form_picture.filename.lower().endswith(tuple(current_app.config['ALLOWED_EXTENSIONS'])):
         return None
 
-    random_hex = str(uuid4())
     _, f_ext = os.path.splitext(form_picture.filename)
-    picture_fn = random_hex + f_ext
-    upload_path = os.path.join(current_app.root_path, 'static', 'uploads', picture_fn)
-    form_picture.save(upload_path)
-    return picture_fn
+    # Inhaltsadressiert speichern (SHA-256): dasselbe Foto liegt nur einmal im Speicher.
+    # Der Stream wird blockweise gelesen; die Magic Bytes prüft schon der erste Block.
+    return store_image(form_picture.stream, f_ext)
+
+
+def submitted_image(form):
+    """Schlüssel des neuen Beitragsbildes oder None.
+
+    Entweder wurde das Bild vorab in Teilen hochgeladen (image_key) oder es
+    kommt klassisch als Datei im Formular mit.
+    """
+    if form.image_key.data:
+        # Nur Schlüssel, die über store() angelegt wurden
+        return form.image_key.data if db.session.get(Upload, form.image_key.data) else None
+    if form.image.data:
+        return save_picture(form.image.data)
+    return None
 
 
 # ----------------- CRUD-Funktionalität -----------------
@@ -45,8 +71,12 @@ def save_picture(form_picture):
 @admin.route('/dashboard')
 @admin_required
 def dashboard():
-    posts = Post.query.order_by(Post.created_at.desc()).all()
-    # Eine einfache Liste im Admin-Bereich
+    # Eine einfache Liste im Admin-Bereich, seitenweise per Keyset-Paginierung
+    posts = post_rows(
+        per_page=ADMIN_POSTS_PER_PAGE,
+        after=request.args.get('after'),
+        before=request.args.get('before')
+    )
     return render_template('admin/dashboard.html', title='Admin Dashboard', posts=posts)
 
 
@@ -57,14 +87,15 @@ def new_post():
     # NEU: Das Formular musst du noch erstellen (app/blueprints/admin/forms.py)
     form = PostForm()
     if form.validate_on_submit():
-        image_file_name = 'default.jpg'
-        if form.image.data:
-            image_file_name = save_picture(form.image.data)
+        image_file_name = submitted_image(form) or 'default.jpg'
+        # Abmessungen, Farbe und Platzhalter gleich beim Speichern, nicht erst im Job
+        metadata = image_fields(image_file_name) if image_file_name != 'default.jpg' else {}
 
         post = Post(title=form.title.data,
                     content=form.content.data,
                     image_file=image_file_name,
-                    user_id=current_user.id
+                    user_id=current_user.id,
+                    **metadata
                     )
         # Hinzufügen der User-Beziehung (optional, basierend auf deinem Datenmodell) ERL
         # Wenn Post eine 'user_id' hätte, müsste diese hier gesetzt werden. ERL
@@ -72,7 +103,14 @@ def new_post():
         # keine user_id hat, lassen wir das hier weg und nehmen an, dass es nur *einen* Admin gibt.
 
         db.session.add(post)
+        if image_file_name and image_file_name != 'default.jpg':
+            acquire(image_file_name)
         db.session.commit()
+        if image_file_name and image_file_name != 'default.jpg':
+            # Derivate erzeugt der Job-Worker, der Request kehrt sofort zurück
+            enqueue('process_image', filename=image_file_name)
+        # Seiten-Cache (und alle weiteren Abonnenten) über die Änderung informieren
+        post_changed.send(current_app._get_current_object(), post_id=post.id, action='created')
         flash('Dein Beitrag wurde erfolgreich erstellt!', 'success')
         return redirect(url_for('admin.dashboard'))
     return render_template('admin/create_post.html', title='Neuer Beitrag', form=form, legend='Neuer Beitrag')
@@ -82,23 +120,33 @@ def new_post():
 @admin.route('/post/<int:post_id>/update', methods=['GET', 'POST'])
 @admin_required
 def update_post(post_id):
-    post = db.get_or_404(Post, post_id)
+    post = get_post_or_404(post_id)
     form = PostForm()
 
     if form.validate_on_submit():
-        if form.image.data:
-            # Altes Bild löschen, falls es nicht default.jpg ist
-            if post.image_file != 'default.jpg':
-                old_picture_path = os.path.join(current_app.root_path, 'static', 'uploads', post.image_file)
-                if os.path.exists(old_picture_path):
-                    os.remove(old_picture_path)
-
-            post.image_file = save_picture(form.image.data)
+        old_image_file = None
+        new_image_file = submitted_image(form)
+        if new_image_file:
+            # Altes Bild freigeben, falls es nicht default.jpg ist (Löschen nach dem Commit, wenn unbenutzt)
+            if post.image_file and post.image_file != 'default.jpg':
+                old_image_file = post.image_file
+                release(old_image_file)
+            post.image_file = new_image_file
+            # Bis der Job process_image durch ist, zeigt der Beitrag das Original
+            post.derivatives_ready = False
+            for name, value in image_fields(new_image_file).items():
+                setattr(post, name, value)
+            acquire(new_image_file)
 
         post.title = form.title.data
         post.content = form.content.data
 
         db.session.commit()
+        if new_image_file:
+            enqueue('process_image', filename=new_image_file)
+        if old_image_file:
+            enqueue('delete_upload', filename=old_image_file)
+        post_changed.send(current_app._get_current_object(), post_id=post.id, action='updated')
         flash('Dein Beitrag wurde erfolgreich aktualisiert!', 'success')
         return redirect(url_for('admin.dashboard'))
 
@@ -117,13 +165,144 @@ def delete_post(post_id):
     # Die Delete-Route sollte idealerweise nur POST-Anfragen akzeptieren (Schutz vor CSRF)
     post = db.get_or_404(Post, post_id)
 
-    # Bild-Datei löschen, falls es nicht default.jpg ist
-    if post.image_file != 'default.jpg':
-        picture_path = os.path.join(current_app.root_path, 'static', 'uploads', post.image_file)
-        if os.path.exists(picture_path):
-            os.remove(picture_path)
-
+    image_file = post.image_file
     db.session.delete(post)
+    if image_file and image_file != 'default.jpg':
+        release(image_file)
     db.session.commit()
+
+    # Bild-Datei im Hintergrund löschen, falls kein anderer Beitrag sie noch verwendet
+    if image_file and image_file != 'default.jpg':
+        enqueue('delete_upload', filename=image_file)
+    post_changed.send(current_app._get_current_object(), post_id=post_id, action='deleted')
     flash('Der Beitrag wurde unwiderruflich gelöscht!', 'success')
-    return redirect(url_for('admin.dashboard'))
\ No newline at end of file
+    return redirect(url_for('admin.dashboard'))
+
+# ----------------- Uploads in Teilen (fortsetzbar) -----------------
+# Ablauf (siehe static/js/upload.js): POST /uploads legt den Upload an, danach
+# PUT /uploads/<id> mit Header Upload-Offset je Teil; nach einem Abbruch liefert
+# GET /uploads/<id> den Stand. Der letzte Teil gibt den Schlüssel für image_key zurück.
+
+def _own_upload(upload_id):
+    meta = get_upload_sessions().get(upload_id)
+    if meta is None or meta['owner_id'] != current_user.id:
+        abort(404)
+    return meta
+
+
+@admin.route('/uploads', methods=['POST'])
+@admin_required
+def create_upload():
+    # Nur JSON: ein fremdes Formular kann diesen Content-Type nicht ohne CORS-Preflight senden (CSRF-Schutz)
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        abort(400)
+    try:
+        upload_id = get_upload_sessions().create(str(data.get('filename', '')), int(data.get('size', 0)),
+                                                 current_user.id)
+    except InvalidUpload as e:
+        return jsonify(error=str(e)), 400
+    except (TypeError, ValueError):
+        abort(400)
+    except UploadTooLarge:
+        return jsonify(error='Die Datei ist zu groß.'), 413
+    response = jsonify(id=upload_id, offset=0, chunk_size=current_app.config['UPLOAD_SESSION_CHUNK'])
+    response.status_code = 201
+    response.headers['Location'] = url_for('admin.upload_status', upload_id=upload_id)
+    return response
+
+
+@admin.route('/uploads/<upload_id>', methods=['GET'])
+@admin_required
+def upload_status(upload_id):
+    meta = _own_upload(upload_id)
+    return jsonify(offset=meta['offset'], size=meta['size'])
+
+
+@admin.route('/uploads/<upload_id>', methods=['PUT'])
+@admin_required
+def upload_chunk(upload_id):
+    meta = _own_upload(upload_id)
+    try:
+        offset = int(request.headers.get('Upload-Offset', ''))
+    except ValueError:
+        abort(400)
+
+    sessions = get_upload_sessions()
+    try:
+        # Der Body wird direkt aus dem WSGI-Stream gelesen, nie komplett im Speicher gehalten
+        offset = sessions.append(upload_id, offset, request.stream, current_app.config['UPLOAD_CHUNK_SIZE'])
+    except UploadBusy as e:
+        return jsonify(error='Ein anderer Teil wird gerade übertragen.', offset=e.offset), 409
+    except UploadOffsetMismatch as e:
+        return jsonify(error='Falscher Offset.', offset=e.offset), 409
+    except InvalidUpload as e:
+        sessions.discard(upload_id)
+        return jsonify(error=str(e)), 400
+    except UploadTooLarge:
+        sessions.discard(upload_id)
+        return jsonify(error='Die Datei ist zu groß.'), 413
+
+    result = {'offset': offset, 'size': meta['size']}
+    if offset == meta['size']:
+        key = sessions.finish(upload_id)
+        # Upload-Zeile sichern; ohne Beitrag räumt 'flask storage gc' die Datei nach der Schonfrist auf
+        db.session.commit()
+        result.update(key=key, url=upload_url(key))
+    return jsonify(result)
+
+
+@admin.route('/uploads/<upload_id>', methods=['DELETE'])
+@admin_required
+def cancel_upload(upload_id):
+    _own_upload(upload_id)
+    get_upload_sessions().discard(upload_id)
+    return '', 204
+
+
+# ----------------- Import und Export -----------------
+
+@admin.route('/posts/import', methods=['POST'])
+@admin_required
+def import_posts():
+    # Rohdaten im Body, erkannt am Content-Type; ein fremdes Formular kann diese Typen nicht senden (CSRF-Schutz)
+    fmt = format_for_mimetype(request.mimetype)
+    if fmt is None:
+        return jsonify(error='Erwartet wird ' + ', '.join(FORMATS.values()) + '.'), 415
+    # Archive mit Bildern dürfen größer sein als normale Uploads
+    request.max_content_length = current_app.config['BULK_IMPORT_MAX_SIZE']
+    result = import_stream(request.stream, fmt, user_id=current_user.id)
+    return jsonify(result)
+
+
+@admin.route('/posts/export')
+@admin_required
+def export_posts_download():
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in FORMATS:
+        abort(400)
+    # Wird beim Senden erzeugt; der Speicherbedarf hängt nicht von der Zahl der Beiträge ab
+    response = Response(stream_with_context(export_posts(fmt)), mimetype=FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename=posts.{fmt}'
+    response.cache_control.no_store = True
+    return response
+
+
+@admin.errorhandler(RequestEntityTooLarge)
+def request_too_large(error):
+    limit = request.max_content_length // (1024 * 1024)
+    if request.endpoint in ('admin.new_post', 'admin.update_post'):
+        flash(f'Die Datei ist zu groß (maximal {limit} MB).', 'danger')
+        return redirect(request.url)
+    return jsonify(error=f'Anfrage zu groß (maximal {limit} MB).'), 413
+
+
+# ----------------- Betrieb -----------------
+
+# --- Datenbank-Kennzahlen: Pool-Zustand und Abfragen pro Endpoint (nur dieser Prozess) ---
+@admin.route('/metrics/db')
+@admin_required
+def db_metrics():
+    response = jsonify(db_snapshot())
+    response.cache_control.no_store = True
+    return response
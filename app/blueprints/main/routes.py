@@ -1,43 +1,87 @@
 import os
-from flask import Blueprint, render_template, current_app, redirect, url_for, flash, request
+from flask import Blueprint, render_template, current_app, redirect, url_for, flash, request, abort, make_response, jsonify
 from flask_login import login_user, logout_user, login_required, current_user
 from app import db  # Stelle sicher, dass db importiert wird
 from app.models import Post, User
+from app.cache import cached_page
+from app.conditional import conditional, make_etag
+from app.edge import make_public, public_page
+from app.pagination import keyset_select, decode_cursor
+from app.queries import post_cards, get_post_or_404
+from app.search import search_posts
+from app.passwords import (HashingOverloaded, check_password_bounded, get_login_limiter, hash_password_bounded,
+                           needs_rehash)
 from app.blueprints.main.forms import LoginForm  # Angenommen, du hast ein LoginForm im Main-Blueprint
 
 main = Blueprint('main', __name__)
 
 
-# --- Hilfsfunktion für den Admin-Check (für die Übersicht) ---
-# Obwohl die Admin-Funktionalität in admin.py ist, ist dieser Check
-# nützlich, falls wir den Edit/Delete-Button auf der Hauptseite anzeigen wollen.
-def is_admin_check():
-    return current_user.is_authenticated and current_user.is_admin
+# Anzahl der Beiträge pro Seite auf der Übersicht
+POSTS_PER_PAGE = 5
+
+
+# --- Validatoren für bedingte Anfragen (ETag / Last-Modified) ---
+
+def index_validators():
+    # Eine einzige Aggregat-Abfrage über die aktuelle Seite inkl. der Vorschau-Zeile,
+    # die über "Ältere Beiträge" entscheidet (nutzt den Index auf created_at, id).
+    after, before = decode_cursor(request.args.get('after')), decode_cursor(request.args.get('before'))
+    page_posts = keyset_select(db.select(Post.id, Post.updated_at), after=after, before=before,
+                               limit=POSTS_PER_PAGE + 1).subquery()
+    row = db.session.execute(
+        db.select(db.func.max(page_posts.c.updated_at),
+                  db.func.count(page_posts.c.id), db.func.sum(page_posts.c.id))
+    ).one()
+    return make_etag('index', *row), row[0]
+
+
+def post_validators(post_id):
+    updated_at = db.session.execute(
+        db.select(Post.updated_at).where(Post.id == post_id)
+    ).scalar_one_or_none()
+    if updated_at is None:
+        abort(404)
+    return make_etag('post', post_id, updated_at), updated_at
 
 
 # --- Hauptseite / Übersicht (Read: Alle Beiträge anzeigen) ---
+# Öffentliche Seiten (public_page) sind für alle Besucher gleich und dürfen von
+# Reverse-Proxy/CDN gespeichert werden; Navigation und Meldungen kommen über /fragments/user.
 @main.route('/')
 @main.route('/home')
+@public_page('posts')
+@cached_page
+@conditional(index_validators)
 def index():
-    # Beiträge paginiert anzeigen, z.B. 5 Beiträge pro Seite
-    page = request.args.get('page', 1, type=int)
-    posts = db.paginate(
-        db.select(Post).order_by(Post.created_at.desc()),
-        page=page,
-        per_page=5,
-        error_out=False
+    # Beiträge paginiert anzeigen (Keyset-Paginierung über ?after=/?before=).
+    # Nur die leichten Spalten als PostCard laden, die große content-Spalte bleibt in der DB.
+    posts = post_cards(
+        per_page=POSTS_PER_PAGE,
+        after=request.args.get('after'),
+        before=request.args.get('before')
     )
-    # is_admin_check wird im Template verwendet, um z.B. das Admin-Dashboard zu verlinken
-    return render_template('main/index.html', title='Aktuelle Projekte', posts=posts, is_admin=is_admin_check())
+    return render_template('main/index.html', title='Aktuelle Projekte', posts=posts)
 
 
 # --- Detailansicht eines einzelnen Beitrags (Read: Einzeln anzeigen) ---
 @main.route('/post/<int:post_id>')
+@public_page('post-{post_id}')
+@cached_page
+@conditional(post_validators)
 def post_detail(post_id):
-    post = db.get_or_404(Post, post_id)
+    post = get_post_or_404(post_id)
     return render_template('main/post_detail.html', title=post.title, post=post)
 
 
+# --- Volltextsuche über Titel und Inhalt ---
+@main.route('/search')
+@public_page('posts')
+def search():
+    query = request.args.get('q', '').strip()[:200]
+    results = search_posts(query) if query else []
+    return render_template('main/search.html', title='Suche', query=query, results=results)
+
+
 # --- Login-Route (Sicherheit: Authentifizierung) ---
 @main.route('/login', methods=['GET', 'POST'])
 def login():
@@ -49,8 +93,33 @@ def login():
     form = LoginForm()
 
     if form.validate_on_submit():
+        # Rate-Limit pro IP, bevor Rechenzeit für den Passwort-Hash anfällt
+        retry_after = get_login_limiter().hit(request.remote_addr)
+        if retry_after:
+            flash('Zu viele Anmeldeversuche. Bitte versuche es später erneut.', 'danger')
+            response = make_response(render_template('main/login.html', title='Admin Login', form=form), 429)
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+
         user = User.query.filter_by(email=form.email.data).first()
-        if user and user.check_password(form.password.data):
+        try:
+            # Die Prüfung läuft im begrenzten Hash-Executor statt im Request-Thread
+            valid = user is not None and check_password_bounded(user, form.password.data)
+        except HashingOverloaded:
+            flash('Der Server ist gerade ausgelastet. Bitte versuche es gleich noch einmal.', 'warning')
+            response = make_response(render_template('main/login.html', title='Admin Login', form=form), 503)
+            response.headers['Retry-After'] = '5'
+            return response
+
+        if valid:
+            if needs_rehash(user.password_hash):
+                # Veralteten Hash auf das konfigurierte Verfahren umstellen, solange das Passwort vorliegt.
+                # Ebenfalls im begrenzten Hash-Executor; bei Überlast beim nächsten Login
+                try:
+                    user.password_hash = hash_password_bounded(form.password.data)
+                    db.session.commit()
+                except HashingOverloaded:
+                    pass
             login_user(user, remember=form.remember_me.data)
             next_page = request.args.get('next')
             # Weiterleitung zur Admin-Seite, falls Login erfolgreich war
@@ -77,5 +146,22 @@ def logout():
 
 # --- About-Route ---
 @main.route('/about')
+@public_page()
 def about():
-    return render_template('main/about.html', title='Über das Projekt')
\ No newline at end of file
+    return render_template('main/about.html', title='Über das Projekt')
+
+
+# --- Benutzerabhängige Teile der öffentlichen Seiten (lädt static/js/user_fragment.js) ---
+@main.route('/fragments/user')
+def user_fragment():
+    config = current_app.config
+    if config['SESSION_COOKIE_NAME'] not in request.cookies and config['REMEMBER_COOKIE_NAME'] not in request.cookies:
+        # Ohne Cookies ist niemand angemeldet und es gibt keine Meldungen: für alle anonymen Besucher gleich
+        response = make_public(current_app.response_class(status=204))
+    else:
+        response = jsonify(nav=render_template('partials/user_nav.html', user=current_user),
+                           flashes=render_template('partials/flashes.html'))
+        response.cache_control.private = True
+        response.cache_control.no_store = True
+    response.vary.add('Cookie')
+    return response
\ No newline at end of file
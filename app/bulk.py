@@ -0,0 +1,452 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import click
+from flask import current_app
+from app import db
+from app.content import derived_fields, posts_cli
+from app.images import METADATA_FIELDS, image_metadata
+from app.models import Post, Upload, User
+from app.signals import posts_imported
+from app.storage import get_storage
+from app.uploads import InvalidUpload, SNIFF_BYTES, check_image
+
+# Formate für Import und Export: Name -> MIME-Typ
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'tar': 'application/x-tar',
+    'tar.gz': 'application/gzip',
+    'zip': 'application/zip',
+}
+FILE_SUFFIXES = {'.ndjson': 'ndjson', '.jsonl': 'ndjson', '.tar': 'tar', '.tar.gz': 'tar.gz', '.tgz': 'tar.gz',
+                 '.zip': 'zip'}
+
+# Aufbau der Archive: Bilder eines Batches stehen vor der NDJSON-Datei, die auf sie verweist,
+# damit auch ein tar-Strom ohne Zurückspulen gelesen werden kann
+IMAGE_DIR = 'images/'
+POSTS_MEMBER = 'posts/{:06d}.ndjson'
+
+# Höchstens so viele Fehlermeldungen werden gesammelt und zurückgegeben
+MAX_ERRORS = 50
+
+
+def format_for_filename(filename):
+    name = filename.lower()
+    for suffix, fmt in sorted(FILE_SUFFIXES.items(), key=lambda item: -len(item[0])):
+        if name.endswith(suffix):
+            return fmt
+    return None
+
+
+def format_for_mimetype(mimetype):
+    return next((fmt for fmt, value in FORMATS.items() if value == mimetype), None)
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def _parse_datetime(value):
+    if not isinstance(value, str):
+        raise ValueError(f'Ungültiges Datum: {value!r}')
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _isoformat(value):
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
+
+
+# ----------------- Import -----------------
+
+def _stage_image(app, storage, temp_path, ext):
+    """Prüft, hasht und speichert ein Bild (läuft im Threadpool). Gibt (Schlüssel, Größe, Metadaten) zurück."""
+    try:
+        # Für ALLOWED_EXTENSIONS in check_image() und den Logger in image_metadata()
+        with app.app_context():
+            with open(temp_path, 'rb') as f:
+                check_image(f.read(SNIFF_BYTES), ext)
+                f.seek(0)
+                digest = hashlib.sha256()
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+                size = f.tell()
+            metadata = image_metadata(temp_path)
+        key = digest.hexdigest() + ext.lower()
+        if not storage.exists(key):
+            storage.put(key, temp_path)
+        return key, size, metadata
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+class Importer:
+    """Nimmt Bilder und Beitragsdatensätze entgegen und schreibt sie in Batches.
+
+    Bilder werden beim Einlesen nur auf die Platte kopiert; Prüfung der Magic
+    Bytes, Hash und Ablage im Datei-Speicher laufen parallel im Threadpool.
+    Beiträge werden gesammelt und je BULK_BATCH_SIZE mit einem Bulk-INSERT und
+    einem Commit geschrieben; ungültige Datensätze werden übersprungen.
+    """
+
+    def __init__(self, user_id=None, batch_size=None, workers=None):
+        config = current_app.config
+        self.app = current_app._get_current_object()
+        self.storage = get_storage()
+        self.user_id = user_id
+        self.batch_size = batch_size or config['BULK_BATCH_SIZE']
+        self.pool = ThreadPoolExecutor(max_workers=workers or config['BULK_IMAGE_WORKERS'],
+                                       thread_name_prefix='bulk-image')
+        self.images = {}  # Name im Archiv -> Future mit (Schlüssel, Größe)
+        self.batch = []
+        self.imported = 0
+        self.skipped = 0
+        self.errors = []
+
+    def fail(self, where, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(f'{where}: {message}')
+
+    def add_image(self, name, fileobj):
+        ext = os.path.splitext(name)[1]
+        fd, temp_path = tempfile.mkstemp(dir=self.storage.temp_dir(), suffix='.part')
+        with os.fdopen(fd, 'wb') as out:
+            shutil.copyfileobj(fileobj, out, current_app.config['UPLOAD_CHUNK_SIZE'])
+        self.images[name] = self.pool.submit(_stage_image, self.app, self.storage, temp_path, ext)
+
+    def add_ndjson(self, lines, source):
+        for lineno, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            where = f'{source}:{lineno}'
+            try:
+                record = json.loads(line)
+                row = self._row(record)
+            except ValueError as e:
+                self.fail(where, str(e) if not isinstance(e, json.JSONDecodeError) else 'Ungültiges JSON.')
+                continue
+            self.batch.append((where, row, record.get('image')))
+            if len(self.batch) >= self.batch_size:
+                self.flush()
+
+    def _row(self, record):
+        if not isinstance(record, dict):
+            raise ValueError('Kein JSON-Objekt.')
+        title, content = record.get('title'), record.get('content')
+        if not isinstance(title, str) or not 2 <= len(title) <= 100:
+            raise ValueError('Titel fehlt oder ist nicht 2 bis 100 Zeichen lang.')
+        if not isinstance(content, str) or not content.strip():
+            raise ValueError('Inhalt fehlt.')
+        for field in ('image', 'image_file'):
+            if record.get(field) is not None and not isinstance(record[field], str):
+                raise ValueError(f'{field} muss ein Dateiname sein.')
+        created_at = _parse_datetime(record['created_at']) if record.get('created_at') else _utcnow()
+        updated_at = _parse_datetime(record['updated_at']) if record.get('updated_at') else created_at
+        return {'title': title, 'content': content, 'user_id': self.user_id,
+                'image_file': record.get('image_file') or 'default.jpg',
+                'created_at': created_at, 'updated_at': updated_at, **derived_fields(content),
+                **dict.fromkeys(METADATA_FIELDS), 'derivatives_ready': False}
+
+    def _resolve_images(self):
+        """Setzt image_file der gesammelten Zeilen; gibt (Zeilen, Anzahl je Schlüssel, Größen) zurück."""
+        rows, counts, sizes = [], Counter(), {}
+        known = {row['image_file'] for _, row, image in self.batch if image is None}
+        # Bekannte Bilder übernehmen Metadaten und Derivat-Vermerk eines Beitrags, der sie schon verwendet
+        metadata = {row.image_file: row._asdict() for row in db.session.execute(
+            db.select(Post.image_file, Post.derivatives_ready, *(getattr(Post, name) for name in METADATA_FIELDS))
+            .where(Post.image_file.in_(known), Post.image_width.is_not(None)).distinct())}
+        known = set(db.session.scalars(db.select(Upload.key).where(Upload.key.in_(known)))) | {'default.jpg'}
+        for where, row, image in self.batch:
+            if image is not None:
+                future = self.images.get(image)
+                if future is None:
+                    self.fail(where, f'Bild {image} fehlt im Archiv (Bilder müssen vor den Beiträgen stehen).')
+                    continue
+                try:
+                    key, sizes[key], fields = future.result()
+                except InvalidUpload as e:
+                    self.fail(where, f'{image}: {e}')
+                    continue
+                row.update(fields, image_file=key)
+            elif row['image_file'] not in known:
+                self.fail(where, f'Unbekannter Bild-Schlüssel {row["image_file"]}.')
+                continue
+            elif row['image_file'] in metadata:
+                row.update(metadata[row['image_file']])
+            if row['image_file'] != 'default.jpg':
+                counts[row['image_file']] += 1
+            rows.append(row)
+        return rows, counts, sizes
+
+    def _acquire_many(self, counts, sizes):
+        # Wie storage.acquire(), aber für alle Bilder eines Batches in derselben Transaktion
+        existing = set(db.session.scalars(db.select(Upload.key).where(Upload.key.in_(list(counts)))))
+        for key, count in counts.items():
+            if key in existing:
+                db.session.execute(db.update(Upload).where(Upload.key == key)
+                                   .values(refcount=Upload.refcount + count, touched_at=_utcnow()))
+            else:
+                db.session.add(Upload(key=key, size=sizes[key], refcount=count, touched_at=_utcnow()))
+
+    def flush(self):
+        if not self.batch:
+            return
+        from app.tasks import enqueue
+        rows, counts, sizes = self._resolve_images()
+        self.batch = []
+        if not rows:
+            return
+        try:
+            self._acquire_many(counts, sizes)
+            post_ids = db.session.scalars(db.insert(Post).returning(Post.id), rows).all()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        self.imported += len(post_ids)
+        # Suche, Seiten-Cache und Feeds einmal pro Batch statt post_changed je Beitrag.
+        # Seiten aus der Zeit vor den Derivaten verwirft process_image (mark_derivatives_ready)
+        posts_imported.send(self.app, post_ids=post_ids)
+        for key in counts:
+            enqueue('process_image', filename=key)
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+        return {'imported': self.imported, 'skipped': self.skipped, 'errors': self.errors}
+
+
+def import_stream(stream, fmt, user_id=None, batch_size=None):
+    """Importiert NDJSON, tar (auch gz) oder zip aus einem Datei-Objekt und gibt eine Zusammenfassung zurück.
+
+    tar wird als Strom gelesen (auch direkt aus dem Request); zip braucht das
+    Inhaltsverzeichnis am Dateiende und wird dafür erst auf die Platte gespoolt.
+    """
+    importer = Importer(user_id=user_id, batch_size=batch_size)
+    try:
+        _read_into(importer, stream, fmt)
+    except BaseException:
+        # Auch nach Fehlern (Datenbank, unbekanntes Format) keine Bild-Threads zurücklassen;
+        # im Normalfall beendet close() den Pool
+        importer.pool.shutdown(cancel_futures=True)
+        raise
+    return importer.close()
+
+
+def _read_into(importer, stream, fmt):
+    try:
+        if fmt == 'ndjson':
+            importer.add_ndjson(stream, 'ndjson')
+        elif fmt in ('tar', 'tar.gz'):
+            with tarfile.open(fileobj=stream, mode='r|*') as archive:
+                for member in archive:
+                    _import_member(importer, member.name, member.isfile(), lambda: archive.extractfile(member))
+        elif fmt == 'zip':
+            with tempfile.TemporaryFile(dir=importer.storage.temp_dir()) as spool:
+                shutil.copyfileobj(stream, spool, current_app.config['UPLOAD_CHUNK_SIZE'])
+                with zipfile.ZipFile(spool) as archive:
+                    # Wahlfreier Zugriff: erst alle Bilder, dann die Beiträge, unabhängig von der Reihenfolge
+                    members = sorted(archive.infolist(), key=lambda info: not info.filename.startswith(IMAGE_DIR))
+                    for info in members:
+                        _import_member(importer, info.filename, not info.is_dir(), lambda: archive.open(info))
+        else:
+            raise ValueError(f'Unbekanntes Format: {fmt}')
+    except (tarfile.TarError, zipfile.BadZipFile) as e:
+        importer.fail(fmt, f'Archiv beschädigt: {e}')
+
+
+def _import_member(importer, name, is_file, open_member):
+    if not is_file:
+        return
+    if name.startswith(IMAGE_DIR):
+        with open_member() as fileobj:
+            importer.add_image(name, fileobj)
+    elif name.endswith(('.ndjson', '.jsonl')):
+        with open_member() as fileobj:
+            importer.add_ndjson(fileobj, name)
+
+
+# ----------------- Export -----------------
+
+class _StreamBuffer:
+    """Nimmt die Ausgabe von tarfile/zipfile auf, bis der Generator sie weiterreicht (nicht seekbar)."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _post_batches(batch_size):
+    # Keyset über die ID: jede Abfrage ist gleich teuer, im Speicher liegt immer nur ein Batch
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            db.select(Post.id, Post.title, Post.content, Post.image_file, Post.created_at, Post.updated_at)
+            .where(Post.id > last_id).order_by(Post.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def _record(row, image=None):
+    record = {'id': row.id, 'title': row.title, 'content': row.content,
+              'created_at': _isoformat(row.created_at), 'updated_at': _isoformat(row.updated_at)}
+    if image is not None:
+        record['image'] = image
+    elif row.image_file and row.image_file != 'default.jpg':
+        record['image_file'] = row.image_file
+    return record
+
+
+def _ndjson(records):
+    return ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records).encode('utf-8')
+
+
+class _TarWriter:
+    def __init__(self, buffer, compress):
+        self.archive = tarfile.open(fileobj=buffer, mode='w|gz' if compress else 'w|')
+
+    def add_file(self, name, path):
+        self.archive.add(path, arcname=name)
+
+    def add_bytes(self, name, data):
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(_utcnow().timestamp())
+        self.archive.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self.archive.close()
+
+
+class _ZipWriter:
+    def __init__(self, buffer):
+        self.archive = zipfile.ZipFile(buffer, 'w')
+
+    def add_file(self, name, path):
+        # Bilder sind schon komprimiert
+        self.archive.write(path, name, compress_type=zipfile.ZIP_STORED)
+
+    def add_bytes(self, name, data):
+        self.archive.writestr(name, data, compress_type=zipfile.ZIP_DEFLATED)
+
+    def close(self):
+        self.archive.close()
+
+
+def export_posts(fmt, batch_size=None):
+    """Generator über die Bytes eines Exports aller Beiträge (für Response-Streaming oder Datei).
+
+    Der Speicherbedarf hängt nur von der Batch-Größe und dem größten Bild ab.
+    Ein Bild, das in mehreren Batches vorkommt, steht mehrfach im Archiv; beim
+    Import landet es dank Inhaltsadressierung trotzdem nur einmal im Speicher.
+    """
+    batch_size = batch_size or current_app.config['BULK_BATCH_SIZE']
+    if fmt == 'ndjson':
+        for rows in _post_batches(batch_size):
+            yield _ndjson(_record(row) for row in rows)
+        return
+    if fmt not in FORMATS:
+        raise ValueError(f'Unbekanntes Format: {fmt}')
+
+    storage = get_storage()
+    buffer = _StreamBuffer()
+    writer = _ZipWriter(buffer) if fmt == 'zip' else _TarWriter(buffer, compress=fmt == 'tar.gz')
+    for number, rows in enumerate(_post_batches(batch_size), 1):
+        records = []
+        written = set()
+        for row in rows:
+            image = None
+            if row.image_file and row.image_file != 'default.jpg':
+                image = IMAGE_DIR + row.image_file
+                if image not in written:
+                    try:
+                        with storage.local_copy(row.image_file) as path:
+                            writer.add_file(image, path)
+                        written.add(image)
+                    except FileNotFoundError:
+                        current_app.logger.warning('Export: Bild %s fehlt im Speicher', row.image_file)
+                        image = None
+                    yield buffer.drain()
+            records.append(_record(row, image))
+        writer.add_bytes(POSTS_MEMBER.format(number), _ndjson(records))
+        yield buffer.drain()
+    writer.close()
+    yield buffer.drain()
+
+
+# ----------------- CLI -----------------
+
+def _default_author():
+    return db.session.scalar(db.select(User.id).where(User.is_admin.is_(True)).order_by(User.id).limit(1))
+
+
+@click.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(list(FORMATS)), help='Standard: aus der Dateiendung.')
+@click.option('--author', help='E-Mail des Autors (Standard: erster Admin).')
+@click.option('--batch-size', type=int, help='Beiträge pro Transaktion (Standard: BULK_BATCH_SIZE).')
+def import_command(path, fmt, author, batch_size):
+    """Importiert Beiträge (und Bilder) aus NDJSON, tar, tar.gz oder zip."""
+    fmt = fmt or format_for_filename(path)
+    if fmt is None:
+        raise click.UsageError('Format nicht erkennbar, bitte --format angeben.')
+    user_id = _default_author()
+    if author:
+        user_id = db.session.scalar(db.select(User.id).where(User.email == author))
+        if user_id is None:
+            raise click.UsageError(f'Unbekannter Benutzer: {author}')
+    with open(path, 'rb') as f:
+        result = import_stream(f, fmt, user_id=user_id, batch_size=batch_size)
+    for error in result['errors']:
+        click.echo(f'Übersprungen: {error}', err=True)
+    click.echo(f'{result["imported"]} Beitrag/Beiträge importiert, {result["skipped"]} übersprungen.')
+
+
+@click.command('export')
+@click.argument('path', type=click.Path(dir_okay=False, writable=True))
+@click.option('--format', 'fmt', type=click.Choice(list(FORMATS)), help='Standard: aus der Dateiendung.')
+def export_command(path, fmt):
+    """Schreibt alle Beiträge (und Bilder) als Sicherung in eine Datei."""
+    fmt = fmt or format_for_filename(path)
+    if fmt is None:
+        raise click.UsageError('Format nicht erkennbar, bitte --format angeben.')
+    with open(path, 'wb') as f:
+        for chunk in export_posts(fmt):
+            f.write(chunk)
+    click.echo(f'Export nach {path} geschrieben.')
+
+
+def init_app(app):
+    # Gruppe 'flask posts' aus app/content.py; Suche, Seiten-Cache und Feeds empfangen posts_imported selbst
+    posts_cli.add_command(import_command)
+    posts_cli.add_command(export_command)
@@ -0,0 +1,195 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request, session, make_response
+from flask_login import current_user
+from app.assets import assets_version
+from app.edge import is_public_request
+from app.replicas import use_primary
+from app.signals import post_changed, page_cache_lookup, posts_imported
+
+
+# ----------------- Backends -----------------
+
+class NullCache:
+    """Speichert nichts (Cache abgeschaltet)."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def clear(self):
+        pass
+
+
+class LRUCache:
+    """In-Memory-Cache mit fester Obergrenze an Einträgen (pro Prozess).
+
+    Damit eine Invalidierung auch die anderen Worker-Prozesse erreicht, wird
+    optional eine Marker-Datei beobachtet: ändert sich ihr Zeitstempel, verwirft
+    jeder Prozess beim nächsten Zugriff seinen Inhalt (ein stat() pro Anfrage).
+    """
+
+    def __init__(self, maxsize=256, marker_file=None):
+        self.maxsize = maxsize
+        self.marker_file = marker_file
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._marker = self._read_marker()
+
+    def _read_marker(self):
+        if not self.marker_file:
+            return None
+        try:
+            return os.stat(self.marker_file).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _check_marker(self):
+        marker = self._read_marker()
+        if marker != self._marker:
+            self._data.clear()
+            self._marker = marker
+
+    def get(self, key):
+        with self._lock:
+            self._check_marker()
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            if self.marker_file:
+                os.makedirs(os.path.dirname(self.marker_file), exist_ok=True)
+                with open(self.marker_file, 'a'):
+                    os.utime(self.marker_file)
+                self._marker = self._read_marker()
+
+
+class FileSystemCache:
+    """Ein Eintrag pro Datei; von allen Worker-Prozessen gemeinsam genutzt."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.cache')
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                return pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def set(self, key, value):
+        # Atomar schreiben, damit parallele Leser nie eine halbe Datei sehen
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._path(key))
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.cache'):
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+def make_backend(config, prefix='PAGE_CACHE'):
+    """Backend aus <prefix>_TYPE, <prefix>_MAXSIZE und <prefix>_DIR (Seiten- bzw. Fragment-Cache)."""
+    cache_type = config[f'{prefix}_TYPE']
+    if cache_type == 'lru':
+        return LRUCache(config[f'{prefix}_MAXSIZE'],
+                        marker_file=os.path.join(config[f'{prefix}_DIR'], 'invalidated'))
+    if cache_type == 'filesystem':
+        return FileSystemCache(config[f'{prefix}_DIR'])
+    if cache_type == 'null':
+        return NullCache()
+    raise ValueError(f'Unbekannter {prefix}_TYPE: {cache_type}')
+
+
+def get_page_cache():
+    return current_app.extensions['page_cache']
+
+
+# ----------------- Seiten-Cache für Views -----------------
+
+def visitor_state():
+    # Öffentliche Seiten sehen für alle gleich aus (Benutzerdaten kommen über /fragments/user)
+    if is_public_request():
+        return 'public'
+    # Anonyme Besucher haben kein _user_id in der Session -> Flask-Login fragt die DB nicht ab
+    if not current_user.is_authenticated:
+        return 'anon'
+    if current_user.is_admin:
+        return f'admin:{current_user.get_id()}'
+    return 'user'
+
+
+def cached_page(view):
+    """Cacht die vollständige Antwort einer GET-View (Route, Query-String, Besucher-Status).
+
+    Seiten mit ausstehenden Flash-Meldungen werden weder ausgeliefert noch gespeichert,
+    da die Meldungen nur einmal angezeigt werden dürfen; öffentliche Seiten (app/edge.py)
+    zeigen keine Meldungen und werden immer gecacht. Bei einem Fehltreffer liest die
+    View vom Primary, nie von einem Replikat (app/replicas.py).
+    """
+    @wraps(view)
+    def decorated_function(*args, **kwargs):
+        app = current_app._get_current_object()
+        if request.method != 'GET' or (not is_public_request() and '_flashes' in session):
+            page_cache_lookup.send(app, result='bypass')
+            return view(*args, **kwargs)
+
+        cache = get_page_cache()
+        # Mit der Asset-Version, damit nach einem Deploy keine Seiten mit alten Fingerprint-URLs kommen
+        key = f'{assets_version()}|{request.path}?{request.query_string.decode("latin-1")}|{visitor_state()}'
+        cached = cache.get(key)
+        page_cache_lookup.send(app, result='miss' if cached is None else 'hit')
+        if cached is not None:
+            body, status, headers = cached
+            response = current_app.response_class(body, status=status, headers=headers)
+            # Gespeicherte ETag/Last-Modified-Header erlauben ein 304 ganz ohne Datenbank
+            return response.make_conditional(request)
+
+        if not isinstance(cache, NullCache):
+            # Gespeicherte Seiten bekommen alle Besucher: nur mit dem Stand des Primarys (read-your-writes)
+            use_primary()
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200 and not response.direct_passthrough and 'Set-Cookie' not in response.headers:
+            headers = [(k, v) for k, v in response.headers if k != 'Content-Length']
+            cache.set(key, (response.get_data(), response.status_code, headers))
+        return response
+
+    return decorated_function
+
+
+def _invalidate_on_post_change(app, **extra):
+    app.extensions['page_cache'].clear()
+
+
+def init_app(app):
+    app.extensions['page_cache'] = make_backend(app.config)
+    post_changed.connect(_invalidate_on_post_change)
+    posts_imported.connect(_invalidate_on_post_change)
@@ -0,0 +1,60 @@
+import hashlib
+from datetime import timezone
+from functools import wraps
+from flask import current_app, request, session, make_response
+from werkzeug.http import is_resource_modified
+from app.assets import assets_version
+from app.cache import visitor_state
+from app.edge import is_public_request
+
+
+def make_etag(*parts):
+    """Bildet einen kompakten ETag aus den Validatoren und dem Besucher-Status.
+
+    Angemeldete Admins sehen andere Navigation als anonyme Besucher, daher
+    fließt der Besucher-Status mit ein ('public' auf öffentlichen Seiten). ETAG_VERSION sollte bei jedem Deploy
+    mit geänderten Templates erhöht werden; geänderte CSS/JS-Dateien (neue
+    Fingerprint-URLs im HTML) erkennt assets_version() selbst.
+    """
+    raw = '|'.join(str(part) for part in (current_app.config['ETAG_VERSION'], assets_version(),
+                                          visitor_state(), *parts))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+
+def as_utc(value):
+    # SQLite liefert naive Zeitstempel zurück, gespeichert wird immer UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def conditional(validators):
+    """Beantwortet If-None-Match/If-Modified-Since mit 304, ohne die View aufzurufen.
+
+    `validators` wird mit den View-Argumenten aufgerufen und liefert
+    (etag, last_modified). Die Funktion sollte mit einer einzigen, indizierten
+    Abfrage auskommen; der Template-Render passiert erst bei einer Änderung.
+    """
+    def decorator(view):
+        @wraps(view)
+        def decorated_function(*args, **kwargs):
+            # Ausstehende Flash-Meldungen müssen gerendert werden (außer auf öffentlichen Seiten)
+            if request.method != 'GET' or (not is_public_request() and '_flashes' in session):
+                return view(*args, **kwargs)
+
+            etag, last_modified = validators(*args, **kwargs)
+            last_modified = as_utc(last_modified)
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+
+            response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            # Browser dürfen speichern, müssen aber bei jedem Aufruf revalidieren
+            response.cache_control.no_cache = True
+            return response
+
+        return decorated_function
+    return decorator
@@ -0,0 +1,100 @@
+import math
+import re
+import click
+from flask import current_app, has_app_context
+from flask.cli import AppGroup
+from markupsafe import escape
+
+try:
+    import markdown
+except ImportError:  # Markdown ist optional, ohne Paket wird Klartext gerendert
+    markdown = None
+
+posts_cli = AppGroup('posts', help='Wartung der Beiträge.')
+
+# Länge der Vorschau auf der Startseite (wie bisher im Template: content[:250])
+EXCERPT_LENGTH = 250
+# Durchschnittliche Lesegeschwindigkeit in Wörtern pro Minute
+WORDS_PER_MINUTE = 200
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def markdown_enabled():
+    return has_app_context() and current_app.config.get('POST_MARKDOWN', False) and markdown is not None
+
+
+def render_markdown(text):
+    md = markdown.Markdown(extensions=['extra', 'sane_lists'])
+    # Rohes HTML im Beitrag wird nicht übernommen, sondern als Text escaped
+    md.preprocessors.deregister('html_block')
+    md.inlinePatterns.deregister('html')
+    return md.convert(text)
+
+
+def render_plain(text):
+    # Leerzeilen trennen Absätze, einfache Zeilenumbrüche bleiben als <br> erhalten
+    paragraphs = [p for p in re.split(r'\n\s*\n', text.replace('\r\n', '\n').strip()) if p.strip()]
+    return '\n'.join(
+        '<p>' + '<br>\n'.join(str(escape(line)) for line in paragraph.split('\n')) + '</p>'
+        for paragraph in paragraphs
+    )
+
+
+def render_content(text):
+    """Rendert den Beitragstext einmalig zu HTML (Markdown, falls aktiviert)."""
+    text = text or ''
+    if markdown_enabled():
+        return render_markdown(text)
+    return render_plain(text)
+
+
+def make_excerpt(text):
+    text = text or ''
+    if len(text) > EXCERPT_LENGTH:
+        return text[:EXCERPT_LENGTH] + '...'
+    return text
+
+
+def derived_fields(text):
+    """Alle aus dem Inhalt abgeleiteten Spalten als Dict (auch für Bulk-Inserts nutzbar)."""
+    word_count = len(WORD_RE.findall(text or ''))
+    return {
+        'excerpt': make_excerpt(text),
+        'content_html': render_content(text),
+        'word_count': word_count,
+        'reading_time': max(1, math.ceil(word_count / WORDS_PER_MINUTE)),
+    }
+
+
+@posts_cli.command('backfill')
+@click.option('--all', 'all_posts', is_flag=True, help='Auch bereits gefüllte Beiträge neu rendern.')
+@click.option('--batch-size', default=500, show_default=True)
+def backfill_command(all_posts, batch_size):
+    """Bringt das Schema auf den neuesten Stand und berechnet Vorschau, HTML und Wortanzahl."""
+    from app import db
+    from app.models import Post
+    from app.schema import upgrade_database
+
+    # Neue Spalten nur über die Migrationen, sonst scheitert ein späteres 'flask schema upgrade'
+    for name in upgrade_database():
+        click.echo(f'Spalte hinzugefügt: {name}')
+
+    stmt = db.select(Post.id).order_by(Post.id)
+    if not all_posts:
+        stmt = stmt.where(Post.content_html.is_(None))
+    post_ids = db.session.scalars(stmt).all()
+
+    for start in range(0, len(post_ids), batch_size):
+        batch = post_ids[start:start + batch_size]
+        rows = db.session.execute(db.select(Post.id, Post.content).where(Post.id.in_(batch))).all()
+        db.session.execute(db.update(Post), [{'id': row.id, **derived_fields(row.content)} for row in rows])
+        db.session.commit()
+    # Gerenderte Seiten und Karten-Fragmente enthalten noch das alte HTML
+    current_app.extensions['page_cache'].clear()
+    current_app.extensions['fragment_cache'].clear()
+    click.echo(f'{len(post_ids)} Beitrag/Beiträge aktualisiert.')
+
+
+def init_app(app):
+    app.cli.add_command(posts_cli)
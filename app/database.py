@@ -0,0 +1,181 @@
+import threading
+import time
+from collections import defaultdict
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from app import db
+
+# Config-Schlüssel -> Argument von create_engine (nur für Server-Datenbanken mit QueuePool)
+POOL_OPTIONS = {
+    'DB_POOL_SIZE': 'pool_size',
+    'DB_MAX_OVERFLOW': 'max_overflow',
+    'DB_POOL_TIMEOUT': 'pool_timeout',
+    'DB_POOL_RECYCLE': 'pool_recycle',
+}
+
+# SQLite hat kein Statement-Timeout; der Progress-Handler wird alle N VM-Schritte aufgerufen
+SQLITE_PROGRESS_STEPS = 1000
+
+
+def engine_options(config):
+    """Baut SQLALCHEMY_ENGINE_OPTIONS aus den DB_*-Einstellungen.
+
+    Bereits gesetzte SQLALCHEMY_ENGINE_OPTIONS haben Vorrang. Pool-Größen
+    gelten nur für Server-Datenbanken; SQLite nutzt eigene Pool-Klassen.
+    """
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    backend = make_url(config['SQLALCHEMY_DATABASE_URI']).get_backend_name()
+    # Tote Verbindungen (z.B. nach MySQLs wait_timeout) vor der Nutzung erkennen
+    options.setdefault('pool_pre_ping', config['DB_POOL_PRE_PING'])
+    if backend != 'sqlite':
+        for key, argument in POOL_OPTIONS.items():
+            if config.get(key) is not None:
+                options.setdefault(argument, config[key])
+    timeout = config.get('DB_STATEMENT_TIMEOUT_MS')
+    if timeout and backend == 'postgresql':
+        connect_args = options.setdefault('connect_args', {})
+        connect_args.setdefault('options', f'-c statement_timeout={timeout}')
+    return options
+
+
+# ----------------- Statement-Timeout (MySQL/MariaDB/SQLite) -----------------
+
+def install_statement_timeout(engine, timeout_ms):
+    dialect = engine.dialect.name
+
+    if dialect in ('mysql', 'mariadb'):
+        @event.listens_for(engine, 'connect')
+        def _set_mysql_timeout(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            if getattr(engine.dialect, 'is_mariadb', False):
+                cursor.execute(f'SET SESSION max_statement_time = {timeout_ms / 1000:.3f}')
+            else:
+                # Gilt in MySQL nur für SELECT, Schreibzugriffe begrenzt innodb_lock_wait_timeout
+                cursor.execute(f'SET SESSION max_execution_time = {int(timeout_ms)}')
+            cursor.close()
+
+    elif dialect == 'sqlite':
+        @event.listens_for(engine, 'connect')
+        def _install_progress_handler(dbapi_connection, connection_record):
+            state = connection_record.info['statement_deadline'] = {'deadline': None}
+
+            def _exceeded():
+                # Ein Rückgabewert ungleich 0 bricht die Abfrage mit 'interrupted' ab
+                return state['deadline'] is not None and time.monotonic() > state['deadline']
+            dbapi_connection.set_progress_handler(_exceeded, SQLITE_PROGRESS_STEPS)
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _start_deadline(conn, cursor, statement, parameters, context, executemany):
+            state = conn.connection.info.get('statement_deadline')
+            if state is not None:
+                state['deadline'] = time.monotonic() + timeout_ms / 1000
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def _clear_deadline(conn, cursor, statement, parameters, context, executemany):
+            state = conn.connection.info.get('statement_deadline')
+            if state is not None:
+                state['deadline'] = None
+
+
+# ----------------- Pool- und Abfrage-Statistiken -----------------
+
+class DatabaseStats:
+    """Prozesslokale Zähler: Pool-Ereignisse und Abfragen pro Request bzw. Endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pool_events = defaultdict(int)
+        self.endpoints = defaultdict(lambda: {'requests': 0, 'queries': 0, 'db_ms': 0.0, 'max_queries': 0})
+
+    def count_pool_event(self, name):
+        with self._lock:
+            self.pool_events[name] += 1
+
+    def record_request(self, endpoint, queries, db_ms):
+        with self._lock:
+            stats = self.endpoints[endpoint]
+            stats['requests'] += 1
+            stats['queries'] += queries
+            stats['db_ms'] += db_ms
+            stats['max_queries'] = max(stats['max_queries'], queries)
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = {
+                endpoint: {**stats,
+                           'db_ms': round(stats['db_ms'], 3),
+                           'avg_queries': round(stats['queries'] / stats['requests'], 2),
+                           'avg_db_ms': round(stats['db_ms'] / stats['requests'], 3)}
+                for endpoint, stats in self.endpoints.items()
+            }
+            return {'pool_events': dict(self.pool_events), 'endpoints': endpoints}
+
+
+def get_db_stats():
+    return current_app.extensions['db_stats']
+
+
+def pool_status(engine):
+    pool = engine.pool
+    status = {'class': type(pool).__name__, 'status': pool.status()}
+    # Nur QueuePool kennt Größe und Überlauf
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        method = getattr(pool, name, None)
+        if callable(method):
+            status[name] = method()
+    return status
+
+
+def instrument_engine(engine, stats):
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = (time.perf_counter() - conn.info['query_start'].pop()) * 1000
+        if has_request_context():
+            g._db_queries = g.get('_db_queries', 0) + 1
+            g._db_ms = g.get('_db_ms', 0.0) + elapsed
+
+    for name in ('connect', 'checkout', 'checkin', 'invalidate', 'soft_invalidate'):
+        event.listen(engine.pool, name, lambda *args, _name=name: stats.count_pool_event(_name))
+
+
+def request_db_usage():
+    """(Anzahl Abfragen, Dauer in ms) des laufenden Requests."""
+    return g.get('_db_queries', 0), g.get('_db_ms', 0.0)
+
+
+def _reset_request_counters():
+    g._db_queries = 0
+    g._db_ms = 0.0
+
+
+def _record_request(response):
+    queries, db_ms = request_db_usage()
+    get_db_stats().record_request(request.endpoint or '<unbekannt>', queries, db_ms)
+    if current_app.config['DB_SERVER_TIMING']:
+        response.headers.add('Server-Timing', f'db;dur={db_ms:.2f};desc="{queries} Abfragen"')
+    return response
+
+
+def snapshot():
+    """Aktueller Stand für den Admin-Endpoint /admin/metrics/db."""
+    return {
+        'pool': {name or 'default': pool_status(engine) for name, engine in db.engines.items()},
+        'replicas': current_app.extensions['replicas'].status(),
+        **get_db_stats().snapshot(),
+    }
+
+
+def init_app(app):
+    stats = app.extensions['db_stats'] = DatabaseStats()
+    with app.app_context():
+        for engine in db.engines.values():
+            instrument_engine(engine, stats)
+            if app.config['DB_STATEMENT_TIMEOUT_MS']:
+                install_statement_timeout(engine, app.config['DB_STATEMENT_TIMEOUT_MS'])
+    app.before_request(_reset_request_counters)
+    app.after_request(_record_request)
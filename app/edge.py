@@ -0,0 +1,157 @@
+import urllib.request
+from functools import wraps
+import click
+from flask import current_app, g, make_response
+from flask.cli import AppGroup
+from flask.sessions import SecureCookieSessionInterface
+from app.replicas import read_from_replica
+from app.signals import post_changed, posts_imported
+
+# Surrogate-Key aller öffentlichen Seiten ('flask edge purge' ohne Argumente)
+ALL_PAGES = 'pages'
+
+edge_cli = AppGroup('edge', help='Öffentliche Seiten hinter einem Reverse-Proxy/CDN.')
+
+
+# ----------------- Öffentliche Seiten -----------------
+
+def is_public_request():
+    """True, wenn die aktuelle Seite für alle Besucher gleich ausgeliefert wird (siehe public_page)."""
+    return g.get('_public_page', False)
+
+
+def _reset_public_flag():
+    g._public_page = False
+
+
+def make_public(response, max_age=None):
+    """Geteilte Caches dürfen die Antwort speichern, Browser müssen revalidieren."""
+    response.cache_control.no_cache = None
+    response.cache_control.private = None
+    response.cache_control.public = True
+    response.cache_control.max_age = 0
+    response.cache_control.s_maxage = current_app.config['EDGE_MAX_AGE'] if max_age is None else max_age
+    return response
+
+
+def make_private(response):
+    response.cache_control.public = None
+    response.cache_control.s_maxage = None
+    response.cache_control.private = True
+    return response
+
+
+def public_page(*keys):
+    """Markiert eine GET-View als öffentliche Seite, die für alle Besucher identisch ist.
+
+    Die Seite wird ohne Benutzerdaten gerendert (Navigation anonym, Flash-Meldungen
+    holt user_fragment.js über /fragments/user nach), setzt kein Cookie und darf von
+    Reverse-Proxy/CDN gespeichert werden. `keys` sind Surrogate-Keys als Format-Strings
+    über die View-Argumente (z.B. 'post-{post_id}'); ALL_PAGES kommt immer dazu.
+    Muss der äußerste Dekorator sein, damit Seiten-Cache und ETag davon wissen.
+    """
+    def decorator(view):
+        @wraps(view)
+        def decorated_function(*args, **kwargs):
+            g._public_page = True
+            response = make_response(view(*args, **kwargs))
+            if response.status_code in (200, 304):
+                # Vom Replikat gelesene Seiten nur so lange, wie ein Replikat nachhinken darf
+                # (Seiten aus dem Seiten-Cache kommen immer vom Primary, siehe cached_page)
+                max_age = current_app.config['DB_REPLICA_STICKY_SECONDS'] if read_from_replica() else None
+                make_public(response, max_age)
+                surrogate_keys = [key.format(**kwargs) for key in keys] + [ALL_PAGES]
+                response.headers[current_app.config['EDGE_SURROGATE_KEY_HEADER']] = ' '.join(surrogate_keys)
+            return response
+
+        return decorated_function
+    return decorator
+
+
+class PublicPageSessionInterface(SecureCookieSessionInterface):
+    """Speichert die Session auf öffentlichen Seiten nicht.
+
+    Sonst hängt Flask 'Vary: Cookie' an, sobald irgendein Hook die Session liest
+    (Flask-Login tut das bei jedem Request), und kein geteilter Cache würde die
+    Seite für andere Besucher verwenden.
+    """
+
+    def save_session(self, app, session, response):
+        if is_public_request():
+            if not session.modified and 'Set-Cookie' not in response.headers:
+                return
+            # Ein Hook hat doch ein Cookie gesetzt: die Antwort gehört nur diesem Besucher
+            make_private(response)
+        super().save_session(app, session, response)
+
+
+# ----------------- Purge -----------------
+
+def purge(keys):
+    """Verwirft alle Seiten mit einem der Surrogate-Keys in jedem Cache aus EDGE_PURGE_URLS.
+
+    Fehler (Cache nicht erreichbar) werden weitergereicht, damit der Job wiederholt wird.
+    """
+    config = current_app.config
+    headers = {config['EDGE_SURROGATE_KEY_HEADER']: ' '.join(keys)}
+    for url in config['EDGE_PURGE_URLS']:
+        request = urllib.request.Request(url, method='PURGE', headers=headers)
+        with urllib.request.urlopen(request, timeout=10) as response:
+            response.read()
+
+
+def _purge_on_post_change(app, post_id, action, **extra):
+    if not app.config['EDGE_PURGE_URLS']:
+        return
+    from app.tasks import enqueue_after_request
+    # Neue Beiträge erscheinen nur in den Listen, die Detailseite gab es noch nicht
+    keys = ['posts'] if action == 'created' else ['posts', f'post-{post_id}']
+    enqueue_after_request('edge_purge', keys=keys)
+
+
+def _purge_on_posts_imported(app, post_ids, **extra):
+    if not app.config['EDGE_PURGE_URLS']:
+        return
+    from app.tasks import enqueue
+    enqueue('edge_purge', keys=['posts'])
+
+
+# ----------------- CLI -----------------
+
+@edge_cli.command('purge')
+@click.argument('keys', nargs=-1)
+def purge_command(keys):
+    """Verwirft Seiten mit den Surrogate-Keys KEYS (ohne Angabe: alle öffentlichen Seiten)."""
+    if not current_app.config['EDGE_PURGE_URLS']:
+        raise click.ClickException('EDGE_PURGE_URLS ist nicht gesetzt.')
+    keys = list(keys) or [ALL_PAGES]
+    purge(keys)
+    click.echo(f'Verworfen: {" ".join(keys)}')
+
+
+@edge_cli.command('proxy')
+@click.option('--upstream', help='Basis-URL der App (z.B. http://127.0.0.1:8000); ohne Angabe läuft die App im Proxy-Prozess.')
+@click.option('--host', default='127.0.0.1', show_default=True)
+@click.option('--port', default=8080, show_default=True, type=int)
+def proxy_command(upstream, host, port):
+    """Startet einen kleinen Caching-Proxy (Ersatz für Varnish/CDN in Entwicklung und Tests).
+
+    Mit EDGE_PURGE_URLS=http://<host>:<port> verwirft die App geänderte Seiten darin.
+    """
+    from werkzeug.serving import run_simple
+    from app.edge_proxy import EdgeCache, HTTPUpstream
+
+    config = current_app.config
+    backend = HTTPUpstream(upstream) if upstream else current_app._get_current_object()
+    proxy = EdgeCache(backend, max_entries=config['EDGE_PROXY_MAX_ENTRIES'],
+                      key_header=config['EDGE_SURROGATE_KEY_HEADER'])
+    run_simple(host, port, proxy, threaded=True)
+
+
+def init_app(app):
+    app.session_interface = PublicPageSessionInterface()
+    app.before_request(_reset_public_flag)
+    app.add_template_global(is_public_request, 'is_public_page')
+    app.cli.add_command(edge_cli)
+    post_changed.connect(_purge_on_post_change)
+    posts_imported.connect(_purge_on_posts_imported)
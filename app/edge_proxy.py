@@ -0,0 +1,207 @@
+import http.client
+import json
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+from urllib.parse import quote, urlsplit
+from werkzeug.datastructures import Headers, ResponseCacheControl
+from werkzeug.http import parse_cache_control_header, parse_set_header
+from werkzeug.test import run_wsgi_app
+from werkzeug.wrappers import Request, Response
+from werkzeug.wsgi import ClosingIterator
+
+# Größere Antworten (Exporte, Bilder) gehen ungespeichert durch
+MAX_BODY_SIZE = 1024 * 1024
+CACHEABLE_STATUS = (200, 204)
+
+# Gelten nur für eine Verbindung und werden nicht weitergereicht
+HOP_BY_HOP = frozenset(('connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+                        'te', 'trailer', 'trailers', 'transfer-encoding', 'upgrade'))
+
+
+class _Entry:
+    __slots__ = ('status', 'headers', 'body', 'vary', 'keys', 'stored_at', 'expires')
+
+    def __init__(self, status, headers, body, vary, keys, ttl):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.vary = vary
+        self.keys = keys
+        self.stored_at = time.time()
+        self.expires = self.stored_at + ttl
+
+
+class EdgeCache:
+    """Kleiner Caching-Proxy als WSGI-Middleware, wie Varnish oder ein CDN vor der App.
+
+    Speichert GET-Antworten, die ein geteilter Cache behalten darf (public mit
+    s-maxage/max-age, ohne Set-Cookie), je Vary-Variante. PURGE mit Surrogate-Keys
+    im Header `key_header` (nur von `purge_from`) verwirft alle passenden Seiten,
+    PURGE ohne Keys nur die angefragte URL. Im Header X-Cache steht HIT/MISS/PASS.
+    """
+
+    def __init__(self, app, max_entries=1000, key_header='Surrogate-Key', purge_from=('127.0.0.1', '::1')):
+        self.app = app
+        self.max_entries = max_entries
+        self.key_header = key_header
+        self.purge_from = purge_from
+        # URL -> Liste der Varianten, in LRU-Reihenfolge
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        request = Request(environ)
+        if request.method == 'PURGE':
+            return self._purge_request(request)(environ, start_response)
+        if request.method not in ('GET', 'HEAD'):
+            return self._pass(environ, start_response)
+
+        entry = self._lookup(request)
+        if entry is not None:
+            response = Response(entry.body, status=entry.status, headers=entry.headers)
+            response.headers['Age'] = str(int(time.time() - entry.stored_at))
+            response.headers['X-Cache'] = 'HIT'
+            return response.make_conditional(request)(environ, start_response)
+        if request.method == 'HEAD':
+            return self._pass(environ, start_response)
+        return self._fetch(request, environ, start_response)
+
+    # --- Lesen und Speichern ---
+
+    def _lookup(self, request):
+        with self._lock:
+            variants = self._entries.get(request.url)
+            if not variants:
+                return None
+            now = time.time()
+            variants[:] = [entry for entry in variants if entry.expires > now]
+            for entry in variants:
+                if all(request.headers.get(name) == value for name, value in entry.vary):
+                    self._entries.move_to_end(request.url)
+                    return entry
+            return None
+
+    def _store(self, request, entry):
+        with self._lock:
+            variants = self._entries.setdefault(request.url, [])
+            variants[:] = [other for other in variants if other.vary != entry.vary]
+            variants.append(entry)
+            self._entries.move_to_end(request.url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _ttl(self, status, headers):
+        # Wie lange ein geteilter Cache die Antwort behalten darf; None = gar nicht
+        if status not in CACHEABLE_STATUS or 'Set-Cookie' in headers:
+            return None
+        cache_control = parse_cache_control_header(headers.get('Cache-Control'), cls=ResponseCacheControl)
+        if not cache_control.public or cache_control.private or cache_control.no_store or cache_control.no_cache:
+            return None
+        if '*' in parse_set_header(headers.get('Vary')):
+            return None
+        ttl = cache_control.s_maxage if cache_control.s_maxage is not None else cache_control.max_age
+        return ttl or None
+
+    def _fetch(self, request, environ, start_response):
+        app_iter, status, headers = run_wsgi_app(self.app, environ)
+        headers = Headers(headers)
+        status_code = int(status.split(None, 1)[0])
+        ttl = self._ttl(status_code, headers)
+        if ttl is None or int(headers.get('Content-Length') or 0) > MAX_BODY_SIZE:
+            return self._respond(start_response, status, headers, 'PASS', app_iter)
+
+        chunks, size = [], 0
+        iterator = iter(app_iter)
+        for chunk in iterator:
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > MAX_BODY_SIZE:
+                return self._respond(start_response, status, headers, 'PASS', chain(chunks, iterator), app_iter)
+        if hasattr(app_iter, 'close'):
+            app_iter.close()
+
+        keys = frozenset(headers.get(self.key_header, '').split())
+        headers.remove(self.key_header)
+        vary = tuple((name, request.headers.get(name)) for name in parse_set_header(headers.get('Vary')))
+        stored = [(name, value) for name, value in headers if name.lower() not in ('content-length', 'date')]
+        self._store(request, _Entry(status_code, stored, b''.join(chunks), vary, keys, ttl))
+
+        response = Response(b''.join(chunks), status=status, headers=headers)
+        response.headers['X-Cache'] = 'MISS'
+        return response.make_conditional(request)(environ, start_response)
+
+    def _pass(self, environ, start_response):
+        app_iter, status, headers = run_wsgi_app(self.app, environ)
+        return self._respond(start_response, status, Headers(headers), 'PASS', app_iter)
+
+    def _respond(self, start_response, status, headers, result, body, source=None):
+        # Surrogate-Keys sind nur für den Cache bestimmt
+        headers.remove(self.key_header)
+        headers['X-Cache'] = result
+        start_response(status, headers.to_wsgi_list())
+        source = body if source is None else source
+        return ClosingIterator(body, getattr(source, 'close', None))
+
+    # --- Verwerfen ---
+
+    def purge(self, keys):
+        """Verwirft alle Einträge mit einem der Surrogate-Keys und liefert deren Anzahl."""
+        keys = set(keys)
+        purged = 0
+        with self._lock:
+            for url in list(self._entries):
+                variants = self._entries[url]
+                kept = [entry for entry in variants if not keys & entry.keys]
+                purged += len(variants) - len(kept)
+                if kept:
+                    self._entries[url] = kept
+                else:
+                    del self._entries[url]
+        return purged
+
+    def purge_url(self, url):
+        with self._lock:
+            return len(self._entries.pop(url, ()))
+
+    def _purge_request(self, request):
+        if request.remote_addr not in self.purge_from:
+            return Response(json.dumps({'error': 'forbidden'}), status=403, mimetype='application/json')
+        keys = request.headers.get(self.key_header, '').split()
+        purged = self.purge(keys) if keys else self.purge_url(request.url)
+        return Response(json.dumps({'purged': purged}), mimetype='application/json')
+
+
+class HTTPUpstream:
+    """WSGI-App, die jeden Request per HTTP an `base_url` weiterreicht (für 'flask edge proxy')."""
+
+    def __init__(self, base_url, timeout=60):
+        parts = urlsplit(base_url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.timeout = timeout
+
+    def __call__(self, environ, start_response):
+        request = Request(environ)
+        headers = {name: value for name, value in request.headers if name.lower() not in HOP_BY_HOP}
+        forwarded_for = request.headers.get('X-Forwarded-For')
+        headers['X-Forwarded-For'] = f'{forwarded_for}, {request.remote_addr}' if forwarded_for else request.remote_addr
+        headers['X-Forwarded-Proto'] = request.scheme
+        path = quote(environ.get('PATH_INFO', '/'))
+        if environ.get('QUERY_STRING'):
+            path += '?' + environ['QUERY_STRING']
+
+        connection = self.connection_class(self.netloc, timeout=self.timeout)
+        try:
+            # Der Body wird in Blöcken gelesen, Content-Length steht schon in den Headern
+            connection.request(request.method, path, body=request.stream if request.content_length else None,
+                               headers=headers)
+            upstream = connection.getresponse()
+        except OSError:
+            connection.close()
+            return Response('Upstream nicht erreichbar', status=502)(environ, start_response)
+
+        response_headers = [(name, value) for name, value in upstream.getheaders() if name.lower() not in HOP_BY_HOP]
+        start_response(f'{upstream.status} {upstream.reason}', response_headers)
+        return ClosingIterator(iter(lambda: upstream.read(64 * 1024), b''), connection.close)
@@ -0,0 +1,187 @@
+import json
+import os
+import shutil
+import threading
+from datetime import datetime, timezone
+import click
+from flask import current_app, render_template, send_file, url_for
+from flask.cli import AppGroup
+from markupsafe import Markup
+from sqlalchemy.orm import undefer_group
+from app import db
+from app.conditional import as_utc
+from app.models import Post
+from app.signals import post_changed, posts_imported
+
+feeds_cli = AppGroup('feeds', help='Atom- und JSON-Feed erzeugen.')
+
+# Ausgelieferte Dateien: Name -> MIME-Typ
+FEEDS = {
+    'feed.atom': 'application/atom+xml',
+    'feed.json': 'application/feed+json',
+}
+# Vorgerenderte Einträge je Beitrag (nur für die neuesten FEED_SIZE Beiträge)
+ENTRY_DIR = 'entries'
+ENTRY_FORMATS = ('atom', 'json')
+
+# Verhindert, dass zwei Jobs im selben Prozess gleichzeitig zusammensetzen
+_lock = threading.Lock()
+
+
+def feed_dir():
+    return current_app.config['FEED_DIR']
+
+
+def _entry_path(post_id, fmt):
+    return os.path.join(feed_dir(), ENTRY_DIR, f'{post_id}.{fmt}')
+
+
+def _write_atomic(path, text):
+    # Leser sehen immer entweder die alte oder die neue Datei, nie eine halbe
+    tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _isoformat(value):
+    return as_utc(value).isoformat(timespec='seconds')
+
+
+# ----------------- Einträge -----------------
+
+def render_entry(post):
+    """Schreibt Atom- und JSON-Eintrag eines Beitrags (inkl. content_html)."""
+    url = url_for('main.post_detail', post_id=post.id, _external=True)
+    _write_atomic(_entry_path(post.id, 'atom'), render_template(
+        'feeds/atom_entry.xml', post=post, url=url,
+        published=_isoformat(post.created_at), updated=_isoformat(post.updated_at)))
+
+    item = {
+        'id': url,
+        'url': url,
+        'title': post.title,
+        'content_html': post.content_html or '',
+        'summary': post.excerpt or '',
+        'date_published': _isoformat(post.created_at),
+        'date_modified': _isoformat(post.updated_at),
+    }
+    if post.image_file and post.image_file != 'default.jpg':
+        item['image'] = url_for('uploaded_file', key=post.image_file, _external=True)
+    _write_atomic(_entry_path(post.id, 'json'), json.dumps(item, ensure_ascii=False))
+
+
+def _remove_entry(post_id):
+    for fmt in ENTRY_FORMATS:
+        try:
+            os.remove(_entry_path(post_id, fmt))
+        except FileNotFoundError:
+            pass
+
+
+def _read_entry(post_id, fmt):
+    with open(_entry_path(post_id, fmt), encoding='utf-8') as f:
+        return f.read()
+
+
+def feed_window():
+    """(id, updated_at) der neuesten FEED_SIZE Beiträge über den Index (created_at, id)."""
+    return db.session.execute(
+        db.select(Post.id, Post.updated_at)
+        .order_by(Post.created_at.desc(), Post.id.desc())
+        .limit(current_app.config['FEED_SIZE'])
+    ).all()
+
+
+# ----------------- Zusammensetzen -----------------
+
+def update_feeds(changed_post_id=None, action=None):
+    """Aktualisiert die Feeds nach einer Änderung an einem Beitrag.
+
+    Neu gerendert werden nur der geänderte Beitrag und Einträge, die fehlen
+    (z.B. ein älterer Beitrag, der nach einem Löschen ins Fenster nachrückt).
+    Der Rest wird aus den vorhandenen Eintragsdateien zusammengesetzt, der
+    Aufwand hängt also nur von FEED_SIZE ab, nicht von der Zahl der Beiträge.
+    Ohne Argumente wird nur ergänzt, was fehlt (erster Aufbau).
+    """
+    os.makedirs(os.path.join(feed_dir(), ENTRY_DIR), exist_ok=True)
+    with _lock, current_app.test_request_context(base_url=current_app.config['FEED_BASE_URL']):
+        if action == 'deleted':
+            _remove_entry(changed_post_id)
+
+        window = feed_window()
+        ids = [post_id for post_id, _ in window]
+        stale = {post_id for post_id in ids
+                 if post_id == changed_post_id or not os.path.exists(_entry_path(post_id, 'json'))}
+        if stale:
+            for post in db.session.scalars(db.select(Post).where(Post.id.in_(stale))
+                                           .options(undefer_group('body'))):
+                render_entry(post)
+
+        # Aus dem Fenster gefallene Einträge entfernen, damit das Verzeichnis klein bleibt
+        keep = {f'{post_id}.{fmt}' for post_id in ids for fmt in ENTRY_FORMATS}
+        for name in os.listdir(os.path.join(feed_dir(), ENTRY_DIR)):
+            if name not in keep and not name.endswith('.tmp'):
+                os.remove(os.path.join(feed_dir(), ENTRY_DIR, name))
+
+        _write_feeds(ids, max((as_utc(updated) for _, updated in window), default=None))
+
+
+def _write_feeds(ids, updated):
+    config = current_app.config
+    updated = _isoformat(updated or datetime.now(timezone.utc))
+    home = url_for('main.index', _external=True)
+
+    entries = Markup('\n'.join(_read_entry(post_id, 'atom') for post_id in ids))
+    _write_atomic(os.path.join(feed_dir(), 'feed.atom'), render_template(
+        'feeds/atom.xml', title=config['FEED_TITLE'], home=home, updated=updated, entries=entries,
+        self_url=url_for('feed_atom', _external=True)))
+
+    _write_atomic(os.path.join(feed_dir(), 'feed.json'), json.dumps({
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': config['FEED_TITLE'],
+        'home_page_url': home,
+        'feed_url': url_for('feed_json', _external=True),
+        'language': 'de',
+        'items': [json.loads(_read_entry(post_id, 'json')) for post_id in ids],
+    }, ensure_ascii=False))
+
+
+# ----------------- Auslieferung und CLI -----------------
+
+def serve_feed(name):
+    path = os.path.join(feed_dir(), name)
+    if not os.path.exists(path):
+        # Erster Abruf nach einer Neuinstallation: einmalig aufbauen
+        update_feeds()
+    # ETag/Last-Modified aus der Datei; Clients revalidieren bei jedem Abruf
+    response = send_file(path, mimetype=FEEDS[name], conditional=True, etag=True, max_age=0)
+    response.cache_control.no_cache = True
+    return response
+
+
+def _enqueue_on_post_change(app, post_id, action, **extra):
+    from app.tasks import enqueue_after_request
+    enqueue_after_request('update_feeds', post_id=post_id, action=action)
+
+
+def _enqueue_on_posts_imported(app, post_ids, **extra):
+    from app.tasks import enqueue
+    # Ein Job pro Batch; neue Einträge im Fenster fehlen noch und werden dabei gerendert
+    enqueue('update_feeds', post_id=None, action='imported')
+
+
+@feeds_cli.command('build')
+def build_command():
+    """Rendert alle Einträge im Feed-Fenster neu und schreibt beide Feeds."""
+    shutil.rmtree(os.path.join(feed_dir(), ENTRY_DIR), ignore_errors=True)
+    update_feeds()
+    click.echo(f'Feeds in {feed_dir()} geschrieben.')
+
+
+def init_app(app):
+    app.add_url_rule('/feed.atom', 'feed_atom', serve_feed, defaults={'name': 'feed.atom'})
+    app.add_url_rule('/feed.json', 'feed_json', serve_feed, defaults={'name': 'feed.json'})
+    app.cli.add_command(feeds_cli)
+    post_changed.connect(_enqueue_on_post_change)
+    posts_imported.connect(_enqueue_on_posts_imported)
@@ -0,0 +1,75 @@
+import os
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from app.assets import assets_version
+from app.cache import make_backend
+
+templates_cli = AppGroup('templates', help='Jinja-Templates vorkompilieren.')
+
+
+class FragmentCacheExtension(Extension):
+    """Jinja-Tag {% cache schlüssel, ... %}...{% endcache %} für wiederverwendbare Teilstücke.
+
+    Der Schlüssel besteht aus Template-Name und Zeile des Tags, den übergebenen
+    Werten (z.B. post.id und post.updated_at) sowie Asset- und ETag-Version;
+    eine Änderung am Beitrag oder ein Deploy erzeugt so automatisch neue Einträge.
+    Der Inhalt darf daher nur von diesen Werten abhängen, nicht vom Besucher.
+    """
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [nodes.Const(f'{parser.name}:{lineno}'), parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_cached_fragment', [nodes.List(parts)]),
+                               [], [], body).set_lineno(lineno)
+
+    def _cached_fragment(self, parts, caller):
+        if current_app.debug:
+            # Im Debug-Modus werden Templates neu geladen, der Schlüssel kennt aber nur die Zeile
+            return caller()
+        cache = get_fragment_cache()
+        key = '|'.join([assets_version(), current_app.config['ETAG_VERSION'], *map(str, parts)])
+        html = cache.get(key)
+        if html is None:
+            html = str(caller())
+            cache.set(key, html)
+        return Markup(html)
+
+
+def get_fragment_cache():
+    return current_app.extensions['fragment_cache']
+
+
+# ----------------- Bytecode-Cache -----------------
+
+@templates_cli.command('compile')
+def compile_command():
+    """Übersetzt alle Templates in den Bytecode-Cache (einmal beim Deploy statt in jedem Worker)."""
+    env = current_app.jinja_env
+    if env.bytecode_cache is None:
+        click.echo('JINJA_BYTECODE_CACHE_DIR ist nicht gesetzt, es gibt nichts zu speichern.')
+        return
+    names = env.list_templates(filter_func=lambda name: name.endswith('.html'))
+    for name in names:
+        env.get_template(name)
+    click.echo(f'{len(names)} Template(s) kompiliert.')
+
+
+def init_app(app):
+    app.extensions['fragment_cache'] = make_backend(app.config, prefix='FRAGMENT_CACHE')
+    app.jinja_env.add_extension(FragmentCacheExtension)
+
+    # Kompilierte Templates auf der Platte: neue Worker parsen die Templates nicht erneut
+    directory = app.config['JINJA_BYTECODE_CACHE_DIR']
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+    app.cli.add_command(templates_cli)
@@ -0,0 +1,234 @@
+import base64
+import io
+import os
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from PIL import Image, ImageOps, UnidentifiedImageError
+from app.signals import post_changed
+from app.storage import get_storage, upload_url
+
+# Unterordner (relativ zum Upload-Ordner), in dem die verkleinerten Varianten liegen
+DERIVATIVE_DIR = 'resized'
+
+# Zielbreiten der Derivate in Pixeln. Das Original wird nie hochskaliert.
+DERIVATIVE_SIZES = {
+    'thumb': 320,
+    'card': 640,
+    'detail': 1280,
+}
+
+# Ausgabeformate: Dateiendung -> (Pillow-Format, Speicheroptionen)
+DERIVATIVE_FORMATS = {
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+}
+
+# Platzhalter (LQIP): längste Seite in Pixeln und WebP-Qualität; der Browser skaliert ihn weich hoch
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 40
+# Spalten von Post, die image_metadata() liefert
+METADATA_FIELDS = ('image_width', 'image_height', 'image_color', 'image_placeholder')
+
+images_cli = AppGroup('images', help='Verwaltung der Bild-Derivate.')
+
+
+def derivative_name(image_file, size, ext):
+    stem, _ = os.path.splitext(image_file)
+    return f'{stem}_{size}.{ext}'
+
+
+def derivative_key(image_file, size, ext):
+    # Schlüssel im Datei-Speicher (app/storage.py)
+    return f'{DERIVATIVE_DIR}/{derivative_name(image_file, size, ext)}'
+
+
+def derivative_keys(image_file):
+    for size in DERIVATIVE_SIZES:
+        for ext in DERIVATIVE_FORMATS:
+            yield derivative_key(image_file, size, ext)
+
+
+def create_derivatives(source_path):
+    """Erzeugt alle Größen/Formate zu einem Original und entfernt dabei EXIF-Daten.
+
+    Gibt die Liste der geschriebenen Dateien zurück. Dateien, die Pillow nicht
+    lesen kann, werden übersprungen (leere Liste), das Original bleibt unverändert.
+    """
+    folder, image_file = os.path.split(source_path)
+    target_dir = os.path.join(folder, DERIVATIVE_DIR)
+
+    try:
+        with Image.open(source_path) as original:
+            # Ausrichtung aus EXIF übernehmen, bevor die Metadaten wegfallen
+            image = ImageOps.exif_transpose(original)
+            image.load()
+    except (UnidentifiedImageError, OSError) as e:
+        current_app.logger.warning('Bild %s konnte nicht verarbeitet werden: %s', image_file, e)
+        return []
+
+    # JPEG kennt keinen Alphakanal, daher einheitlich nach RGB konvertieren
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+
+    os.makedirs(target_dir, exist_ok=True)
+    written = []
+    for size, max_width in DERIVATIVE_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail((max_width, max_width * 4), Image.Resampling.LANCZOS)
+        for ext, (fmt, options) in DERIVATIVE_FORMATS.items():
+            path = os.path.join(target_dir, derivative_name(image_file, size, ext))
+            # Ohne exif=... schreibt Pillow keine Metadaten in die neue Datei
+            resized.save(path, fmt, **options)
+            written.append(path)
+    return written
+
+
+def image_metadata(source_path):
+    """Abmessungen (nach EXIF-Drehung), dominante Farbe und Platzhalter als dict mit den Post-Spalten.
+
+    Bei JPEG dekodiert Pillow per draft() nur eine verkleinerte Fassung, das
+    Bild wird also nie in voller Größe geladen. Nicht lesbare Dateien ergeben
+    ein dict mit lauter None.
+    """
+    try:
+        with Image.open(source_path) as original:
+            width, height = original.size
+            if original.getexif().get(0x0112) in (5, 6, 7, 8):  # Orientation: um 90° gedreht
+                width, height = height, width
+            original.draft('RGB', (PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+            image = ImageOps.exif_transpose(original)
+            image.load()
+    except (UnidentifiedImageError, OSError) as e:
+        current_app.logger.warning('Metadaten von %s nicht lesbar: %s', os.path.basename(source_path), e)
+        return dict.fromkeys(METADATA_FIELDS)
+
+    image = image.convert('RGB')
+    image.thumbnail((PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4), Image.Resampling.BOX)
+    # Häufigste Farbe nach Reduktion auf wenige Farben (robuster als der Mittelwert)
+    palette = image.quantize(colors=4)
+    _, index = max(palette.getcolors())
+    color = '#{:02x}{:02x}{:02x}'.format(*palette.getpalette()[index * 3:index * 3 + 3])
+
+    image.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, 'WEBP', quality=PLACEHOLDER_QUALITY)
+    placeholder = 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+    return {'image_width': width, 'image_height': height, 'image_color': color, 'image_placeholder': placeholder}
+
+
+def image_fields(key):
+    """Metadaten einer gespeicherten Datei für die Post-Spalten (beim Speichern eines Beitrags)."""
+    try:
+        with get_storage().local_copy(key) as path:
+            return image_metadata(path)
+    except FileNotFoundError:
+        return dict.fromkeys(METADATA_FIELDS)
+
+
+def fill_post_metadata(key, force=False):
+    """Setzt die Metadaten aller Beiträge mit diesem Bild, denen sie fehlen. Gibt die Anzahl zurück."""
+    from app import db
+    from app.models import Post
+
+    condition = Post.image_file == key
+    if not force:
+        condition &= Post.image_width.is_(None)
+    if db.session.scalar(db.select(Post.id).where(condition).limit(1)) is None:
+        return 0
+    fields = image_fields(key)
+    if fields['image_width'] is None:
+        return 0
+    count = db.session.execute(db.update(Post).where(condition).values(**fields)).rowcount
+    db.session.commit()
+    return count
+
+
+def mark_derivatives_ready(key):
+    """Vermerkt an allen Beiträgen mit diesem Bild, dass die Derivate vorliegen. Gibt die Anzahl zurück.
+
+    Seiten, die in der Zwischenzeit mit dem Original (ohne srcset) gerendert wurden, liegen
+    schon in Seiten-Cache und Reverse-Proxy; post_changed verwirft sie wie nach einer Änderung.
+    """
+    from app import db
+    from app.models import Post
+
+    post_ids = db.session.scalars(db.select(Post.id).where(Post.image_file == key,
+                                                           Post.derivatives_ready.is_(False))).all()
+    if not post_ids:
+        return 0
+    # Setzt auch updated_at, damit ETag/Last-Modified der Seiten nicht mehr passen
+    db.session.execute(db.update(Post).where(Post.id.in_(post_ids)).values(derivatives_ready=True))
+    db.session.commit()
+    app = current_app._get_current_object()
+    for post_id in post_ids:
+        post_changed.send(app, post_id=post_id, action='updated')
+    return len(post_ids)
+
+
+def process_upload(key):
+    """Erzeugt die Derivate zu einer gespeicherten Datei und legt sie im Datei-Speicher ab."""
+    storage = get_storage()
+    with storage.local_copy(key) as path:
+        written = create_derivatives(path)
+        for derivative in written:
+            storage.put(f'{DERIVATIVE_DIR}/{os.path.basename(derivative)}', derivative)
+    return written
+
+
+def has_derivatives(image_file):
+    if not image_file:
+        return False
+    # Die größte Variante wird zuletzt geschrieben und steht stellvertretend für alle
+    return get_storage().exists(derivative_key(image_file, list(DERIVATIVE_SIZES)[-1], list(DERIVATIVE_FORMATS)[-1]))
+
+
+def image_srcset(image_file, ext='jpg', ready=None):
+    """Baut den srcset-Wert für das Template, z.B. '.../x_thumb.jpg 320w, ...'.
+
+    `ready` ist Post.derivatives_ready; ohne Angabe wird der Datei-Speicher gefragt.
+    """
+    if not (has_derivatives(image_file) if ready is None else ready):
+        return ''
+    return ', '.join(
+        f'{upload_url(derivative_key(image_file, size, ext))} {width}w'
+        for size, width in DERIVATIVE_SIZES.items()
+    )
+
+
+def image_url(image_file, size, ext='jpg', ready=None):
+    """URL einer einzelnen Variante, mit Fallback auf das Original."""
+    if has_derivatives(image_file) if ready is None else ready:
+        return upload_url(derivative_key(image_file, size, ext))
+    return upload_url(image_file)
+
+
+@images_cli.command('backfill')
+@click.option('--force', is_flag=True, help='Vorhandene Derivate und Metadaten neu erzeugen.')
+def backfill_command(force):
+    """Erzeugt Derivate und Beitrags-Metadaten für alle bereits hochgeladenen Bilder."""
+    processed = skipped = updated = marked = 0
+    for key, _ in sorted(get_storage().keys()):
+        updated += fill_post_metadata(key, force=force)
+        if not force and has_derivatives(key):
+            skipped += 1
+        elif process_upload(key):
+            processed += 1
+            click.echo(f'Verarbeitet: {key}')
+        else:
+            continue
+        # Auch Beiträge aus der Zeit vor Post.derivatives_ready (Migration 0003)
+        marked += mark_derivatives_ready(key)
+    # Markierte Beiträge hat mark_derivatives_ready() schon per post_changed verworfen
+    if updated:
+        # Gerenderte Seiten und Karten-Fragmente enthalten noch Bilder ohne Abmessungen
+        current_app.extensions['page_cache'].clear()
+        current_app.extensions['fragment_cache'].clear()
+    click.echo(f'{processed} Bild(er) verarbeitet, {skipped} übersprungen, '
+               f'Metadaten für {updated} Beitrag/Beiträge ergänzt, {marked} mit Derivaten markiert.')
+
+
+def init_app(app):
+    app.add_template_global(image_srcset)
+    app.add_template_global(image_url)
+    app.cli.add_command(images_cli)
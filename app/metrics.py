@@ -0,0 +1,139 @@
+import hmac
+import os
+import time
+from flask import current_app, g, request, abort, template_rendered, before_render_template
+from app.database import request_db_usage
+from app.signals import upload_stored, page_cache_lookup
+
+try:
+    # Mehrere Worker-Prozesse: PROMETHEUS_MULTIPROC_DIR muss vor diesem Import gesetzt sein
+    from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+                                   generate_latest, multiprocess)
+except ImportError:  # prometheus_client ist optional, ohne Paket gibt es keinen /metrics-Endpoint
+    Counter = None
+
+# Bereiche für Latenzen in Sekunden (Seiten liegen meist im ms-Bereich)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+TEMPLATE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+# Die Metriken existieren einmal pro Prozess (create_app kann mehrfach laufen, z.B. in Tests)
+if Counter is not None:
+    REQUESTS = Counter('http_requests_total', 'HTTP-Anfragen', ['endpoint', 'method', 'status'])
+    REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'Antwortzeit pro Endpoint',
+                                ['endpoint'], buckets=LATENCY_BUCKETS)
+    REQUEST_DB_TIME = Histogram('http_request_db_seconds', 'Datenbankzeit pro Request',
+                                ['endpoint'], buckets=LATENCY_BUCKETS)
+    DB_QUERIES = Counter('db_queries_total', 'SQL-Anweisungen', ['endpoint'])
+    TEMPLATE_RENDER = Histogram('template_render_seconds', 'Renderzeit pro Template',
+                                ['template'], buckets=TEMPLATE_BUCKETS)
+    UPLOAD_BYTES = Counter('upload_bytes_total', 'Empfangene Upload-Bytes')
+    UPLOADS = Counter('uploads_total', 'Gespeicherte Uploads', ['deduplicated'])
+    PAGE_CACHE = Counter('page_cache_requests_total', 'Zugriffe auf den Seiten-Cache', ['result'])
+    COLLECTORS = (REQUESTS, REQUEST_LATENCY, REQUEST_DB_TIME, DB_QUERIES, TEMPLATE_RENDER, UPLOAD_BYTES, UPLOADS,
+                  PAGE_CACHE)
+
+
+def _endpoint():
+    # Nur registrierte Endpoints als Label, sonst wächst die Zahl der Zeitreihen mit jeder 404-URL
+    return request.endpoint or 'none'
+
+
+# ----------------- Request- und Template-Messung -----------------
+
+def _start_timer():
+    g._metrics_start = time.perf_counter()
+
+
+def _observe_request(response):
+    start = g.pop('_metrics_start', None)
+    if start is None:
+        return response
+    endpoint = _endpoint()
+    REQUESTS.labels(endpoint, request.method, str(response.status_code)).inc()
+    REQUEST_LATENCY.labels(endpoint).observe(time.perf_counter() - start)
+    queries, db_ms = request_db_usage()
+    DB_QUERIES.labels(endpoint).inc(queries)
+    REQUEST_DB_TIME.labels(endpoint).observe(db_ms / 1000)
+    return response
+
+
+def _template_started(app, template, context, **extra):
+    g.setdefault('_metrics_templates', []).append(time.perf_counter())
+
+
+def _template_finished(app, template, context, **extra):
+    starts = g.get('_metrics_templates')
+    if starts:
+        TEMPLATE_RENDER.labels(template.name or 'string').observe(time.perf_counter() - starts.pop())
+
+
+def _upload_stored(app, key, size, created, **extra):
+    UPLOAD_BYTES.inc(size)
+    UPLOADS.labels('false' if created else 'true').inc()
+
+
+def _page_cache_lookup(app, result, **extra):
+    PAGE_CACHE.labels(result).inc()
+
+
+# ----------------- Export -----------------
+
+def _registry():
+    # Unter gunicorn & Co. schreibt jeder Worker in PROMETHEUS_MULTIPROC_DIR; gelesen wird die Summe
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_view():
+    token = current_app.config['METRICS_TOKEN']
+    if not token:
+        # Ohne Token nur in Entwicklung und Tests, sonst wären Endpoints und Last öffentlich einsehbar
+        if not (current_app.debug or current_app.testing):
+            abort(403)
+    elif not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        abort(403)
+    response = current_app.response_class(generate_latest(_registry()), mimetype=CONTENT_TYPE_LATEST)
+    response.cache_control.no_store = True
+    return response
+
+
+def mark_process_dead(pid):
+    """Für den child_exit-Hook des WSGI-Servers: Dateien eines beendeten Workers aufräumen."""
+    if Counter is not None and os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
+
+
+def unregister():
+    """Meldet die Metriken dieses Moduls ab, damit es neu importiert werden kann (HUP, gunicorn.conf.py)."""
+    if Counter is None:
+        return ()
+    for collector in COLLECTORS:
+        REGISTRY.unregister(collector)
+    return COLLECTORS
+
+
+def register(collectors):
+    """Gegenstück zu unregister(), falls der neue Import fehlschlägt."""
+    for collector in collectors:
+        REGISTRY.register(collector)
+
+
+def init_app(app):
+    if not app.config['METRICS_ENABLED']:
+        return
+    if Counter is None:
+        app.logger.error('METRICS_ENABLED ist gesetzt, aber prometheus_client ist nicht installiert; '
+                         'keine Metriken. Paket installieren oder METRICS_ENABLED=false setzen.')
+        return
+    if not app.config['METRICS_TOKEN'] and not (app.debug or app.testing):
+        app.logger.warning('METRICS_TOKEN ist nicht gesetzt: /metrics antwortet mit 403.')
+    app.before_request(_start_timer)
+    app.after_request(_observe_request)
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
+    upload_stored.connect(_upload_stored, app)
+    page_cache_lookup.connect(_page_cache_lookup, app)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
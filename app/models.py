@@ -1,20 +1,55 @@
 from app import db # Importiere das db-Objekt aus dem __init__.py der App
 from datetime import datetime, timezone
 from flask_login import UserMixin # Neu Hinzugefügt
-from werkzeug.security import generate_password_hash, check_password_hash # neu Hinzugefügt
+from sqlalchemy.orm import validates
 
 # Unser Datenbankmodell für Blog-Beiträge
 class Post(db.Model):
+    # Zusammengesetzter Index für die Keyset-Paginierung (siehe app/pagination.py)
+    __table_args__ = (db.Index('ix_post_created_at_id', 'created_at', 'id'),)
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     title = db.Column(db.String(100), nullable=False)
-    content = db.Column(db.Text, nullable=False)
+    # Große Text-Spalten werden erst beim Zugriff geladen (Gruppe 'body', siehe app/queries.py)
+    content = db.deferred(db.Column(db.Text, nullable=False), group='body')
     image_file = db.Column(db.String(120), nullable=True, default='default.jpg')
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    # Zeitpunkt der letzten Änderung; Grundlage für ETag und Last-Modified (indiziert für max())
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
+                           onupdate=lambda: datetime.now(timezone.utc), index=True)
+
+    # Beim Schreiben abgeleitete Felder, damit Listen und Detailseite nichts mehr berechnen
+    excerpt = db.Column(db.String(260), nullable=True)
+    content_html = db.deferred(db.Column(db.Text, nullable=True), group='body')
+    word_count = db.Column(db.Integer, nullable=True)
+    reading_time = db.Column(db.Integer, nullable=True)  # in Minuten
+
+    # Beim Upload ermittelte Bild-Metadaten (app/images.py), damit Templates Platz reservieren
+    # und bis zum Laden einen Platzhalter zeigen können; NULL = noch nicht ermittelt
+    image_width = db.Column(db.Integer, nullable=True)
+    image_height = db.Column(db.Integer, nullable=True)
+    image_color = db.Column(db.String(7), nullable=True)  # Dominante Farbe als '#rrggbb'
+    image_placeholder = db.Column(db.String(400), nullable=True)  # Winzige Vorschau als data:-URI
+    # Setzt der Job process_image, sobald die Derivate im Datei-Speicher liegen; Templates und
+    # Cache-Schlüssel fragen so nicht pro Beitrag den Speicher ab
+    derivatives_ready = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+
+    # Autor wird per JOIN in derselben Abfrage geladen, damit Listen mit Autor keine
+    # Abfrage pro Zeile auslösen (N+1, siehe app/profiler.py)
+    author = db.relationship('User', lazy='joined')
 
     def __repr__(self):
         return f'<Post {self.id}: {self.title}>'
 
+    # Jede Zuweisung an content (auch im Konstruktor) aktualisiert die abgeleiteten Felder
+    @validates('content')
+    def _derive_from_content(self, key, content):
+        from app.content import derived_fields
+        for name, value in derived_fields(content).items():
+            setattr(self, name, value)
+        return content
+
 # Neues Datenbankmodell für Benutzer
 class User(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
@@ -26,11 +61,42 @@ class User(db.Model, UserMixin):
     def __repr__(self):
         return f'<User {self.email}>'
 
-    # Methoden zum Hashen und Überprüfen von Passwörtern
+    # Methoden zum Hashen und Überprüfen von Passwörtern (Verfahren und Kosten aus der Config, app/passwords.py)
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        from app.passwords import hash_password
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        from app.passwords import verify_password
+        return verify_password(self.password_hash, password)
+
+# Datenbankmodell für Hintergrund-Jobs (siehe app/tasks.py)
+class Job(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    # pending -> running -> done | failed (pending erneut nach einem Fehlversuch)
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    last_error = db.Column(db.Text, nullable=True)
+    run_after = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc), index=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<Job {self.id}: {self.kind} ({self.status})>'
 
+# Inhaltsadressierte Upload-Datei (siehe app/storage.py): key = SHA-256 + Dateiendung
+class Upload(db.Model):
+    key = db.Column(db.String(80), primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    # Anzahl der Beiträge, die auf die Datei verweisen; 0 = Kandidat für 'flask storage gc'
+    refcount = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    # Letzter Upload bzw. letzte Freigabe, Grundlage für die Schonfrist der Garbage Collection
+    touched_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), index=True)
 
+    def __repr__(self):
+        return f'<Upload {self.key} ({self.refcount})>'
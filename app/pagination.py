@@ -0,0 +1,112 @@
+import base64
+import binascii
+from datetime import datetime
+from flask import current_app
+from app import db
+from app.models import Post
+
+
+class KeysetPage:
+    """Eine Seite der Keyset-Paginierung über (created_at, id), neueste zuerst.
+
+    Anders als OFFSET kostet jede Seite gleich viel: die Datenbank springt über
+    den zusammengesetzten Index direkt an die Cursor-Position.
+    """
+
+    def __init__(self, items, per_page, has_prev, has_next, total=None):
+        self.items = items
+        self.per_page = per_page
+        self.has_prev = has_prev
+        self.has_next = has_next
+        self.total = total
+
+    @property
+    def prev_cursor(self):
+        return encode_cursor(self.items[0]) if self.has_prev and self.items else None
+
+    @property
+    def next_cursor(self):
+        return encode_cursor(self.items[-1]) if self.has_next and self.items else None
+
+
+def encode_cursor(post):
+    raw = f'{post.created_at.isoformat()}|{post.id}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Gibt (created_at, id) zurück oder None bei einem ungültigen Cursor."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        created_at, post_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(post_id)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+
+
+def keyset_select(stmt, after=None, before=None, limit=None):
+    """Ergänzt ein select(...) auf Post um Cursor-Filter, Sortierung und Limit.
+
+    Mit `before` wird aufsteigend sortiert (die Seite davor); der Aufrufer
+    dreht die Reihenfolge anschließend wieder um.
+    """
+    if before is not None:
+        created_at, post_id = before
+        stmt = stmt.where(db.or_(Post.created_at > created_at,
+                                 db.and_(Post.created_at == created_at, Post.id > post_id)))
+        stmt = stmt.order_by(Post.created_at.asc(), Post.id.asc())
+    else:
+        if after is not None:
+            created_at, post_id = after
+            stmt = stmt.where(db.or_(Post.created_at < created_at,
+                                     db.and_(Post.created_at == created_at, Post.id < post_id)))
+        stmt = stmt.order_by(Post.created_at.desc(), Post.id.desc())
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def paginate_posts(stmt, per_page, after=None, before=None, with_total=False, row_factory=None):
+    """Lädt eine Seite; `after`/`before` sind die Cursor-Strings aus der URL.
+
+    Ohne `row_factory` muss `stmt` ein select(Post) sein. Mit `row_factory`
+    darf es einzelne Spalten (mindestens id und created_at) selektieren; jede
+    Ergebniszeile wird dann damit umgewandelt (siehe app/queries.py).
+    """
+    after, before = decode_cursor(after), decode_cursor(before)
+
+    def fetch(query):
+        result = db.session.execute(query)
+        if row_factory is None:
+            return result.scalars().all()
+        return [row_factory(row) for row in result]
+
+    if before is not None:
+        # Eine Zeile mehr laden, um zu wissen, ob es davor noch etwas gibt
+        rows = fetch(keyset_select(stmt, before=before, limit=per_page + 1))
+        if len(rows) >= per_page:
+            has_prev = len(rows) > per_page
+            items = list(reversed(rows[:per_page]))
+            return KeysetPage(items, per_page, has_prev, True, total_posts() if with_total else None)
+        # Weniger als eine volle Seite davor: das ist die erste Seite
+        after = None
+
+    rows = fetch(keyset_select(stmt, after=after, limit=per_page + 1))
+    return KeysetPage(rows[:per_page], per_page, after is not None, len(rows) > per_page,
+                      total_posts() if with_total else None)
+
+
+def total_posts():
+    """Gesamtzahl der Beiträge, zwischengespeichert im Seiten-Cache.
+
+    Der Eintrag verschwindet mit jeder Invalidierung (Signal post_changed),
+    sodass COUNT(*) nur nach einer Änderung erneut ausgeführt wird.
+    """
+    cache = current_app.extensions['page_cache']
+    total = cache.get('count:post')
+    if total is None:
+        total = db.session.execute(db.select(db.func.count(Post.id))).scalar_one()
+        cache.set('count:post', total)
+    return total
@@ -0,0 +1,185 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from flask import current_app, has_app_context
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, generate_password_hash, check_password_hash
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+except ImportError:  # argon2-cffi ist optional, ohne Paket bleibt es bei scrypt/pbkdf2
+    PasswordHasher = None
+
+# Werkzeug-Standard, falls kein App-Kontext vorhanden ist (z.B. in Skripten)
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+
+class HashingOverloaded(Exception):
+    """Alle Plätze im Hash-Executor sind belegt; der Login wird abgewiesen statt zu warten."""
+
+
+# ----------------- Hashen und Prüfen -----------------
+
+def _config(name, default=None):
+    return current_app.config.get(name, default) if has_app_context() else default
+
+
+def _argon2_hasher():
+    if PasswordHasher is None:
+        raise RuntimeError("PASSWORD_HASH_METHOD='argon2' benötigt das Paket 'argon2-cffi'.")
+    return PasswordHasher(time_cost=_config('ARGON2_TIME_COST', 3),
+                          memory_cost=_config('ARGON2_MEMORY_COST', 65536),
+                          parallelism=_config('ARGON2_PARALLELISM', 1))
+
+
+def hash_method():
+    return _config('PASSWORD_HASH_METHOD', DEFAULT_METHOD)
+
+
+def hash_password(password):
+    method = hash_method()
+    if method == 'argon2':
+        return _argon2_hasher().hash(password)
+    return generate_password_hash(password, method=method)
+
+
+def verify_password(password_hash, password):
+    if password_hash.startswith('$argon2'):
+        if PasswordHasher is None:
+            return False
+        try:
+            return PasswordHasher().verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    return check_password_hash(password_hash, password)
+
+
+def needs_rehash(password_hash):
+    """True, wenn der Hash mit anderem Verfahren oder anderen Kosten als konfiguriert erzeugt wurde."""
+    method = hash_method()
+    if method == 'argon2':
+        return not password_hash.startswith('$argon2') or _argon2_hasher().check_needs_rehash(password_hash)
+    if password_hash.startswith('$argon2'):
+        return True
+    # Werkzeug speichert die vollständigen Parameter vor dem ersten '$', z.B. 'scrypt:32768:8:1'
+    return password_hash.split('$', 1)[0] != _normalize_method(method)
+
+
+def _normalize_method(method):
+    # Ergänzt fehlende Parameter wie Werkzeug: 'scrypt' -> 'scrypt:32768:8:1', 'pbkdf2' -> 'pbkdf2:sha256:<n>'
+    name, *params = method.split(':')
+    defaults = {'scrypt': ['32768', '8', '1'], 'pbkdf2': ['sha256', str(DEFAULT_PBKDF2_ITERATIONS)]}.get(name, [])
+    return ':'.join([name, *params, *defaults[len(params):]])
+
+
+# ----------------- Begrenzter Executor -----------------
+
+class BoundedExecutor:
+    """Threadpool mit fester Obergrenze für laufende und wartende Aufgaben.
+
+    Die Hash-Funktionen (hashlib.scrypt/pbkdf2_hmac, argon2) geben den GIL frei;
+    so rechnen nie mehr als `workers` Hashes gleichzeitig, und bei vollem
+    Puffer wird sofort abgelehnt, statt weitere Request-Threads zu blockieren.
+    """
+
+    def __init__(self, workers, queue_size):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingOverloaded()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+# Schützt das Anlegen des Executors, wenn die ersten Logins gleichzeitig ankommen
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    # Erst beim ersten Login anlegen, damit jeder (geforkte) Worker-Prozess eigene Threads hat
+    app = current_app._get_current_object()
+    executor = app.extensions.get('password_executor')
+    if executor is None:
+        with _executor_lock:
+            executor = app.extensions.get('password_executor')
+            if executor is None:
+                executor = app.extensions['password_executor'] = BoundedExecutor(
+                    app.config['PASSWORD_HASH_WORKERS'], app.config['PASSWORD_HASH_QUEUE'])
+    return executor
+
+
+def check_password_bounded(user, password):
+    """Prüft das Passwort im Hash-Executor; wirft HashingOverloaded bei Überlast."""
+    future = _get_executor().submit(verify_password, user.password_hash, password)
+    try:
+        return future.result(timeout=current_app.config['PASSWORD_HASH_TIMEOUT'])
+    except FutureTimeoutError:
+        raise HashingOverloaded() from None
+
+
+def _in_app_context(app, fn, *args):
+    with app.app_context():
+        return fn(*args)
+
+
+def hash_password_bounded(password):
+    """Erzeugt einen neuen Hash im Hash-Executor; wirft HashingOverloaded bei Überlast."""
+    # Verfahren und Kosten stehen in der Config, der Executor-Thread braucht den App-Kontext
+    future = _get_executor().submit(_in_app_context, current_app._get_current_object(), hash_password, password)
+    try:
+        return future.result(timeout=current_app.config['PASSWORD_HASH_TIMEOUT'])
+    except FutureTimeoutError:
+        raise HashingOverloaded() from None
+
+
+# ----------------- Rate-Limit pro IP -----------------
+
+class RateLimiter:
+    """Gleitendes Fenster pro Schlüssel (hier: Client-IP), prozesslokal."""
+
+    def __init__(self, limit, period):
+        self.limit = limit
+        self.period = period
+        self._hits = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key):
+        """Zählt einen Versuch. Gibt 0 zurück, wenn erlaubt, sonst die Wartezeit in Sekunden."""
+        now = time.monotonic()
+        with self._lock:
+            hits = self._hits.setdefault(key, deque())
+            while hits and hits[0] <= now - self.period:
+                hits.popleft()
+            if len(hits) >= self.limit:
+                return int(hits[0] + self.period - now) + 1
+            hits.append(now)
+            if len(self._hits) > 10000:
+                self._prune(now)
+            return 0
+
+    def reset(self, key):
+        with self._lock:
+            self._hits.pop(key, None)
+
+    def _prune(self, now):
+        for key in [key for key, hits in self._hits.items() if not hits or hits[-1] <= now - self.period]:
+            del self._hits[key]
+
+
+def get_login_limiter():
+    return current_app.extensions['login_limiter']
+
+
+def init_app(app):
+    app.extensions['login_limiter'] = RateLimiter(app.config['LOGIN_RATE_LIMIT'], app.config['LOGIN_RATE_PERIOD'])
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import namedtuple
+from itertools import chain
+from flask import current_app, g, has_app_context, request
+from flask_login import UserMixin
+from sqlalchemy import event
+from app import db, login_manager
+from app.models import User
+
+
+class Principal(namedtuple('Principal', 'id email is_admin'), UserMixin):
+    """Schreibgeschützte Sicht auf einen User für Flask-Login.
+
+    Enthält nur, was Templates und Zugriffsprüfungen brauchen (kein Passwort-Hash),
+    und ist an keine DB-Session gebunden; dieselbe Instanz kann daher über
+    Requests und Threads hinweg geteilt werden.
+    """
+
+
+class PrincipalCache:
+    """Prozesslokaler Cache user_id -> Principal mit kurzer Lebensdauer."""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, principal):
+        with self._lock:
+            self._entries[principal.id] = (time.monotonic() + self.ttl, principal)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def get_principal_cache():
+    return current_app.extensions['principals']
+
+
+def load_principal(user_id):
+    """user_loader für Flask-Login: eine DB-Abfrage nur bei einem Cache-Fehltreffer."""
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+    cache = get_principal_cache()
+    principal = cache.get(user_id)
+    if principal is None:
+        row = db.session.execute(
+            db.select(User.id, User.email, User.is_admin).where(User.id == user_id)
+        ).one_or_none()
+        if row is None:
+            return None
+        principal = Principal(row.id, row.email, bool(row.is_admin))
+        cache.set(principal)
+    return principal
+
+
+def invalidate_principal(user_id):
+    """Sofort verwerfen, z.B. nach Passwort- oder Rollenänderung außerhalb des ORM."""
+    get_principal_cache().invalidate(user_id)
+
+
+# ----------------- Invalidierung bei Änderungen am User -----------------
+# Geänderte oder gelöschte User werden beim Flush gesammelt und erst nach dem
+# Commit verworfen, damit kein paralleler Request den alten Stand neu einliest.
+# Die Hooks hängen an der Session-Klasse von db.session, nicht an der globalen
+# sqlalchemy.orm.Session: beim Neuladen (HUP, gunicorn.conf.py) entsteht mit dem
+# neuen db eine neue Klasse, statt dass sich die Hooks bei jedem Import vermehren.
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_changed_users(session, flush_context):
+    user_ids = {obj.id for obj in chain(session.dirty, session.deleted) if isinstance(obj, User)}
+    if user_ids:
+        session.info.setdefault('changed_user_ids', set()).update(user_ids)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_changed_users(session):
+    user_ids = session.info.pop('changed_user_ids', None)
+    if user_ids and has_app_context() and 'principals' in current_app.extensions:
+        cache = get_principal_cache()
+        for user_id in user_ids:
+            cache.invalidate(user_id)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_changed_users(session):
+    session.info.pop('changed_user_ids', None)
+
+
+# ----------------- Schnellweg für anonyme Besucher -----------------
+
+def _anonymous_fast_path():
+    # Ohne Session- und Remember-Cookie kann niemand angemeldet sein: Flask-Login
+    # (Session lesen, Remember-Cookie prüfen, Loader aufrufen) wird übersprungen.
+    config = current_app.config
+    cookies = request.cookies
+    if config['SESSION_COOKIE_NAME'] not in cookies and config['REMEMBER_COOKIE_NAME'] not in cookies:
+        g._login_user = login_manager.anonymous_user()
+
+
+def init_app(app):
+    app.config.setdefault('REMEMBER_COOKIE_NAME', 'remember_token')
+    app.extensions['principals'] = PrincipalCache(app.config['PRINCIPAL_CACHE_TTL'])
+    app.before_request(_anonymous_fast_path)
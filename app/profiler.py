@@ -0,0 +1,196 @@
+import threading
+import time
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+from flask import current_app, request
+from sqlalchemy import event
+from app import db
+
+Query = namedtuple('Query', 'statement parameters duration_ms engine')
+
+# Pro Thread: offene Mitschnitte (capture_queries, Test-Client-Requests laufen im selben Thread)
+# und die gerade ausgewertete Einheit (Request oder Job, siehe profiled)
+_local = threading.local()
+
+
+class NPlusOneError(AssertionError):
+    """Dieselbe Abfrage lief in einem Request zu oft (nur mit QUERY_PROFILER_RAISE)."""
+
+
+class QueryLog:
+    """Mitgeschnittene Abfragen eines Requests oder Code-Blocks mit Auswertung."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __len__(self):
+        return len(self.queries)
+
+    @property
+    def total_ms(self):
+        return sum(query.duration_ms for query in self.queries)
+
+    def repeated(self, threshold):
+        """[(Anweisung, Anzahl)] aller SELECTs, die mindestens `threshold`-mal liefen.
+
+        Gebundene Parameter stehen nicht im SQL-Text: eine Abfrage pro Zeile einer
+        Liste (N+1) erscheint hier als dieselbe Anweisung mit vielen Aufrufen.
+        """
+        counts = Counter(query.statement for query in self.queries if _is_select(query.statement))
+        return [(statement, count) for statement, count in counts.most_common() if count >= threshold]
+
+    def slow(self, threshold_ms):
+        return [query for query in self.queries if query.duration_ms >= threshold_ms]
+
+    def format(self):
+        lines = [f'{i:3}. {query.duration_ms:7.2f} ms  {_one_line(query.statement)}  {query.parameters!r}'
+                 for i, query in enumerate(self.queries, 1)]
+        for statement, count in self.repeated(2):
+            lines.append(f'     {count}x wiederholt: {_one_line(statement)}')
+        return '\n'.join(lines)
+
+
+def _is_select(statement):
+    return statement.lstrip().upper().startswith(('SELECT', 'WITH'))
+
+
+def _one_line(statement, limit=200):
+    statement = ' '.join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + ' ...'
+
+
+# ----------------- Mitschnitt -----------------
+
+def instrument_engine(engine):
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('profiler_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['profiler_start'].pop()
+        if getattr(_local, 'explaining', False):
+            return
+        logs = list(getattr(_local, 'logs', ()))
+        if getattr(_local, 'unit', None) is not None:
+            logs.append(_local.unit)
+        if logs:
+            query = Query(statement, parameters, (time.perf_counter() - started) * 1000, engine)
+            for log in logs:
+                log.queries.append(query)
+
+
+@contextmanager
+def capture_queries():
+    """Schneidet alle Abfragen dieses Threads mit, auch die von Requests über den Test-Client."""
+    log = QueryLog()
+    logs = _local.__dict__.setdefault('logs', [])
+    logs.append(log)
+    try:
+        yield log
+    finally:
+        logs.remove(log)
+
+
+@contextmanager
+def assert_max_queries(n):
+    """Schlägt fehl, wenn der Block mehr als `n` Abfragen ausführt, und listet sie auf.
+
+        with assert_max_queries(3):
+            client.get('/admin/dashboard')
+    """
+    with capture_queries() as log:
+        yield log
+    if len(log) > n:
+        raise AssertionError(f'{len(log)} Abfragen statt höchstens {n}:\n{log.format()}')
+
+
+# ----------------- EXPLAIN -----------------
+
+def explain(query):
+    """Ausführungsplan einer mitgeschnittenen SELECT-Abfrage als Text ('' für andere Anweisungen)."""
+    if not _is_select(query.statement) or isinstance(query.parameters, list):
+        return ''
+    prefix = 'EXPLAIN QUERY PLAN ' if query.engine.dialect.name == 'sqlite' else 'EXPLAIN '
+    _local.explaining = True
+    try:
+        with query.engine.connect() as conn:
+            rows = conn.exec_driver_sql(prefix + query.statement, query.parameters or ()).fetchall()
+    except Exception as e:
+        return f'EXPLAIN fehlgeschlagen: {e}'
+    finally:
+        _local.explaining = False
+    if query.engine.dialect.name == 'sqlite':
+        # (id, parent, notused, detail): nur die Beschreibung ist interessant
+        return '\n'.join(str(row[-1]) for row in rows)
+    return '\n'.join(' | '.join(str(value) for value in row) for row in rows)
+
+
+# ----------------- Auswertung pro Request -----------------
+
+def profiling_enabled(app):
+    return app.config['QUERY_PROFILER'] or app.debug
+
+
+def report(log, label):
+    """Protokolliert Anzahl und Dauer; warnt bei vielen oder wiederholten und bei langsamen Abfragen."""
+    config = current_app.config
+    logger = current_app.logger
+    logger.debug('%s: %d Abfragen, %.2f ms', label, len(log), log.total_ms)
+
+    problems = []
+    if len(log) > config['QUERY_PROFILER_MAX_QUERIES']:
+        problems.append(f'{len(log)} Abfragen (Grenze {config["QUERY_PROFILER_MAX_QUERIES"]})')
+    repeated = log.repeated(config['QUERY_PROFILER_REPEAT_THRESHOLD'])
+    problems += [f'N+1-Verdacht, {count}x: {_one_line(statement)}' for statement, count in repeated]
+    if problems:
+        logger.warning('%s: %s', label, '; '.join(problems))
+
+    for query in log.slow(config['QUERY_PROFILER_SLOW_MS']):
+        logger.warning('%s: langsame Abfrage (%.1f ms): %s\n%s', label, query.duration_ms,
+                       _one_line(query.statement, 1000), explain(query))
+
+    if repeated and config['QUERY_PROFILER_RAISE']:
+        raise NPlusOneError(f'{label}: wiederholte Abfragen\n{log.format()}')
+
+
+@contextmanager
+def profiled(label):
+    """Wertet die Abfragen des Blocks als eigene Einheit aus, z.B. einen Job im laufenden Request."""
+    if not profiling_enabled(current_app):
+        yield
+        return
+    outer, _local.unit = getattr(_local, 'unit', None), QueryLog()
+    log = _local.unit
+    try:
+        yield
+        report(log, label)
+    finally:
+        _local.unit = outer
+
+
+def _start_request_log():
+    _local.unit = QueryLog() if profiling_enabled(current_app) else None
+
+
+def _report_request(response):
+    log, _local.unit = getattr(_local, 'unit', None), None
+    if log is not None:
+        report(log, f'{request.method} {request.full_path.rstrip("?")}')
+    return response
+
+
+def _clear_request_log(exc):
+    # Nach Fehlern läuft _report_request nicht; ohne Fehler endet hier evtl. nur ein
+    # verschachtelter test_request_context (z.B. beim Rendern der Feeds in einem Job)
+    if exc is not None:
+        _local.unit = None
+
+
+def init_app(app):
+    with app.app_context():
+        for engine in db.engines.values():
+            instrument_engine(engine)
+    app.before_request(_start_request_log)
+    app.after_request(_report_request)
+    app.teardown_request(_clear_request_log)
@@ -0,0 +1,37 @@
+from collections import namedtuple
+from sqlalchemy.orm import undefer_group
+from app import db
+from app.models import Post
+from app.pagination import paginate_posts
+
+# --- Schlanke, schreibgeschützte Datensätze (DTOs) für die Listen-Templates ---
+# Es werden nur die genannten Spalten selektiert; es entstehen keine ORM-Objekte,
+# kein Identity-Map-Eintrag und die großen Text-Spalten werden nie übertragen.
+
+# Karte auf der Startseite
+PostCard = namedtuple('PostCard', 'id title created_at updated_at image_file excerpt reading_time '
+                                   'image_width image_height image_color image_placeholder derivatives_ready')
+# Zeile im Admin-Dashboard
+PostRow = namedtuple('PostRow', 'id title created_at updated_at')
+
+
+def projection(dto):
+    """select(...) über genau die Post-Spalten, die das DTO enthält."""
+    return db.select(*(getattr(Post, field) for field in dto._fields))
+
+
+def post_cards(per_page, after=None, before=None):
+    """Eine Seite der Startseite als KeysetPage mit PostCard-Einträgen."""
+    return paginate_posts(projection(PostCard), per_page=per_page, after=after, before=before,
+                          row_factory=PostCard._make)
+
+
+def post_rows(per_page, after=None, before=None):
+    """Eine Seite des Dashboards als KeysetPage mit PostRow-Einträgen (inkl. Gesamtzahl)."""
+    return paginate_posts(projection(PostRow), per_page=per_page, after=after, before=before,
+                          with_total=True, row_factory=PostRow._make)
+
+
+def get_post_or_404(post_id):
+    """Vollständiger Beitrag inkl. der verzögert geladenen Text-Spalten in einer Abfrage."""
+    return db.get_or_404(Post, post_id, options=[undefer_group('body')])
@@ -0,0 +1,172 @@
+import itertools
+import threading
+import time
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+
+# Bind-Schlüssel der Replikate in SQLALCHEMY_BINDS: replica_0, replica_1, ...
+REPLICA_PREFIX = 'replica_'
+# Zeitpunkt (time.time()), bis zu dem eine Sitzung nach einem Schreibzugriff auf dem Primary liest
+STICKY_KEY = '_db_primary_until'
+
+
+def replica_binds(config):
+    """SQLALCHEMY_BINDS mit einem Eintrag je URL aus DB_REPLICA_URLS (bestehende Binds bleiben)."""
+    binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+    for index, url in enumerate(config['DB_REPLICA_URLS']):
+        binds[f'{REPLICA_PREFIX}{index}'] = url
+    return binds
+
+
+class RoutingSession(Session):
+    """Session, die Lesezugriffe öffentlicher GET-Requests auf ein Replikat lenkt.
+
+    Alles andere geht an den Primary bzw. an den Bind des Models: Flushes und
+    INSERT/UPDATE/DELETE, Requests außerhalb von DB_REPLICA_BLUEPRINTS und
+    Besucher, die kurz zuvor geschrieben haben (read-your-writes). Nach dem
+    ersten Schreibzugriff liest auch der restliche Request vom Primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            if self._flushing or getattr(clause, 'is_dml', False):
+                g._db_wrote = True
+            elif g.get('_db_route') == 'replica' and not g.get('_db_wrote'):
+                engine = get_replicas().engine_for_request()
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+# ----------------- Replikate und Health-Checks -----------------
+
+class ReplicaSet:
+    """Verteilt Lesezugriffe reihum auf gesunde Replikate.
+
+    Der Zustand eines Replikats wird höchstens alle `check_interval` Sekunden
+    mit SELECT 1 geprüft; Verbindungsfehler im Betrieb markieren es sofort als
+    ausgefallen. Ist kein Replikat gesund, liest der Request vom Primary.
+    """
+
+    def __init__(self, engines, check_interval):
+        self.engines = dict(engines)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        # Name -> [gesund, Zeitpunkt der letzten Prüfung, letzter Fehler]
+        self._state = {name: [True, 0.0, None] for name in self.engines}
+        for name, engine in self.engines.items():
+            event.listen(engine, 'handle_error', lambda context, _name=name: self._on_error(_name, context))
+
+    def __bool__(self):
+        return bool(self.engines)
+
+    def check(self, name):
+        try:
+            with self.engines[name].connect() as connection:
+                connection.execute(text('SELECT 1'))
+        except SQLAlchemyError as e:
+            self.mark_down(name, e)
+            return False
+        with self._lock:
+            self._state[name] = [True, time.monotonic(), None]
+        return True
+
+    def mark_down(self, name, error):
+        with self._lock:
+            was_healthy = self._state[name][0]
+            self._state[name] = [False, time.monotonic(), str(error).splitlines()[0]]
+        if was_healthy:
+            current_app.logger.warning('Replikat %s ausgefallen, Lesezugriffe gehen an den Primary: %s',
+                                       name, error)
+
+    def _on_error(self, name, context):
+        # Verbindungsabbrüche und OperationalError (z.B. Datei/Server nicht erreichbar);
+        # ein fälschlich markiertes Replikat kommt mit der nächsten Prüfung zurück
+        if context.is_disconnect or isinstance(context.sqlalchemy_exception, OperationalError):
+            self.mark_down(name, context.original_exception)
+
+    def is_healthy(self, name):
+        healthy, checked_at, _ = self._state[name]
+        if time.monotonic() - checked_at >= self.check_interval:
+            return self.check(name)
+        return healthy
+
+    def pick(self):
+        """Name des nächsten gesunden Replikats (reihum) oder None."""
+        names = list(self.engines)
+        start = next(self._counter)
+        for offset in range(len(names)):
+            name = names[(start + offset) % len(names)]
+            if self.is_healthy(name):
+                return name
+        return None
+
+    def engine_for_request(self):
+        # Ein Replikat pro Request, damit alle Lesezugriffe denselben Stand sehen
+        if '_db_replica' not in g:
+            g._db_replica = self.pick()
+        return self.engines.get(g._db_replica)
+
+    def status(self):
+        with self._lock:
+            return {name: {'healthy': healthy, 'last_error': error}
+                    for name, (healthy, _, error) in self._state.items()}
+
+
+def get_replicas():
+    return current_app.extensions['replicas']
+
+
+# ----------------- Routing pro Request -----------------
+
+def _choose_route():
+    config = current_app.config
+    g._db_route = 'primary'
+    g.pop('_db_replica', None)
+    g.pop('_db_wrote', None)
+    if not get_replicas() or request.method not in ('GET', 'HEAD'):
+        return
+    if request.blueprint not in config['DB_REPLICA_BLUEPRINTS']:
+        return
+    # Nur vorhandene Sessions prüfen; anonyme Besucher ohne Cookie bekommen keines
+    if config['SESSION_COOKIE_NAME'] in request.cookies and session.get(STICKY_KEY, 0) > time.time():
+        return
+    g._db_route = 'replica'
+
+
+def use_primary():
+    """Der restliche Request liest vom Primary, z.B. für Antworten, die in einen geteilten Cache gehen.
+
+    Eine Seite vom nachhinkenden Replikat bliebe dort sonst bis zur nächsten Invalidierung
+    stehen, auch für Besucher, die gerade geschrieben haben.
+    """
+    g._db_route = 'primary'
+
+
+def read_from_replica():
+    """True, wenn der Request (bisher) von einem Replikat gelesen hat."""
+    return g.get('_db_replica') is not None
+
+
+def _remember_write(response):
+    # Nach einem Schreibzugriff eine Weile vom Primary lesen, bis die Replikate nachgezogen haben
+    if g.get('_db_wrote') and get_replicas():
+        session[STICKY_KEY] = time.time() + current_app.config['DB_REPLICA_STICKY_SECONDS']
+    return response
+
+
+def init_app(app):
+    from app import db
+    with app.app_context():
+        engines = {name: engine for name, engine in db.engines.items()
+                   if name and name.startswith(REPLICA_PREFIX)}
+    # Replikate haben keine eigenen Tabellen; ohne (leere) Metadaten lassen create_all()
+    # und drop_all() sie aus, auch in anderen Apps desselben Prozesses
+    for name in engines:
+        db.metadatas.pop(name, None)
+    app.extensions['replicas'] = ReplicaSet(engines, app.config['DB_REPLICA_CHECK_INTERVAL'])
+    app.before_request(_choose_route)
+    app.after_request(_remember_write)
@@ -0,0 +1,142 @@
+import os
+import click
+from flask.cli import AppGroup
+from flask_migrate import Migrate, upgrade as migrate_upgrade, stamp as migrate_stamp
+from sqlalchemy.schema import CreateColumn
+from app import db
+from app.models import Post, User
+from app.search import ensure_search_schema
+
+schema_cli = AppGroup('schema', help='Verwaltung des Datenbankschemas und der Startdaten.')
+migrate = Migrate()
+
+# Alembic-Migrationen liegen neben dem Paket, unabhängig vom Arbeitsverzeichnis
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+# Beispielbeitrag für eine leere Datenbank
+SAMPLE_POST = dict(
+    title='Erster Prototypen-Update',
+    content='Heute haben wir mit dem Bau des Hauptrahmens begonnen. Es läuft gut!',
+    image_file='prototype_1.jpg',  # Hier den echten Dateinamen rein
+)
+DEFAULT_ADMIN_EMAIL = 'admin@nautilus.com'
+
+# Datenkorrekturen nach dem Hinzufügen neuer Spalten: (Tabelle, Spalte, SQL)
+BACKFILLS = [
+    ('post', 'updated_at', 'UPDATE post SET updated_at = created_at WHERE updated_at IS NULL'),
+]
+
+
+def upgrade_schema(engine=None):
+    """Ergänzt fehlende Spalten und Indizes in bestehenden Tabellen.
+
+    db.create_all() legt nur neue Tabellen an; neue Spalten an vorhandenen
+    Tabellen werden hier per ALTER TABLE nachgezogen. Gibt die Liste der
+    hinzugefügten Spalten ('tabelle.spalte') zurück.
+    """
+    engine = engine or db.engine
+    inspector = db.inspect(engine)
+    added = []
+
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                table_name = engine.dialect.identifier_preparer.format_table(table)
+                column_ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                conn.execute(db.text(f'ALTER TABLE {table_name} ADD COLUMN {column_ddl}'))
+                added.append(f'{table.name}.{column.name}')
+
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+        for table_name, column_name, statement in BACKFILLS:
+            if f'{table_name}.{column_name}' in added:
+                conn.execute(db.text(statement))
+
+    return added
+
+
+def include_in_migrations(name, type_, parent_names):
+    """Filter für Alembic: Tabellen des Suchindex (post_fts*) verwaltet app/search.py selbst."""
+    return not (type_ == 'table' and name.startswith('post_fts'))
+
+
+def is_unversioned(engine=None):
+    """True für Datenbanken, die noch vor den Migrationen mit db.create_all() angelegt wurden."""
+    inspector = db.inspect(engine or db.engine)
+    return inspector.has_table('post') and not inspector.has_table('alembic_version')
+
+
+def upgrade_database():
+    """Bringt die Datenbank auf die neueste Migration und legt den Suchindex an.
+
+    Eine Datenbank ohne Versionstabelle wird zuerst per upgrade_schema() an die
+    Modelle angeglichen und dann als aktuell markiert. Gibt die dabei
+    nachgezogenen Spalten zurück.
+    """
+    added = []
+    if is_unversioned():
+        db.create_all()
+        added = upgrade_schema()
+        migrate_stamp(revision='head')
+    else:
+        migrate_upgrade()
+    # FTS5-Tabelle bzw. FULLTEXT-Index hängen vom Datenbanksystem ab und stehen nicht in den Migrationen
+    ensure_search_schema()
+    return added
+
+
+def seed_database(admin_password=None):
+    """Legt Admin und Beispielbeitrag an, sofern es noch keine gibt. Gibt die neuen Objekte zurück."""
+    created = []
+    admin_user = User.query.filter_by(is_admin=True).first()
+    if admin_user is None and admin_password:
+        admin_user = User(email=DEFAULT_ADMIN_EMAIL, is_admin=True)
+        admin_user.set_password(admin_password)
+        db.session.add(admin_user)
+        created.append(admin_user)
+    if not db.session.query(Post.id).first():
+        db.session.flush()
+        post = Post(user_id=admin_user.id if admin_user else None, **SAMPLE_POST)
+        db.session.add(post)
+        created.append(post)
+    db.session.commit()
+    return created
+
+
+@schema_cli.command('upgrade')
+def upgrade_command():
+    """Führt ausstehende Migrationen aus (beim Deploy einmal, nicht pro Worker)."""
+    for name in upgrade_database():
+        click.echo(f'Spalte hinzugefügt: {name}')
+    click.echo('Schema ist aktuell.')
+
+
+@schema_cli.command('seed')
+@click.option('--admin-password', envvar='ADMIN_INIT_PASSWORD', default=None,
+              help='Passwort für den Standard-Admin (Standard: ADMIN_INIT_PASSWORD).')
+def seed_command(admin_password):
+    """Legt Standard-Admin und Beispielbeitrag an, falls noch nicht vorhanden."""
+    created = seed_database(admin_password)
+    for obj in created:
+        if isinstance(obj, User):
+            click.echo(f'Standard-Admin-Benutzer hinzugefügt: {obj.email}')
+            click.echo('BITTE ÄNDERE DAS PASSWORT IM NÄCHSTEN SCHRITT!')
+        elif isinstance(obj, Post):
+            click.echo(f'Beispielbeitrag hinzugefügt: {obj.title}')
+    if not User.query.filter_by(is_admin=True).first():
+        # Wichtiger Hinweis bei fehlendem Passwort
+        click.echo('!!! SICHERHEITS-WARNUNG: ADMIN_INIT_PASSWORD fehlt. Es wurde kein Admin erstellt. !!!')
+    elif not created:
+        click.echo('Startdaten sind bereits vorhanden.')
+
+
+def init_app(app):
+    # Stellt die Befehle 'flask db migrate|upgrade|downgrade|...' bereit
+    migrate.init_app(app, db, directory=MIGRATIONS_DIR, render_as_batch=True, include_name=include_in_migrations)
+    app.cli.add_command(schema_cli)
@@ -0,0 +1,415 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from markupsafe import Markup, escape
+from app import db
+from app.models import Post
+from app.signals import post_changed, posts_imported
+
+search_cli = AppGroup('search', help='Verwaltung des Volltext-Index.')
+
+# Tokenisierung für Anfragen und den Python-Index (Unicode-Wortzeichen, Kleinschreibung)
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Gewichtung: Treffer im Titel zählen stärker als im Inhalt
+TITLE_WEIGHT = 10.0
+CONTENT_WEIGHT = 1.0
+
+SNIPPET_LENGTH = 200
+
+
+def tokenize(text):
+    return [token.lower() for token in TOKEN_RE.findall(text or '')]
+
+
+class SearchHit:
+    """Ein Suchtreffer für das Template; title und snippet sind bereits escaped + markiert."""
+
+    def __init__(self, post_id, title, snippet, created_at, score):
+        self.id = post_id
+        self.title = title
+        self.snippet = snippet
+        self.created_at = created_at
+        self.score = score
+
+
+def _mark(text, start_marker='\x02', end_marker='\x03'):
+    # Erst escapen, dann die Marker in <mark> umwandeln: so entsteht nie ungeprüftes HTML
+    escaped = str(escape(text))
+    return Markup(escaped.replace(start_marker, '<mark>').replace(end_marker, '</mark>'))
+
+
+def highlight(text, tokens, length=None):
+    """Markiert Tokens (auch als Präfix) in `text`; mit `length` wird ein Ausschnitt gebildet."""
+    text = text or ''
+    if not tokens:
+        return escape(text[:length] if length else text)
+    pattern = re.compile(r'\b(' + '|'.join(re.escape(t) for t in tokens) + r')\w*', re.IGNORECASE | re.UNICODE)
+
+    if length and len(text) > length:
+        match = pattern.search(text)
+        start = max((match.start() if match else 0) - length // 4, 0)
+        excerpt = text[start:start + length]
+        text = ('…' if start > 0 else '') + excerpt + ('…' if start + length < len(text) else '')
+    return _mark(pattern.sub(lambda m: '\x02' + m.group(0) + '\x03', text))
+
+
+# ----------------- Backends -----------------
+
+class SQLiteFTSBackend:
+    """SQLite FTS5: eigene virtuelle Tabelle post_fts mit rowid = Post.id."""
+
+    name = 'sqlite'
+
+    def __init__(self, rank_window=2000):
+        self.rank_window = rank_window
+
+    def ensure_schema(self):
+        exists = db.session.execute(
+            db.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'post_fts'")
+        ).first()
+        if not exists:
+            db.session.execute(db.text(
+                "CREATE VIRTUAL TABLE post_fts USING fts5(title, content, tokenize = 'unicode61 remove_diacritics 2')"
+            ))
+            db.session.commit()
+            self.reindex()
+
+    def index_post(self, post):
+        db.session.execute(db.text('DELETE FROM post_fts WHERE rowid = :id'), {'id': post.id})
+        db.session.execute(db.text('INSERT INTO post_fts (rowid, title, content) VALUES (:id, :title, :content)'),
+                           {'id': post.id, 'title': post.title, 'content': post.content})
+        db.session.commit()
+
+    def remove_post(self, post_id):
+        db.session.execute(db.text('DELETE FROM post_fts WHERE rowid = :id'), {'id': post_id})
+        db.session.commit()
+
+    def index_posts(self, post_ids):
+        # Ein Statement pro Batch statt eines Commits pro Beitrag (Massenimport)
+        params = {'ids': list(post_ids)}
+        db.session.execute(db.text('DELETE FROM post_fts WHERE rowid IN :ids')
+                           .bindparams(db.bindparam('ids', expanding=True)), params)
+        db.session.execute(db.text('INSERT INTO post_fts (rowid, title, content) '
+                                   'SELECT id, title, content FROM post WHERE id IN :ids')
+                           .bindparams(db.bindparam('ids', expanding=True)), params)
+        db.session.commit()
+
+    def reindex(self):
+        db.session.execute(db.text('DELETE FROM post_fts'))
+        db.session.execute(db.text('INSERT INTO post_fts (rowid, title, content) SELECT id, title, content FROM post'))
+        # Segmente zusammenführen, damit Abfragen nicht über viele kleine B-Bäume laufen
+        db.session.execute(db.text("INSERT INTO post_fts (post_fts) VALUES ('optimize')"))
+        db.session.commit()
+
+    def search(self, query, limit):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # Jedes Token als Phrase quoten (keine FTS-Syntax aus Benutzereingaben), letztes als Präfix
+        params = {'match': ' '.join(f'"{t}"' for t in tokens[:-1]) + f' "{tokens[-1]}"*'}
+
+        # 1. Rangfolge nur innerhalb der neuesten `rank_window` Treffer berechnen: die
+        #    Grenze liefert FTS5 über die rowid-Reihenfolge ohne Bewertung aller Treffer.
+        params['offset'] = self.rank_window - 1
+        cutoff = db.session.execute(db.text(
+            "SELECT rowid FROM post_fts WHERE post_fts MATCH :match ORDER BY rowid DESC LIMIT 1 OFFSET :offset"
+        ), params).scalar()
+
+        # 2. BM25 (Titel stärker gewichtet) über das Fenster
+        params.update(tw=TITLE_WEIGHT, cw=CONTENT_WEIGHT, limit=limit, cutoff=cutoff or 0)
+        ranked = db.session.execute(db.text(
+            "SELECT rowid, bm25(post_fts, :tw, :cw) AS score FROM post_fts "
+            "WHERE post_fts MATCH :match AND rowid >= :cutoff ORDER BY score LIMIT :limit"
+        ), params).all()
+        if not ranked:
+            return []
+
+        # 3. Titel/Ausschnitt nur für die angezeigten Treffer laden und markieren
+        scores = {row.rowid: -row.score for row in ranked}
+        rows = db.session.execute(
+            db.select(Post.id, Post.title, Post.content, Post.created_at).where(Post.id.in_(list(scores)))
+        )
+        hits = [SearchHit(row.id, highlight(row.title, tokens), highlight(row.content, tokens, SNIPPET_LENGTH),
+                          row.created_at, scores[row.id])
+                for row in rows]
+        return sorted(hits, key=lambda hit: -hit.score)
+
+
+class MySQLFullTextBackend:
+    """MySQL/MariaDB: FULLTEXT-Index direkt auf post(title, content), wird von der DB gepflegt."""
+
+    name = 'mysql'
+    index_name = 'ft_post_title_content'
+
+    def ensure_schema(self):
+        indexes = db.inspect(db.engine).get_indexes('post')
+        if not any(index['name'] == self.index_name for index in indexes):
+            db.session.execute(db.text(f'ALTER TABLE post ADD FULLTEXT INDEX {self.index_name} (title, content)'))
+            db.session.commit()
+
+    def index_post(self, post):
+        pass
+
+    def index_posts(self, post_ids):
+        pass
+
+    def remove_post(self, post_id):
+        pass
+
+    def reindex(self):
+        db.session.execute(db.text('OPTIMIZE TABLE post'))
+
+    def search(self, query, limit):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # Boolean Mode: alle Tokens müssen vorkommen, das letzte auch als Präfix
+        against = ' '.join(f'+{t}' for t in tokens[:-1]) + f' +{tokens[-1]}*'
+        rows = db.session.execute(db.text(
+            "SELECT id, title, content, created_at, "
+            "MATCH(title, content) AGAINST(:q IN BOOLEAN MODE) AS score "
+            "FROM post WHERE MATCH(title, content) AGAINST(:q IN BOOLEAN MODE) "
+            "ORDER BY score DESC LIMIT :limit"
+        ).columns(id=db.Integer, title=db.String, content=db.Text, created_at=db.DateTime, score=db.Float),
+            {'q': against, 'limit': limit})
+        return [SearchHit(row.id, highlight(row.title, tokens), highlight(row.content, tokens, SNIPPET_LENGTH),
+                          row.created_at, row.score)
+                for row in rows]
+
+
+class InvertedIndexBackend:
+    """Reiner Python-Index (BM25) für Datenbanken ohne eigene Volltextsuche.
+
+    Der Index liegt im Speicher jedes Prozesses. Über (Anzahl, max(updated_at))
+    erkennt ein Prozess - höchstens alle `state_check_interval` Sekunden -, dass
+    ein anderer Worker Beiträge geändert hat, und baut dann neu auf; im eigenen
+    Prozess wird inkrementell aktualisiert.
+    """
+
+    name = 'memory'
+    k1 = 1.2
+    b = 0.75
+    state_check_interval = 5
+
+    def __init__(self, rank_window=2000):
+        self.rank_window = rank_window
+        self._lock = threading.RLock()
+        self._postings = defaultdict(dict)   # token -> {post_id: gewichtete Häufigkeit}
+        self._docs = {}                      # post_id -> (title, content, created_at, länge, tokens)
+        self._vocabulary = []                # sortierte Tokens für Präfix-Suche per bisect
+        self._total_length = 0
+        self._state = None
+        self._state_checked_at = 0
+
+    def _db_state(self):
+        # count(*) darf einen schmalen Index statt der Tabelle (mit Text-Spalten) lesen
+        return tuple(db.session.execute(db.select(db.func.count(), db.func.max(Post.updated_at)).select_from(Post)).one())
+
+    def ensure_schema(self):
+        pass
+
+    def _add(self, post_id, title, content, created_at, keep_sorted=True):
+        weights = Counter()
+        for token in tokenize(title):
+            weights[token] += TITLE_WEIGHT
+        for token in tokenize(content):
+            weights[token] += CONTENT_WEIGHT
+        length = sum(weights.values())
+        for token, weight in weights.items():
+            if keep_sorted and token not in self._postings:
+                bisect.insort(self._vocabulary, token)
+            self._postings[token][post_id] = weight
+        self._docs[post_id] = (title, content, created_at, length, set(weights))
+        self._total_length += length
+
+    def _remove(self, post_id):
+        doc = self._docs.pop(post_id, None)
+        if doc is None:
+            return
+        for token in doc[4]:
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(post_id, None)
+                if not postings:
+                    del self._postings[token]
+                    del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+        self._total_length -= doc[3]
+
+    def index_post(self, post):
+        with self._lock:
+            if self._state is None:
+                # Noch nicht aufgebaut: passiert vollständig bei der ersten Suche
+                return
+            self._remove(post.id)
+            self._add(post.id, post.title, post.content, post.created_at)
+            self._state = self._db_state()
+
+    def index_posts(self, post_ids):
+        with self._lock:
+            if self._state is None:
+                return
+            rows = db.session.execute(db.select(Post.id, Post.title, Post.content, Post.created_at)
+                                      .where(Post.id.in_(list(post_ids))))
+            for row in rows:
+                self._remove(row.id)
+                self._add(row.id, row.title, row.content, row.created_at, keep_sorted=False)
+            self._vocabulary = sorted(self._postings)
+            self._state = self._db_state()
+
+    def remove_post(self, post_id):
+        with self._lock:
+            if self._state is None:
+                return
+            self._remove(post_id)
+            self._state = self._db_state()
+
+    def reindex(self):
+        with self._lock:
+            self._postings.clear()
+            self._docs.clear()
+            self._vocabulary.clear()
+            self._total_length = 0
+            rows = db.session.execute(db.select(Post.id, Post.title, Post.content, Post.created_at))
+            for row in rows.yield_per(1000):
+                self._add(row.id, row.title, row.content, row.created_at, keep_sorted=False)
+            self._vocabulary = sorted(self._postings)
+            self._state = self._db_state()
+
+    def _prefix_terms(self, prefix):
+        i = bisect.bisect_left(self._vocabulary, prefix)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(prefix):
+            yield self._vocabulary[i]
+            i += 1
+
+    def search(self, query, limit):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self._lock:
+            now = time.monotonic()
+            if self._state is None or now - self._state_checked_at > self.state_check_interval:
+                self._state_checked_at = now
+                if self._state != self._db_state():
+                    self.reindex()
+            n = len(self._docs)
+            if not n:
+                return []
+            avg_length = self._total_length / n
+
+            # Alle Tokens müssen vorkommen; das letzte Token darf ein Präfix sein
+            candidates = None
+            term_postings = []
+            for i, token in enumerate(tokens):
+                if i == len(tokens) - 1:
+                    merged = {}
+                    for term in self._prefix_terms(token):
+                        for post_id, weight in self._postings[term].items():
+                            merged[post_id] = merged.get(post_id, 0) + weight
+                    postings = merged
+                else:
+                    postings = self._postings.get(token, {})
+                term_postings.append(postings)
+                ids = set(postings)
+                candidates = ids if candidates is None else candidates & ids
+                if not candidates:
+                    return []
+
+            # Wie bei FTS5: nur die neuesten `rank_window` Treffer bewerten
+            if len(candidates) > self.rank_window:
+                candidates = heapq.nlargest(self.rank_window, candidates)
+
+            scores = {}
+            for postings in term_postings:
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for post_id in candidates:
+                    tf = postings[post_id]
+                    norm = tf + self.k1 * (1 - self.b + self.b * self._docs[post_id][3] / avg_length)
+                    scores[post_id] = scores.get(post_id, 0) + idf * tf * (self.k1 + 1) / norm
+
+            best = heapq.nsmallest(limit, scores, key=lambda post_id: (-scores[post_id], -post_id))
+            return [SearchHit(post_id, highlight(self._docs[post_id][0], tokens),
+                              highlight(self._docs[post_id][1], tokens, SNIPPET_LENGTH),
+                              self._docs[post_id][2], scores[post_id])
+                    for post_id in best]
+
+
+def _sqlite_has_fts5():
+    try:
+        with db.engine.connect() as conn:
+            return conn.execute(db.text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar() == 1
+    except Exception:
+        return False
+
+
+def make_backend(app):
+    backend = app.config['SEARCH_BACKEND']
+    if backend == 'auto':
+        dialect = db.engine.dialect.name
+        if dialect == 'sqlite' and _sqlite_has_fts5():
+            backend = 'sqlite'
+        elif dialect in ('mysql', 'mariadb'):
+            backend = 'mysql'
+        else:
+            backend = 'memory'
+    if backend == 'sqlite':
+        return SQLiteFTSBackend(app.config['SEARCH_RANK_WINDOW'])
+    if backend == 'mysql':
+        return MySQLFullTextBackend()
+    if backend == 'memory':
+        return InvertedIndexBackend(app.config['SEARCH_RANK_WINDOW'])
+    raise ValueError(f'Unbekanntes SEARCH_BACKEND: {backend}')
+
+
+def get_search_backend():
+    app = current_app._get_current_object()
+    backend = app.extensions.get('search')
+    if backend is None:
+        # Die Auswahl benötigt die Engine, daher erst beim ersten Zugriff im App-Kontext
+        backend = app.extensions['search'] = make_backend(app)
+    return backend
+
+
+def search_posts(query, limit=20):
+    return get_search_backend().search(query, limit)
+
+
+def ensure_search_schema():
+    get_search_backend().ensure_schema()
+
+
+def _sync_on_post_change(app, post_id, action, **extra):
+    # Wird im Request der Admin-Route gesendet, ein App-Kontext ist also vorhanden
+    backend = get_search_backend()
+    if action == 'deleted':
+        backend.remove_post(post_id)
+    else:
+        post = db.session.get(Post, post_id)
+        if post is not None:
+            backend.index_post(post)
+
+
+@search_cli.command('reindex')
+def reindex_command():
+    """Baut den Volltext-Index aus der Post-Tabelle neu auf."""
+    backend = get_search_backend()
+    backend.ensure_schema()
+    backend.reindex()
+    click.echo(f'Suchindex ({backend.name}) neu aufgebaut.')
+
+
+def _sync_on_posts_imported(app, post_ids, **extra):
+    get_search_backend().index_posts(post_ids)
+
+
+def init_app(app):
+    app.cli.add_command(search_cli)
+    post_changed.connect(_sync_on_post_change)
+    posts_imported.connect(_sync_on_posts_imported)
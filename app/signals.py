@@ -0,0 +1,19 @@
+from blinker import Namespace
+
+_signals = Namespace()
+
+# Wird von den Admin-CRUD-Routen nach jedem Commit gesendet.
+# Sender ist die App, Argumente: post_id, action ('created' | 'updated' | 'deleted')
+post_changed = _signals.signal('post-changed')
+
+# Wird vom Massenimport (app/bulk.py) nach jedem Batch-Commit gesendet statt post_changed je Beitrag.
+# Sender ist die App, Argument: post_ids (Liste der neu angelegten Beiträge)
+posts_imported = _signals.signal('posts-imported')
+
+# Wird von storage.store() nach jedem Upload gesendet.
+# Sender ist die App, Argumente: key, size (Bytes), created (False = Inhalt war schon vorhanden)
+upload_stored = _signals.signal('upload-stored')
+
+# Wird vom Seiten-Cache bei jeder GET-Anfrage gesendet.
+# Sender ist die App, Argument: result ('hit' | 'miss' | 'bypass')
+page_cache_lookup = _signals.signal('page-cache-lookup')
@@ -0,0 +1,92 @@
+// Lädt das Beitragsbild vor dem Absenden in Teilen hoch (fortsetzbar, siehe /admin/uploads).
+// Ohne JavaScript bleibt es beim normalen Datei-Upload im Formular.
+(function () {
+    'use strict';
+
+    const form = document.querySelector('form[data-upload-url]');
+    if (!form || !window.fetch) {
+        return;
+    }
+    const input = form.querySelector('input[type="file"][name="image"]');
+    const keyField = form.querySelector('input[name="image_key"]');
+    const status = form.querySelector('[data-upload-status]');
+    const MAX_RETRIES = 5;
+
+    async function send(url, options) {
+        const response = await fetch(url, Object.assign({credentials: 'same-origin'}, options));
+        const body = await response.json().catch(() => ({}));
+        body.status = response.status;
+        return body;
+    }
+
+    function sleep(ms) {
+        return new Promise((resolve) => setTimeout(resolve, ms));
+    }
+
+    function showProgress(offset, size) {
+        status.textContent = 'Bild wird hochgeladen: ' + Math.floor(offset * 100 / size) + ' %';
+    }
+
+    async function uploadFile(file) {
+        const session = await send(form.dataset.uploadUrl, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({filename: file.name, size: file.size})
+        });
+        if (session.status !== 201) {
+            throw new Error(session.error || 'Upload fehlgeschlagen.');
+        }
+        const url = form.dataset.uploadUrl + '/' + session.id;
+        let offset = 0;
+        let failures = 0;
+
+        for (;;) {
+            let result;
+            try {
+                result = await send(url, {
+                    method: 'PUT',
+                    headers: {'Upload-Offset': String(offset), 'Content-Type': 'application/octet-stream'},
+                    body: file.slice(offset, offset + session.chunk_size)
+                });
+            } catch (networkError) {
+                result = {status: 0};
+            }
+
+            if (result.status === 200) {
+                failures = 0;
+                offset = result.offset;
+                showProgress(offset, file.size);
+                if (result.key) {
+                    return result.key;
+                }
+            } else if (result.status === 0 || result.status === 409 || result.status >= 500) {
+                // Verbindung abgebrochen oder Offset veraltet: Stand abfragen und dort weitermachen
+                if (++failures > MAX_RETRIES) {
+                    throw new Error('Upload abgebrochen, bitte erneut versuchen.');
+                }
+                await sleep(1000 * failures);
+                const state = await send(url, {method: 'GET'}).catch(() => ({status: 0}));
+                if (state.status === 200) {
+                    offset = state.offset;
+                }
+            } else {
+                throw new Error(result.error || 'Upload fehlgeschlagen.');
+            }
+        }
+    }
+
+    form.addEventListener('submit', async function (event) {
+        if (!input.files.length || keyField.value) {
+            return;
+        }
+        event.preventDefault();
+        try {
+            keyField.value = await uploadFile(input.files[0]);
+            // Die Datei nicht noch einmal mit dem Formular senden
+            input.value = '';
+            form.requestSubmit();
+        } catch (error) {
+            status.textContent = error.message;
+        }
+    });
+})();
@@ -0,0 +1,29 @@
+// Öffentliche Seiten sind für alle Besucher gleich (Cache im Reverse-Proxy/CDN).
+// Navigation und Flash-Meldungen des Besuchers kommen danach von /fragments/user.
+(function () {
+    'use strict';
+
+    const nav = document.getElementById('user-nav');
+    if (!nav || !nav.dataset.fragment || !window.fetch) {
+        return;
+    }
+
+    async function load() {
+        const response = await fetch(nav.dataset.fragment, {
+            credentials: 'same-origin',
+            headers: {'Accept': 'application/json'}
+        });
+        // 204: anonymer Besucher ohne Meldungen, die Seite bleibt wie sie ist
+        if (response.status !== 200) {
+            return;
+        }
+        const fragment = await response.json();
+        nav.innerHTML = fragment.nav;
+        const flashes = document.getElementById('flash-messages');
+        if (flashes) {
+            flashes.innerHTML = fragment.flashes;
+        }
+    }
+
+    load().catch(() => {});
+})();
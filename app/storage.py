@@ -0,0 +1,352 @@
+import hashlib
+import mimetypes
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+import click
+from flask import current_app, redirect, url_for
+from flask.cli import AppGroup
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import safe_join
+from app import db
+from app.assets import send_asset
+from app.models import Post, Upload
+from app.signals import upload_stored
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError
+except ImportError:  # Nur für STORAGE_BACKEND='s3' erforderlich
+    boto3 = None
+
+storage_cli = AppGroup('storage', help='Verwaltung der hochgeladenen Dateien.')
+
+
+def _utcnow():
+    # Naive UTC-Zeit, passend zu den DateTime-Spalten (SQLite speichert ohne Zeitzone)
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# ----------------- Backends -----------------
+
+class LocalStorage:
+    """Dateien im UPLOAD_FOLDER; Schlüssel sind relative Pfade wie 'abc.jpg' oder 'resized/abc_thumb.jpg'."""
+
+    name = 'local'
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, key):
+        path = safe_join(self.root, key)
+        if path is None:
+            raise ValueError(f'Ungültiger Schlüssel: {key}')
+        return path
+
+    def temp_dir(self):
+        # Auf demselben Dateisystem wie das Ziel, damit das Verschieben atomar bleibt
+        path = os.path.join(self.root, '.tmp')
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def put(self, key, source_path):
+        """Übernimmt die Datei unter source_path (sie wird verschoben)."""
+        target = self.path(key)
+        if os.path.abspath(source_path) == os.path.abspath(target):
+            return
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(source_path, target)
+
+    def exists(self, key):
+        return os.path.isfile(self.path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def keys(self):
+        """(Schlüssel, Änderungszeit) aller Originale; Unterordner wie 'resized' zählen nicht dazu."""
+        for entry in os.scandir(self.root):
+            if entry.is_file():
+                yield entry.name, entry.stat().st_mtime
+
+    @contextmanager
+    def local_copy(self, key):
+        path = self.path(key)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(path)
+        yield path
+
+    def public_url(self, key):
+        return None
+
+    def serve(self, key):
+        # Derselbe Schlüssel hat immer denselben Inhalt, daher als unveränderlich ausliefern
+        return send_asset(self.root, key, immutable=True,
+                          accel_prefix=current_app.config['X_ACCEL_UPLOADS_PREFIX'])
+
+
+class S3Storage:
+    """S3-kompatibler Objektspeicher (AWS, MinIO, ...). Zugangsdaten liest boto3 aus den AWS_*-Variablen."""
+
+    name = 's3'
+
+    def __init__(self, bucket, prefix='', endpoint_url=None, region=None, public_url=None):
+        if boto3 is None:
+            raise RuntimeError("STORAGE_BACKEND='s3' benötigt das Paket 'boto3'.")
+        self.client = boto3.client('s3', endpoint_url=endpoint_url, region_name=region)
+        self.bucket = bucket
+        self.prefix = prefix
+        self.public_base = public_url.rstrip('/') if public_url else None
+        # Bekannte Schlüssel, spart HEAD-Anfragen beim Rendern (Inhalte ändern sich nie)
+        self._known = set()
+        self._lock = threading.Lock()
+
+    def _object_key(self, key):
+        return self.prefix + key
+
+    @staticmethod
+    def _is_missing(error):
+        return error.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound')
+
+    def temp_dir(self):
+        return None
+
+    def put(self, key, source_path):
+        self.client.upload_file(source_path, self.bucket, self._object_key(key), ExtraArgs={
+            'ContentType': mimetypes.guess_type(key)[0] or 'application/octet-stream',
+            'CacheControl': f"public, max-age={current_app.config['ASSET_MAX_AGE']}, immutable",
+        })
+        os.remove(source_path)
+        with self._lock:
+            self._known.add(key)
+
+    def exists(self, key):
+        if key in self._known:
+            return True
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except ClientError as e:
+            if self._is_missing(e):
+                return False
+            raise
+        with self._lock:
+            self._known.add(key)
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            self._known.discard(key)
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+    def keys(self):
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix, Delimiter='/'):
+            for obj in page.get('Contents', []):
+                yield obj['Key'][len(self.prefix):], obj['LastModified'].timestamp()
+
+    @contextmanager
+    def local_copy(self, key):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, os.path.basename(key))
+            try:
+                self.client.download_file(self.bucket, self._object_key(key), path)
+            except ClientError as e:
+                if self._is_missing(e):
+                    raise FileNotFoundError(key) from e
+                raise
+            yield path
+
+    def public_url(self, key):
+        if self.public_base:
+            return f'{self.public_base}/{self._object_key(key)}'
+        return None
+
+    def serve(self, key):
+        # Privater Bucket: kurzlebige signierte URL, erzeugt erst beim Abruf (nicht im gecachten HTML)
+        return redirect(self.client.generate_presigned_url(
+            'get_object', Params={'Bucket': self.bucket, 'Key': self._object_key(key)}, ExpiresIn=3600))
+
+
+def make_backend(config):
+    backend = config['STORAGE_BACKEND']
+    if backend == 'local':
+        return LocalStorage(config['UPLOAD_FOLDER'])
+    if backend == 's3':
+        return S3Storage(config['S3_BUCKET'], prefix=config['S3_PREFIX'], endpoint_url=config['S3_ENDPOINT_URL'],
+                         region=config['S3_REGION'], public_url=config['S3_PUBLIC_URL'])
+    raise ValueError(f'Unbekanntes STORAGE_BACKEND: {backend}')
+
+
+def get_storage():
+    return current_app.extensions['storage']
+
+
+def upload_url(key):
+    return get_storage().public_url(key) or url_for('uploaded_file', key=key)
+
+
+# ----------------- Inhaltsadressiertes Speichern mit Referenzzählung -----------------
+
+def _stream_to_temp(stream, temp_dir, chunk_size, validate=None):
+    """Schreibt den Upload blockweise in eine temporäre Datei und hasht dabei mit.
+
+    validate(erster_block) kann den Upload abweisen, bevor mehr gelesen wird.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=temp_dir, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = stream.read(chunk_size)
+                if validate is not None and size == 0:
+                    validate(chunk)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return temp_path, digest.hexdigest(), size
+
+
+def store(stream, ext, validate=None):
+    """Speichert einen Upload unter SHA-256 + Endung und gibt den Schlüssel zurück.
+
+    Identische Inhalte werden nur einmal abgelegt. Der Aufrufer verknüpft den
+    Schlüssel per acquire() und committet; bis dahin hat die Datei den
+    Referenzzähler 0 und wird erst nach STORAGE_GC_GRACE aufgeräumt.
+    """
+    storage = get_storage()
+    temp_path, digest, size = _stream_to_temp(stream, storage.temp_dir(), current_app.config['UPLOAD_CHUNK_SIZE'],
+                                              validate)
+    key = digest + ext.lower()
+    try:
+        # Das UPDATE sperrt die Zeile bis zum Commit, eine parallele collect() wartet darauf
+        created = not db.session.execute(
+            db.update(Upload).where(Upload.key == key).values(touched_at=_utcnow())
+        ).rowcount
+        if created:
+            try:
+                with db.session.begin_nested():
+                    db.session.add(Upload(key=key, size=size, refcount=0, touched_at=_utcnow()))
+            except IntegrityError:
+                # Gleichzeitig von einem anderen Request angelegt
+                created = False
+        if created or not storage.exists(key):
+            storage.put(key, temp_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    upload_stored.send(current_app._get_current_object(), key=key, size=size, created=created)
+    return key
+
+
+def acquire(key):
+    """Ein Beitrag verweist ab jetzt auf die Datei (gleiche Transaktion wie die Beitragsänderung)."""
+    db.session.execute(
+        db.update(Upload).where(Upload.key == key).values(refcount=Upload.refcount + 1, touched_at=_utcnow())
+    )
+
+
+def release(key):
+    """Ein Beitrag verweist nicht mehr auf die Datei; gelöscht wird erst über collect()."""
+    db.session.execute(
+        db.update(Upload).where(Upload.key == key, Upload.refcount > 0)
+        .values(refcount=Upload.refcount - 1, touched_at=_utcnow())
+    )
+
+
+def collect(key):
+    """Löscht Datei und Derivate, wenn nichts mehr darauf verweist. Gibt True zurück, wenn gelöscht."""
+    from app.images import derivative_keys
+
+    # Zeile zuerst löschen: die Sperre hält ein paralleles store() derselben Datei bis zum Commit auf
+    deleted = db.session.execute(
+        db.delete(Upload).where(Upload.key == key, Upload.refcount == 0)
+    ).rowcount
+    still_known = not deleted and db.session.scalar(db.select(Upload.key).where(Upload.key == key)) is not None
+    # Dateien aus der Zeit vor der Referenzzählung haben keine Zeile, daher zusätzlich die Beiträge prüfen
+    if still_known or db.session.scalar(
+            db.select(db.func.count()).select_from(Post).where(Post.image_file == key)):
+        db.session.rollback()
+        return False
+
+    storage = get_storage()
+    try:
+        storage.delete(key)
+        for derivative in derivative_keys(key):
+            storage.delete(derivative)
+    except Exception:
+        db.session.rollback()
+        raise
+    db.session.commit()
+    return True
+
+
+def garbage(grace_seconds):
+    """Schlüssel aller Dateien, auf die seit mindestens grace_seconds nichts mehr verweist."""
+    cutoff = _utcnow() - timedelta(seconds=grace_seconds)
+    keys = set(db.session.scalars(
+        db.select(Upload.key).where(Upload.refcount == 0, Upload.touched_at < cutoff)))
+
+    # Verwaiste Dateien ohne Upload-Zeile (z.B. Altbestand mit uuid-Namen)
+    known = set(db.session.scalars(db.select(Upload.key)))
+    referenced = set(db.session.scalars(db.select(Post.image_file).distinct()))
+    cutoff_ts = cutoff.replace(tzinfo=timezone.utc).timestamp()
+    for key, mtime in get_storage().keys():
+        if key not in known and key not in referenced and mtime < cutoff_ts:
+            keys.add(key)
+    return sorted(keys)
+
+
+# ----------------- Auslieferung und CLI -----------------
+
+def serve_upload(key):
+    return get_storage().serve(key)
+
+
+@storage_cli.command('gc')
+@click.option('--grace', type=int, default=None, help='Schonfrist in Sekunden (Standard: STORAGE_GC_GRACE).')
+@click.option('--dry-run', is_flag=True, help='Nur anzeigen, nichts löschen.')
+def gc_command(grace, dry_run):
+    """Löscht hochgeladene Dateien, auf die kein Beitrag mehr verweist."""
+    grace = current_app.config['STORAGE_GC_GRACE'] if grace is None else grace
+    removed = 0
+    for key in garbage(grace):
+        if dry_run:
+            click.echo(f'Würde löschen: {key}')
+        elif collect(key):
+            click.echo(f'Gelöscht: {key}')
+            removed += 1
+    if not dry_run:
+        click.echo(f'{removed} Datei(en) gelöscht.')
+        # Abgebrochene Uploads in Teilen (siehe app/uploads.py)
+        from app.uploads import get_upload_sessions
+        purged = get_upload_sessions().purge(current_app.config['UPLOAD_SESSION_TTL'])
+        if purged:
+            click.echo(f'{purged} abgebrochene(r) Upload(s) verworfen.')
+
+
+@storage_cli.command('recount')
+def recount_command():
+    """Setzt die Referenzzähler anhand der Beiträge neu (z.B. nach manuellen DB-Änderungen)."""
+    references = (db.select(db.func.count()).select_from(Post)
+                  .where(Post.image_file == Upload.key).scalar_subquery())
+    db.session.execute(db.update(Upload).values(refcount=references))
+    db.session.commit()
+    click.echo('Referenzzähler aktualisiert.')
+
+
+def init_app(app):
+    app.extensions['storage'] = make_backend(app.config)
+    app.add_url_rule('/uploads/<path:key>', 'uploaded_file', serve_upload)
+    app.cli.add_command(storage_cli)
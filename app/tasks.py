@@ -0,0 +1,265 @@
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import click
+from flask import after_this_request, current_app, has_request_context
+from app import db
+from app.models import Job
+from app.profiler import profiled
+
+# Registry aller Job-Typen: Name -> Funktion(**payload)
+TASKS = {}
+
+# Pro Prozess ein Threadpool und ein Poller-Thread (werden nach fork() zurückgesetzt)
+_executor = None
+_poller = None
+_lock = threading.Lock()
+# Prozess, in dem _executor und _poller laufen (siehe _forget_parent_threads)
+_pid = os.getpid()
+
+
+def task(name):
+    """Dekorator zum Registrieren eines Job-Typs."""
+    def decorator(f):
+        TASKS[name] = f
+        return f
+    return decorator
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+# ----------------- Einreihen -----------------
+
+def enqueue(kind, **payload):
+    """Legt einen Job persistent an und stößt die Ausführung je nach TASK_QUEUE_MODE an.
+
+    'thread':   Ausführung im Threadpool dieses Prozesses, der Request kehrt sofort zurück.
+    'external': Nur Eintrag in der Tabelle, ein separater Worker ('python run.py worker') arbeitet ihn ab.
+    'sync':     Sofortige Ausführung im aufrufenden Kontext (für Tests).
+    """
+    if kind not in TASKS:
+        raise ValueError(f'Unbekannter Job-Typ: {kind}')
+
+    job = Job(kind=kind, payload=payload, max_attempts=current_app.config['TASK_MAX_ATTEMPTS'])
+    db.session.add(job)
+    # ID vor dem Commit merken, sonst lädt job.id den verfallenen Job neu (eine Abfrage pro Job)
+    db.session.flush()
+    job_id = job.id
+    db.session.commit()
+
+    mode = current_app.config['TASK_QUEUE_MODE']
+    if mode == 'sync':
+        run_job(job_id)
+    elif mode == 'thread':
+        app = current_app._get_current_object()
+        _ensure_poller(app)
+        _get_executor(app).submit(_run_in_context, app, job_id)
+    return job
+
+
+def enqueue_after_request(kind, **payload):
+    """Wie enqueue(), innerhalb eines Requests aber erst nach der View (für Signal-Empfänger).
+
+    Der Commit in enqueue() würde sonst geladene Objekte für die übrigen
+    Empfänger desselben Signals verfallen lassen (z.B. die Suche bei post_changed).
+    """
+    if not has_request_context():
+        enqueue(kind, **payload)
+        return
+
+    @after_this_request
+    def _enqueue(response):
+        enqueue(kind, **payload)
+        return response
+
+
+# ----------------- Ausführen -----------------
+
+def _claim(job_id):
+    # Atomarer Übergang pending -> running; verhindert Doppel-Ausführung durch mehrere Worker
+    result = db.session.execute(
+        db.update(Job)
+        .where(Job.id == job_id, Job.status == 'pending')
+        .values(status='running', attempts=Job.attempts + 1, locked_at=_utcnow())
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def run_job(job_id):
+    """Führt einen Job aus (benötigt einen App-Kontext). Gibt True bei Erfolg zurück."""
+    # Eigene Auswertung im Abfrage-Profiler: im Modus 'sync' zählt der Job nicht zum Request
+    with profiled(f'Job {job_id}'):
+        return _execute(job_id)
+
+
+def _execute(job_id):
+    if not _claim(job_id):
+        return False
+
+    job = db.session.get(Job, job_id)
+    try:
+        TASKS[job.kind](**job.payload)
+    except Exception:
+        db.session.rollback()
+        job = db.session.get(Job, job_id)
+        job.last_error = traceback.format_exc(limit=5)
+        job.locked_at = None
+        if job.attempts < job.max_attempts:
+            # Exponentielles Backoff: 2s, 4s, 8s, ...
+            delay = current_app.config['TASK_RETRY_DELAY'] * 2 ** (job.attempts - 1)
+            job.status = 'pending'
+            job.run_after = _utcnow() + timedelta(seconds=delay)
+        else:
+            job.status = 'failed'
+            job.finished_at = _utcnow()
+        # Vor dem Commit lesen: danach wären die Attribute verfallen (eine Abfrage mehr)
+        message = ('Job %s (%s) fehlgeschlagen, Versuch %s/%s', job_id, job.kind, job.attempts, job.max_attempts)
+        db.session.commit()
+        current_app.logger.warning(*message)
+        return False
+
+    job.status = 'done'
+    job.locked_at = None
+    job.finished_at = _utcnow()
+    db.session.commit()
+    return True
+
+
+def due_job_ids(limit=20):
+    """IDs der fälligen Jobs; hängengebliebene 'running'-Jobs werden wieder freigegeben."""
+    lease = timedelta(seconds=current_app.config['TASK_LEASE_SECONDS'])
+    db.session.execute(
+        db.update(Job)
+        .where(Job.status == 'running', Job.locked_at < _utcnow() - lease)
+        .values(status='pending', locked_at=None)
+    )
+    db.session.commit()
+    return db.session.scalars(
+        db.select(Job.id)
+        .where(Job.status == 'pending', Job.run_after <= _utcnow())
+        .order_by(Job.run_after)
+        .limit(limit)
+    ).all()
+
+
+def _run_in_context(app, job_id):
+    with app.app_context():
+        try:
+            run_job(job_id)
+        finally:
+            db.session.remove()
+
+
+def _get_executor(app):
+    global _executor
+    with _lock:
+        _forget_parent_threads()
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=app.config['TASK_WORKERS'],
+                                           thread_name_prefix='task-worker')
+        return _executor
+
+
+def _poll_forever(app):
+    # Holt Wiederholungen und Jobs ab, die vor einem Neustart liegen geblieben sind
+    while True:
+        time.sleep(app.config['TASK_POLL_INTERVAL'])
+        try:
+            with app.app_context():
+                job_ids = due_job_ids()
+                db.session.remove()
+            for job_id in job_ids:
+                _get_executor(app).submit(_run_in_context, app, job_id)
+        except Exception:
+            app.logger.exception('Fehler im Job-Poller')
+
+
+def _ensure_poller(app):
+    global _poller
+    with _lock:
+        _forget_parent_threads()
+        if _poller is None:
+            _poller = threading.Thread(target=_poll_forever, args=(app,), name='task-poller', daemon=True)
+            _poller.start()
+
+
+def _forget_parent_threads():
+    # Threads überleben fork() nicht; im Kindprozess neu anlegen lassen (unter _lock aufrufen).
+    # Per PID statt os.register_at_fork(): ein solcher Hook käme bei jedem Neuladen des
+    # Moduls (HUP, gunicorn.conf.py) dazu und ließe sich nie wieder entfernen. Geforkt
+    # wird aus dem Master, der keine Jobs ausführt und _lock daher nie hält.
+    global _executor, _poller, _pid
+    if _pid != os.getpid():
+        _executor = None
+        _poller = None
+        _pid = os.getpid()
+
+
+def run_worker(app, once=False):
+    """Separater Worker-Prozess: arbeitet die Job-Tabelle mit einem eigenen Threadpool ab."""
+    executor = ThreadPoolExecutor(max_workers=app.config['TASK_WORKERS'], thread_name_prefix='task-worker')
+    app.logger.info('Job-Worker gestartet (%s Threads)', app.config['TASK_WORKERS'])
+    while True:
+        with app.app_context():
+            job_ids = due_job_ids(limit=app.config['TASK_WORKERS'] * 4)
+            db.session.remove()
+        futures = [executor.submit(_run_in_context, app, job_id) for job_id in job_ids]
+        for future in futures:
+            future.result()
+        if once:
+            break
+        if not job_ids:
+            time.sleep(app.config['TASK_POLL_INTERVAL'])
+    executor.shutdown()
+
+
+# ----------------- Job-Typen -----------------
+
+@task('process_image')
+def process_image(filename):
+    from app.images import mark_derivatives_ready, process_upload, has_derivatives
+    # Ist das identische Bild schon verarbeitet, fehlt nur noch der Vermerk an den neuen Beiträgen.
+    # Fehlt die Datei, wirft local_copy FileNotFoundError und der Job wird wiederholt
+    if not has_derivatives(filename):
+        process_upload(filename)
+    mark_derivatives_ready(filename)
+
+
+@task('delete_upload')
+def delete_upload(filename):
+    from app.storage import collect
+    # Löscht nur, wenn kein anderer Beitrag (gleicher Inhalt) mehr auf die Datei verweist
+    collect(filename)
+
+
+@task('update_feeds')
+def update_feeds(post_id, action):
+    from app.feeds import update_feeds as update
+    # Rendert nur den geänderten Eintrag neu und setzt die Feeds aus den übrigen zusammen
+    update(post_id, action)
+
+
+@task('edge_purge')
+def edge_purge(keys):
+    from app.edge import purge
+    # Ist ein Cache nicht erreichbar, wird der Job wiederholt
+    purge(keys)
+
+
+# ----------------- CLI -----------------
+
+@click.command('worker')
+@click.option('--once', is_flag=True, help='Nur die aktuell fälligen Jobs abarbeiten und beenden.')
+def worker_command(once):
+    """Startet einen Job-Worker in diesem Prozess."""
+    run_worker(current_app._get_current_object(), once=once)
+
+
+def init_app(app):
+    app.cli.add_command(worker_command)
@@ -0,0 +1,215 @@
+import json
+import os
+import secrets
+import threading
+import time
+from flask import current_app
+from app.storage import store
+
+try:
+    import fcntl
+except ImportError:  # Windows: Teil-Uploads werden nur innerhalb eines Prozesses gegeneinander gesperrt
+    fcntl = None
+
+# Dateianfänge der erlaubten Bildformate (Magic Bytes) -> Formatname
+IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+)
+# Dateiendung -> erwartetes Format
+EXTENSION_FORMATS = {'jpg': 'jpeg', 'jpeg': 'jpeg', 'png': 'png', 'gif': 'gif'}
+# So viele Bytes vom Dateianfang genügen für die Erkennung
+SNIFF_BYTES = 16
+
+
+class InvalidUpload(ValueError):
+    """Der Upload ist kein erlaubtes Bild (Endung oder Dateiinhalt passen nicht)."""
+
+
+class UploadOffsetMismatch(Exception):
+    """Der Client sendet einen Teil an der falschen Stelle; er muss den Stand neu abfragen."""
+
+    def __init__(self, offset):
+        super().__init__(offset)
+        self.offset = offset
+
+
+class UploadBusy(UploadOffsetMismatch):
+    """Ein anderer Request schreibt gerade in denselben Upload; der Client fragt den Stand später neu ab."""
+
+
+class UploadTooLarge(Exception):
+    """Die angekündigte oder tatsächliche Größe überschreitet UPLOAD_MAX_SIZE."""
+
+
+# ----------------- Prüfung des Dateiinhalts -----------------
+
+def sniff_image(head):
+    """Bildformat anhand der ersten Bytes ('jpeg', 'png', 'gif') oder None."""
+    for signature, image_format in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return image_format
+    return None
+
+
+def check_extension(ext):
+    ext = ext.lower().lstrip('.')
+    if ext not in current_app.config['ALLOWED_EXTENSIONS'] or ext not in EXTENSION_FORMATS:
+        raise InvalidUpload('Nur Bilder (JPG, PNG, GIF) sind erlaubt.')
+    return ext
+
+
+def check_image(head, ext):
+    """Wirft InvalidUpload, wenn die Endung nicht erlaubt ist oder der Inhalt nicht zur Endung passt."""
+    if sniff_image(head) != EXTENSION_FORMATS[check_extension(ext)]:
+        raise InvalidUpload('Der Dateiinhalt ist kein gültiges Bild dieses Typs.')
+
+
+def store_image(stream, ext):
+    """Wie storage.store(), prüft aber zuerst die Magic Bytes im ersten Block."""
+    return store(stream, ext, validate=lambda head: check_image(head, ext))
+
+
+# ----------------- Uploads in Teilen (fortsetzbar) -----------------
+
+class UploadSessions:
+    """Angefangene Uploads als <id>.part + <id>.json in einem Verzeichnis.
+
+    Der Stand (Offset) ist die Größe der .part-Datei; so können alle Worker
+    eines Servers einen Upload fortsetzen, und nach einem Abbruch fragt der
+    Client einfach den Offset ab und sendet ab dort weiter. Es schreibt immer
+    nur ein Request in einen Upload (flock auf die .part-Datei, prozessübergreifend,
+    plus Lock pro Upload im Prozess); ein gleichzeitiger zweiter bekommt UploadBusy.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _path(self, upload_id, suffix):
+        # upload_id stammt vom Client und wird nur als Hex-Token akzeptiert
+        if not upload_id or not all(c in '0123456789abcdef' for c in upload_id):
+            return None
+        return os.path.join(self.directory, upload_id + suffix)
+
+    def create(self, filename, size, owner_id):
+        _, ext = os.path.splitext(filename)
+        check_extension(ext)
+        if size <= 0 or size > current_app.config['UPLOAD_MAX_SIZE']:
+            raise UploadTooLarge()
+        os.makedirs(self.directory, exist_ok=True)
+        upload_id = secrets.token_hex(16)
+        meta = {'ext': ext.lower(), 'size': size, 'owner_id': owner_id, 'created': time.time()}
+        with open(self._path(upload_id, '.json'), 'w') as f:
+            json.dump(meta, f)
+        open(self._path(upload_id, '.part'), 'wb').close()
+        return upload_id
+
+    def get(self, upload_id):
+        """Metadaten inkl. aktuellem 'offset' oder None, wenn unbekannt."""
+        meta_path = self._path(upload_id, '.json')
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            meta['offset'] = os.path.getsize(self._path(upload_id, '.part'))
+        except (TypeError, FileNotFoundError, ValueError):
+            return None
+        return meta
+
+    def _busy(self, upload_id):
+        meta = self.get(upload_id)
+        return UploadBusy(meta['offset'] if meta else 0)
+
+    def _upload_lock(self, upload_id):
+        with self._locks_guard:
+            return self._locks.setdefault(upload_id, threading.Lock())
+
+    def append(self, upload_id, offset, stream, chunk_size):
+        """Hängt den Request-Body blockweise an und gibt den neuen Offset zurück.
+
+        Die Magic Bytes werden geprüft, sobald SNIFF_BYTES beisammen sind, auch
+        wenn sie über mehrere Blöcke oder Teile verteilt ankommen (spätestens am
+        Ende eines kürzeren Uploads).
+        """
+        lock = self._upload_lock(upload_id)
+        if not lock.acquire(blocking=False):
+            raise self._busy(upload_id)
+        try:
+            with open(self._path(upload_id, '.part'), 'ab') as out:
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(out, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        raise self._busy(upload_id) from None
+                # Offset erst unter der Sperre lesen, sonst könnten zwei Requests dieselbe Stelle beschreiben
+                meta = self.get(upload_id)
+                if meta['offset'] != offset:
+                    raise UploadOffsetMismatch(meta['offset'])
+                return self._write(upload_id, meta, out, stream, chunk_size)
+        finally:
+            lock.release()
+
+    def _write(self, upload_id, meta, out, stream, chunk_size):
+        written = meta['offset']
+        head = None
+        if written < SNIFF_BYTES:
+            # Dateianfang aus früheren (kurzen) Teilen für die Prüfung der Magic Bytes
+            with open(self._path(upload_id, '.part'), 'rb') as f:
+                head = f.read(SNIFF_BYTES)
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            if written + len(chunk) > meta['size']:
+                raise UploadTooLarge()
+            if head is not None:
+                head += chunk[:SNIFF_BYTES - len(head)]
+                if len(head) == SNIFF_BYTES:
+                    check_image(head, meta['ext'])
+                    head = None
+            out.write(chunk)
+            written += len(chunk)
+        if head is not None and written == meta['size']:
+            # Upload kürzer als SNIFF_BYTES
+            check_image(head, meta['ext'])
+        return written
+
+    def finish(self, upload_id):
+        """Übernimmt den vollständigen Upload in den Speicher und gibt den Schlüssel zurück."""
+        meta = self.get(upload_id)
+        with open(self._path(upload_id, '.part'), 'rb') as f:
+            key = store_image(f, meta['ext'])
+        self.discard(upload_id)
+        return key
+
+    def discard(self, upload_id):
+        with self._locks_guard:
+            self._locks.pop(upload_id, None)
+        for suffix in ('.part', '.json'):
+            path = self._path(upload_id, suffix)
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    def purge(self, max_age):
+        """Verwirft Uploads, die älter als max_age Sekunden sind; gibt deren Anzahl zurück."""
+        if not os.path.isdir(self.directory):
+            return 0
+        cutoff = time.time() - max_age
+        purged = 0
+        for entry in os.scandir(self.directory):
+            # Maßgeblich ist der letzte geschriebene Teil, nicht der Beginn des Uploads
+            if entry.name.endswith('.part') and entry.stat().st_mtime < cutoff:
+                self.discard(entry.name[:-len('.part')])
+                purged += 1
+        return purged
+
+
+def get_upload_sessions():
+    return current_app.extensions['upload_sessions']
+
+
+def init_app(app):
+    app.extensions['upload_sessions'] = UploadSessions(app.config['UPLOAD_SESSION_DIR'])
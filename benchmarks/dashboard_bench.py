@@ -0,0 +1,103 @@
+# ==============================================================================
+# benchmarks/dashboard_bench.py
+# ==============================================================================
+# Rendert das Admin-Dashboard und die Startseite mit vielen Beiträgen, jeweils
+# ohne und mit Fragment-Cache ({% cache %}), und misst das Übersetzen aller
+# Templates ohne bzw. mit Bytecode-Cache (Warm-up eines neuen Workers).
+#
+#   python benchmarks/dashboard_bench.py --posts 10000
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from flask import render_template  # noqa: E402
+from flask_login import login_user  # noqa: E402
+from jinja2 import FileSystemBytecodeCache  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.cache import LRUCache, NullCache  # noqa: E402
+from app.content import derived_fields  # noqa: E402
+from app.fragments import FragmentCacheExtension  # noqa: E402
+from app.models import Post  # noqa: E402
+from app.principals import Principal  # noqa: E402
+from app.queries import post_cards, post_rows  # noqa: E402
+from app.schema import upgrade_database  # noqa: E402
+from config import Config  # noqa: E402
+
+
+def seed(count):
+    fields = derived_fields('Der Tauchgleiter taucht ab und wieder auf. ' * 20)
+    rows = [{'title': f'Beitrag {i}', 'content': 'x', 'image_file': f'bild_{i}.jpg', **fields} for i in range(count)]
+    db.session.execute(db.insert(Post), rows)
+    db.session.commit()
+
+
+def measure(label, func, repeat):
+    func()  # Aufwärmen (füllt ggf. den Fragment-Cache)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    ms = (time.perf_counter() - start) / repeat * 1000
+    print(f'  {label:45} {ms:8.2f} ms')
+    return ms
+
+
+def compile_all(app, bytecode_cache):
+    # Frische Umgebung wie in einem neu gestarteten Worker
+    env = app.create_jinja_environment()
+    env.add_extension(FragmentCacheExtension)
+    env.bytecode_cache = bytecode_cache
+    start = time.perf_counter()
+    for name in env.list_templates(filter_func=lambda name: name.endswith('.html')):
+        env.get_template(name)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+            PAGE_CACHE_DIR = os.path.join(tmp, 'cache')
+            FRAGMENT_CACHE_DIR = os.path.join(tmp, 'fragments')
+            JINJA_BYTECODE_CACHE_DIR = os.path.join(tmp, 'jinja')
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            upgrade_database()
+            print(f'Lege {args.posts} Beiträge an ...')
+            seed(args.posts)
+
+        with app.test_request_context('/admin/dashboard'):
+            login_user(Principal(1, 'admin@nautilus.com', True))
+            rows = post_rows(per_page=args.posts)
+            cards = post_cards(per_page=args.posts)
+            pages = (('Dashboard', 'admin/dashboard.html', rows), ('Startseite', 'main/index.html', cards))
+            for title, template, posts in pages:
+                print(f'\n[{title}] {len(posts.items)} Beiträge auf einer Seite')
+                app.extensions['fragment_cache'] = NullCache()
+                before = measure('ohne Fragment-Cache', lambda: render_template(template, posts=posts), args.repeat)
+                app.extensions['fragment_cache'] = LRUCache(maxsize=2 * args.posts)
+                after = measure('mit Fragment-Cache (warm)', lambda: render_template(template, posts=posts),
+                                args.repeat)
+                print(f'  {"Faktor":45} {before / after:8.1f}x')
+
+        print('\n[Templates übersetzen, neuer Worker]')
+        bytecode_cache = FileSystemBytecodeCache(BenchConfig.JINJA_BYTECODE_CACHE_DIR)
+        compile_all(app, bytecode_cache)  # Cache füllen (entspricht 'flask templates compile')
+        print(f'  {"ohne Bytecode-Cache":45} {compile_all(app, None):8.2f} ms')
+        print(f'  {"mit Bytecode-Cache":45} {compile_all(app, bytecode_cache):8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
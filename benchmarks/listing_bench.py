@@ -0,0 +1,84 @@
+# ==============================================================================
+# benchmarks/listing_bench.py
+# ==============================================================================
+# Vergleicht die Listen-Abfragen von Startseite und Dashboard:
+# volles ORM-Objekt (alle Spalten inkl. content) gegen die DTO-Projektion.
+#
+#   python benchmarks/listing_bench.py --posts 5000 --content-size 20000
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from sqlalchemy.orm import undefer_group  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.schema import upgrade_database  # noqa: E402
+from app.content import derived_fields  # noqa: E402
+from app.models import Post  # noqa: E402
+from app.pagination import paginate_posts  # noqa: E402
+from app.queries import post_cards, post_rows  # noqa: E402
+from config import Config  # noqa: E402
+
+
+def seed(count, content_size):
+    content = ('Der Tauchgleiter taucht ab und wieder auf. ' * (content_size // 43 + 1))[:content_size]
+    fields = derived_fields(content)
+    batch = []
+    for i in range(count):
+        batch.append({'title': f'Beitrag {i}', 'content': content, **fields})
+        if len(batch) == 1000:
+            db.session.execute(db.insert(Post), batch)
+            batch = []
+    if batch:
+        db.session.execute(db.insert(Post), batch)
+    db.session.commit()
+
+
+def measure(label, func, repeat):
+    func()  # Aufwärmen
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+        # Wie nach einem Request: Session leeren, damit jede Runde neu hydriert
+        db.session.remove()
+    ms = (time.perf_counter() - start) / repeat * 1000
+    print(f'  {label:45} {ms:8.2f} ms')
+    return ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--content-size', type=int, default=20000, help='Zeichen pro Beitrag')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+            PAGE_CACHE_DIR = os.path.join(tmp, 'cache')
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            upgrade_database()
+            print(f'Lege {args.posts} Beiträge mit je {args.content_size} Zeichen an ...')
+            seed(args.posts, args.content_size)
+            # Vorher: select(Post) mit allen Spalten (content ausdrücklich mitgeladen)
+            full = db.select(Post).options(undefer_group('body'))
+
+            for title, per_page, dto_page in (('Startseite', 5, post_cards), ('Dashboard', 50, post_rows),
+                                              ('Dashboard, alle Beiträge', args.posts, post_rows)):
+                print(f'\n[{title}] {per_page} Zeilen pro Seite')
+                before = measure('ORM-Objekte, alle Spalten', lambda: paginate_posts(full, per_page), args.repeat)
+                after = measure('DTO-Projektion', lambda: dto_page(per_page), args.repeat)
+                print(f'  {"Faktor":45} {before / after:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
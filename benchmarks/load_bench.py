@@ -0,0 +1,369 @@
+# ==============================================================================
+# benchmarks/load_bench.py
+# ==============================================================================
+# Lasttest für die öffentlichen und die Admin-Routen: legt N Beiträge und
+# Benutzer an und ruft Startseite, Beitragsseite, Login sowie Dashboard und
+# Anlegen/Bearbeiten/Löschen von Beiträgen auf, wahlweise über den Test-Client
+# oder über einen echten WSGI-Server auf localhost (mit mehreren Clients).
+# Ausgegeben werden Requests pro Sekunde, Latenz-Perzentile und Abfragen pro
+# Request (aus dem Server-Timing-Header, siehe DB_SERVER_TIMING).
+#
+#   python benchmarks/load_bench.py --posts 5000 --users 200 --requests 500
+#   python benchmarks/load_bench.py --server --concurrency 8
+#   python benchmarks/load_bench.py --ci                # Vergleich mit baseline.json
+#   python benchmarks/load_bench.py --ci --tolerance 1.0 # zusätzlich p95-Latenz
+#   python benchmarks/load_bench.py --ci --save-baseline
+#
+# Mit --ci läuft die kleine, reproduzierbare Variante (Test-Client, wenige
+# Datensätze) und das Skript endet mit Exit-Code 1, sobald ein Szenario mehr
+# Abfragen pro Request braucht als in benchmarks/baseline.json hinterlegt oder
+# (mit --tolerance, nur auf einer festen Maschine sinnvoll) seine p95-Latenz
+# über der Baseline liegt.
+
+import argparse
+import http.client
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.content import derived_fields  # noqa: E402
+from app.models import Post, User  # noqa: E402
+from app.schema import upgrade_database  # noqa: E402
+from config import Config  # noqa: E402
+
+BASELINE_FILE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+PASSWORD = 'Sicher123!'
+ADMIN_EMAIL = 'admin@tauchgleiter.de'
+# Kleine, reproduzierbare Variante für CI und tests/benchmark_test.py
+CI_SETTINGS = {'posts': 200, 'users': 20, 'requests': 50}
+SERVER_TIMING = re.compile(r'db;dur=([\d.]+);desc="(\d+) Abfragen"')
+
+
+def bench_config(tmp, hash_method):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+        PAGE_CACHE_DIR = os.path.join(tmp, 'cache')
+        FRAGMENT_CACHE_DIR = os.path.join(tmp, 'fragments')
+        UPLOAD_FOLDER = os.path.join(tmp, 'uploads')
+        UPLOAD_SESSION_DIR = os.path.join(tmp, 'uploads', '.sessions')
+        WTF_CSRF_ENABLED = False
+        # Jobs nur eintragen wie im Betrieb; gemessen wird der Request, nicht der Worker
+        TASK_QUEUE_MODE = 'external'
+        # Abfragen pro Request kommen über den Server-Timing-Header zum Client
+        DB_SERVER_TIMING = True
+        # Alle Logins kommen von 127.0.0.1
+        LOGIN_RATE_LIMIT = 10 ** 9
+        PASSWORD_HASH_METHOD = hash_method
+    return BenchConfig
+
+
+def seed(posts, users, hash_method):
+    """Legt den Admin, users Benutzer (gemeinsamer Hash) und posts Beiträge an."""
+    password_hash = generate_password_hash(PASSWORD, method=hash_method)
+    admin = User(email=ADMIN_EMAIL, password_hash=password_hash, is_admin=True)
+    db.session.add(admin)
+    db.session.flush()
+    db.session.execute(db.insert(User), [
+        {'email': f'user{i}@tauchgleiter.de', 'password_hash': password_hash, 'is_admin': False}
+        for i in range(users)])
+    content = 'Der Tauchgleiter taucht ab und wieder auf. ' * 40
+    fields = derived_fields(content)
+    batch = []
+    for i in range(posts):
+        batch.append({'title': f'Beitrag {i}', 'content': content, 'user_id': admin.id, **fields})
+        if len(batch) == 1000:
+            db.session.execute(db.insert(Post), batch)
+            batch = []
+    if batch:
+        db.session.execute(db.insert(Post), batch)
+    db.session.commit()
+
+
+# ----------------- Clients -----------------
+
+class Response:
+    def __init__(self, status, headers):
+        self.status = status
+        self.queries = None
+        match = SERVER_TIMING.search(headers.get('Server-Timing', ''))
+        if match:
+            self.queries = int(match.group(2))
+
+
+class TestClientSession:
+    """Ein Besucher über den Flask-Test-Client (ohne Netzwerk und Server-Threads)."""
+
+    def __init__(self, app):
+        self.app = app
+        self.client = app.test_client()
+
+    def request(self, method, path, data=None):
+        # Eigener App-Kontext je Request, damit nichts in g hängen bleibt (z.B. unter pytest-flask)
+        with self.app.app_context():
+            response = self.client.open(path, method=method, data=data)
+        return Response(response.status_code, response.headers)
+
+
+class HTTPSession:
+    """Ein Besucher mit eigenen Cookies gegen den lokalen WSGI-Server."""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.cookies = SimpleCookie()
+
+    def request(self, method, path, data=None):
+        headers = {}
+        body = None
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={morsel.value}' for name, morsel in self.cookies.items())
+        if data is not None:
+            body = urlencode(data)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            for value in response.headers.get_all('Set-Cookie') or ():
+                self.cookies.load(value)
+            return Response(response.status, response.headers)
+        finally:
+            connection.close()
+
+
+class LocalServer:
+    """Startet die App in einem threaded Werkzeug-Server auf einem freien Port."""
+
+    def __init__(self, app):
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.thread.join()
+
+    def session(self):
+        return HTTPSession('127.0.0.1', self.server.server_port)
+
+
+# ----------------- Szenarien -----------------
+# Jedes Szenario liefert für den i-ten Request (Methode, Pfad, Formulardaten)
+# und den erwarteten Status; Weiterleitungen werden nicht verfolgt.
+
+def login_data(i, users):
+    email = f'user{i % users}@tauchgleiter.de' if users else ADMIN_EMAIL
+    return {'email': email, 'password': PASSWORD}
+
+
+def post_data(i):
+    return {'title': f'Lasttest {i}', 'content': 'Status: ok\nTechnische Details: keine'}
+
+
+def scenarios(post_ids, users):
+    """(Name, Anmeldung nötig, Request-Funktion, erwarteter Status) in Ausführungsreihenfolge."""
+    return [
+        ('main.index', False, lambda i, created: ('GET', '/', None), 200),
+        ('main.post_detail', False,
+         lambda i, created: ('GET', f'/post/{post_ids[i * 7919 % len(post_ids)]}', None), 200),
+        # Jeder Login mit einer frischen Sitzung (sonst leitet /login sofort weiter)
+        ('main.login', None, lambda i, created: ('POST', '/login', login_data(i, users)), 302),
+        ('admin.dashboard', True, lambda i, created: ('GET', '/admin/dashboard', None), 200),
+        ('admin.new_post', True, lambda i, created: ('POST', '/admin/post/new', post_data(i)), 302),
+        ('admin.update_post', True,
+         lambda i, created: ('POST', f'/admin/post/{created[i]}/update', post_data(i)), 302),
+        ('admin.delete_post', True, lambda i, created: ('POST', f'/admin/post/{created[i]}/delete', None), 302),
+    ]
+
+
+def login(session):
+    response = session.request('POST', '/login', {'email': ADMIN_EMAIL, 'password': PASSWORD})
+    if response.status != 302:
+        raise RuntimeError(f'Admin-Login fehlgeschlagen (Status {response.status}).')
+
+
+def run_scenario(app, new_session, build, needs_login, expected, requests, concurrency, created):
+    """Führt requests Aufrufe auf concurrency Besucher verteilt aus und liefert die Kennzahlen."""
+    shared = []
+    if needs_login is not None:
+        for _ in range(concurrency):
+            session = new_session()
+            if needs_login:
+                login(session)
+            shared.append(session)
+
+    def worker(slot):
+        samples = []
+        for i in range(slot, requests, concurrency):
+            session = shared[slot] if shared else new_session()
+            method, path, data = build(i, created)
+            start = time.perf_counter()
+            response = session.request(method, path, data)
+            samples.append(((time.perf_counter() - start) * 1000, response))
+        return samples
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = [sample for part in executor.map(worker, range(concurrency)) for sample in part]
+    elapsed = time.perf_counter() - start
+    return summarize(samples, elapsed, expected)
+
+
+def percentile(values, p):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[p - 1]
+
+
+def summarize(samples, elapsed, expected):
+    latencies = sorted(ms for ms, _ in samples)
+    queries = [response.queries for _, response in samples if response.queries is not None]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, response in samples if response.status != expected),
+        'rps': len(samples) / elapsed,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'queries': statistics.mean(queries) if queries else None,
+    }
+
+
+def run(posts=CI_SETTINGS['posts'], users=CI_SETTINGS['users'], requests=CI_SETTINGS['requests'],
+        server=False, concurrency=1, hash_method='pbkdf2:sha256:1000'):
+    """Legt eine frische Datenbank an, führt alle Szenarien aus und liefert {Name: Kennzahlen}."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(bench_config(tmp, hash_method))
+        with app.app_context():
+            upgrade_database()
+            seed(posts, users, hash_method)
+            post_ids = db.session.scalars(db.select(Post.id)).all()
+        created = []
+
+        def execute(new_session):
+            for name, needs_login, build, expected in scenarios(post_ids, users):
+                if name == 'admin.new_post':
+                    with app.app_context():
+                        last_id = db.session.scalar(db.select(db.func.max(Post.id)))
+                results[name] = run_scenario(app, new_session, build, needs_login, expected,
+                                             requests, concurrency, created)
+                if name == 'admin.new_post':
+                    with app.app_context():
+                        created.extend(db.session.scalars(
+                            db.select(Post.id).where(Post.id > last_id).order_by(Post.id)).all())
+
+        if server:
+            with LocalServer(app) as local:
+                execute(local.session)
+        else:
+            execute(lambda: TestClientSession(app))
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+    return results
+
+
+# ----------------- Baseline -----------------
+
+def load_baseline(path=BASELINE_FILE):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(results, path=BASELINE_FILE):
+    baseline = {name: {'queries': round(values['queries'], 2), 'p95_ms': round(values['p95_ms'], 2)}
+                for name, values in results.items()}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def regressions(results, baseline, tolerance=None):
+    """Liste der Verschlechterungen gegenüber der Baseline.
+
+    Abfragen pro Request werden exakt verglichen; die p95-Latenz nur, wenn eine
+    Toleranz angegeben ist (z.B. 1.0 = doppelt so langsam wie die Baseline).
+    """
+    problems = []
+    for name, reference in sorted(baseline.items()):
+        current = results.get(name)
+        if current is None:
+            problems.append(f'{name}: Szenario fehlt')
+            continue
+        if current['errors']:
+            problems.append(f'{name}: {current["errors"]} Request(s) mit unerwartetem Status')
+        if current['queries'] is not None and current['queries'] > reference['queries']:
+            problems.append(f'{name}: {current["queries"]:.2f} Abfragen pro Request '
+                            f'(Baseline {reference["queries"]:.2f})')
+        if tolerance is not None and current['p95_ms'] > reference['p95_ms'] * (1 + tolerance):
+            problems.append(f'{name}: p95 {current["p95_ms"]:.1f} ms (Baseline {reference["p95_ms"]:.1f} ms)')
+    return problems
+
+
+def report(results):
+    print(f'  {"Szenario":20} {"Req/s":>9} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"Abfr./Req":>10} {"Fehler":>7}')
+    for name, values in results.items():
+        queries = '-' if values['queries'] is None else f'{values["queries"]:.2f}'
+        print(f'  {name:20} {values["rps"]:9.1f} {values["p50_ms"]:9.2f} {values["p95_ms"]:9.2f} '
+              f'{values["p99_ms"]:9.2f} {queries:>10} {values["errors"]:7}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=500, help='Requests pro Szenario')
+    parser.add_argument('--server', action='store_true', help='Über einen lokalen WSGI-Server statt des Test-Clients')
+    parser.add_argument('--concurrency', type=int, default=1, help='Gleichzeitige Besucher')
+    parser.add_argument('--hash-method', default=Config.PASSWORD_HASH_METHOD)
+    parser.add_argument('--ci', action='store_true', help='Kleine Variante, Vergleich mit der Baseline')
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=None,
+                        help='Erlaubter Anstieg der p95-Latenz (1.0 = +100 %%); ohne Angabe nur Abfragen vergleichen')
+    args = parser.parse_args()
+
+    if args.ci:
+        settings = dict(CI_SETTINGS, server=False, concurrency=1, hash_method='pbkdf2:sha256:1000')
+    else:
+        settings = dict(posts=args.posts, users=args.users, requests=args.requests, server=args.server,
+                        concurrency=args.concurrency, hash_method=args.hash_method)
+    mode = 'WSGI-Server' if settings['server'] else 'Test-Client'
+    print(f'{settings["posts"]} Beiträge, {settings["users"]} Benutzer, {settings["requests"]} Requests '
+          f'pro Szenario, {settings["concurrency"]} Besucher, {mode}')
+    results = run(**settings)
+    report(results)
+
+    if args.save_baseline:
+        save_baseline(results)
+        print(f'\nBaseline gespeichert: {BASELINE_FILE}')
+    elif args.ci:
+        problems = regressions(results, load_baseline(), args.tolerance)
+        for problem in problems:
+            print(f'REGRESSION {problem}')
+        if problems:
+            sys.exit(1)
+        print('\nKeine Verschlechterung gegenüber der Baseline.')
+
+
+if __name__ == '__main__':
+    main()
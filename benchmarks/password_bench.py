@@ -0,0 +1,95 @@
+# ==============================================================================
+# benchmarks/password_bench.py
+# ==============================================================================
+# Misst die Dauer eines Passwort-Hashes für verschiedene Verfahren und Kosten
+# sowie das Verhalten des begrenzten Hash-Executors bei einem Login-Ansturm.
+#
+#   python benchmarks/password_bench.py --burst 50
+#
+# Als Richtwert sollte ein Hash auf der Zielmaschine 50-250 ms dauern; das
+# Ergebnis gehört nach PASSWORD_HASH_METHOD bzw. ARGON2_* in die Config.
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+from app.passwords import BoundedExecutor, HashingOverloaded, PasswordHasher, verify_password  # noqa: E402
+
+METHODS = ['scrypt:16384:8:1', 'scrypt:32768:8:1', 'scrypt:65536:8:1',
+           'pbkdf2:sha256:600000', 'pbkdf2:sha256:1000000']
+ARGON2_PARAMS = [(2, 19456), (3, 65536), (4, 131072)]  # (time_cost, memory_cost in KiB)
+
+
+def timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def burst(password_hash, logins, workers, queue_size):
+    """Simuliert gleichzeitige Logins: (angenommen, abgewiesen, Dauer in s)."""
+    executor = BoundedExecutor(workers, queue_size)
+    accepted = rejected = 0
+    lock = threading.Lock()
+
+    def attempt():
+        nonlocal accepted, rejected
+        try:
+            executor.submit(verify_password, password_hash, 'falsch').result()
+            with lock:
+                accepted += 1
+        except HashingOverloaded:
+            with lock:
+                rejected += 1
+
+    threads = [threading.Thread(target=attempt) for _ in range(logins)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    executor.shutdown()
+    return accepted, rejected, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--burst', type=int, default=50, help='Gleichzeitige Login-Versuche')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--queue', type=int, default=8)
+    args = parser.parse_args()
+
+    print('Dauer eines Hashes (Median):')
+    for method in METHODS:
+        ms = timed(lambda: generate_password_hash('Sicher123!', method=method), args.repeat)
+        print(f'  {method:28} {ms:8.1f} ms')
+    if PasswordHasher is not None:
+        for time_cost, memory_cost in ARGON2_PARAMS:
+            hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=1)
+            ms = timed(lambda: hasher.hash('Sicher123!'), args.repeat)
+            print(f'  {f"argon2 t={time_cost} m={memory_cost}":28} {ms:8.1f} ms')
+    else:
+        print("  (argon2 übersprungen, Paket 'argon2-cffi' nicht installiert)")
+
+    password_hash = generate_password_hash('Sicher123!', method='scrypt:32768:8:1')
+    print(f'\nAnsturm: {args.burst} gleichzeitige Logins, {args.workers} Hash-Threads, Puffer {args.queue}')
+    for label, queue_size in (('begrenzt', args.queue), ('unbegrenzt', args.burst)):
+        workers = args.workers if label == 'begrenzt' else args.burst
+        accepted, rejected, seconds = burst(password_hash, args.burst, workers, queue_size)
+        print(f'  {label:12} {accepted:4} geprüft, {rejected:4} abgewiesen, {seconds:6.2f} s')
+
+
+if __name__ == '__main__':
+    main()
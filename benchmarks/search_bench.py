@@ -0,0 +1,96 @@
+# ==============================================================================
+# benchmarks/search_bench.py
+# ==============================================================================
+# Misst die Antwortzeit der Volltextsuche bei vielen Beiträgen.
+#
+#   python benchmarks/search_bench.py --posts 100000
+#
+# Legt eine temporäre SQLite-Datei an und vergleicht FTS5 mit dem Python-Index.
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from app import create_app, db  # noqa: E402
+from app.schema import upgrade_database  # noqa: E402
+from app.models import Post  # noqa: E402
+from app.search import SQLiteFTSBackend, InvertedIndexBackend  # noqa: E402
+from config import Config  # noqa: E402
+
+# Fachbegriffe, nach denen gesucht wird; sie kommen wie in echten Texten nur in einem Teil der Beiträge vor
+TERMS = ('ballast gleiter druckkörper vakuum kolben schwerpunkt raspberry motor sensor tiefe test '
+         'rahmen gewindestange dichtung software regelung batterie kabel pumpe ventil messung').split()
+QUERIES = ['ballast', 'druckk', 'vakuum test', 'schwerpunkt regelung', 'raspberry sensor messung']
+
+
+def make_vocabulary(rng, size=20000):
+    letters = 'abcdefghijklmnopqrstuvwxyzäöü'
+    return [''.join(rng.choices(letters, k=rng.randint(3, 12))) for _ in range(size)]
+
+
+def seed(count):
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(rng)
+    # Zipf-ähnliche Verteilung: wenige häufige, viele seltene Wörter
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    batch = []
+    for i in range(count):
+        words = rng.choices(vocabulary, cum_weights=cum_weights, k=120) + rng.sample(TERMS, k=2)
+        rng.shuffle(words)
+        title = ' '.join(words[:4]) + f' {i}'
+        content = ' '.join(words)
+        batch.append({'title': title[:100], 'content': content})
+        if len(batch) == 5000:
+            db.session.execute(db.insert(Post), batch)
+            batch = []
+    if batch:
+        db.session.execute(db.insert(Post), batch)
+    db.session.commit()
+
+
+def measure(backend, repeat):
+    timings = {}
+    for query in QUERIES:
+        backend.search(query, 20)  # Aufwärmen
+        start = time.perf_counter()
+        for _ in range(repeat):
+            backend.search(query, 20)
+        timings[query] = (time.perf_counter() - start) / repeat * 1000
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+            PAGE_CACHE_DIR = os.path.join(tmp, 'cache')
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            upgrade_database()
+            print(f'Lege {args.posts} Beiträge an ...')
+            seed(args.posts)
+            for backend in (SQLiteFTSBackend(), InvertedIndexBackend()):
+                start = time.perf_counter()
+                backend.ensure_schema()
+                backend.reindex()
+                print(f'\n[{backend.name}] Index aufgebaut in {time.perf_counter() - start:.1f}s')
+                for query, ms in measure(backend, args.repeat).items():
+                    print(f'  {query!r:30} {ms:7.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
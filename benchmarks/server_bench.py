@@ -0,0 +1,154 @@
+"""Durchsatz des Entwicklungsservers (run.py) im Vergleich zu gunicorn (run.py serve)."""
+# ==============================================================================
+# benchmarks/server_bench.py
+# ==============================================================================
+# Startet beide Server nacheinander als eigene Prozesse auf derselben, frisch
+# befüllten SQLite-Datei und misst öffentliche Seiten (Startseite und
+# Beitragsseiten) mit mehreren gleichzeitigen Besuchern.
+#
+#   python benchmarks/server_bench.py
+#   python benchmarks/server_bench.py --requests 5000 --concurrency 32 --workers 4 --threads 8
+#   python benchmarks/server_bench.py --servers gunicorn
+#
+# run.py startet immer auf Port 5000 (app.run mit debug=True, inkl. Reloader),
+# gemessen wird also genau das, was bisher ausgeliefert wurde.
+
+import argparse
+import http.client
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.load_bench import HTTPSession, bench_config, run_scenario, seed  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.models import Post  # noqa: E402
+from app.schema import upgrade_database  # noqa: E402
+
+HOST = '127.0.0.1'
+DEV_PORT = 5000
+GUNICORN_PORT = 8765
+STARTUP_TIMEOUT = 60
+
+
+def server_command(name, workers=None, threads=None):
+    if name == 'run.py':
+        return [sys.executable, os.path.join(ROOT, 'run.py')], DEV_PORT
+    command = [sys.executable, os.path.join(ROOT, 'run.py'), 'serve', '--bind', f'{HOST}:{GUNICORN_PORT}',
+               '--access-logfile', '/dev/null']
+    if workers:
+        command += ['--workers', str(workers)]
+    if threads:
+        command += ['--threads', str(threads)]
+    return command, GUNICORN_PORT
+
+
+def server_env(tmp):
+    """Umgebung der Server-Prozesse: dieselbe Datenbank und eigene Cache-Verzeichnisse."""
+    env = dict(os.environ)
+    env.update({
+        'SECRET_KEY': env.get('SECRET_KEY', 'benchmark'),
+        'DATABASE_URL': 'sqlite:///' + os.path.join(tmp, 'bench.db'),
+        'TASK_QUEUE_MODE': 'external',
+        'PAGE_CACHE_DIR': os.path.join(tmp, 'cache'),
+        'FRAGMENT_CACHE_DIR': os.path.join(tmp, 'fragments'),
+        'JINJA_BYTECODE_CACHE_DIR': os.path.join(tmp, 'jinja'),
+        'FEED_DIR': os.path.join(tmp, 'feeds'),
+        'UPLOAD_SESSION_DIR': os.path.join(tmp, 'sessions'),
+    })
+    return env
+
+
+def wait_until_ready(port, process):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'Server beendet mit Code {process.returncode}')
+        try:
+            connection = http.client.HTTPConnection(HOST, port, timeout=5)
+            connection.request('GET', '/')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+        finally:
+            connection.close()
+    raise RuntimeError(f'Server auf Port {port} nicht erreichbar')
+
+
+def stop(process):
+    # Eigene Prozessgruppe: run.py (Reloader-Kind) und gunicorn (Worker) enden vollständig
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+    except ProcessLookupError:
+        pass
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+
+def measure(name, tmp, post_ids, requests, concurrency, workers=None, threads=None):
+    command, port = server_command(name, workers, threads)
+    process = subprocess.Popen(command, cwd=ROOT, env=server_env(tmp), start_new_session=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(port, process)
+        paths = ['/'] + [f'/post/{post_id}' for post_id in post_ids]
+
+        def build(i, created):
+            return 'GET', paths[i * 7919 % len(paths)], None
+
+        return run_scenario(None, lambda: HTTPSession(HOST, port), build, None, 200, requests, concurrency, [])
+    finally:
+        stop(process)
+
+
+def run(servers=('run.py', 'gunicorn'), posts=500, requests=1000, concurrency=16, workers=None, threads=None):
+    """Misst jeden Server mit denselben Requests und liefert {Server: Kennzahlen}."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(bench_config(tmp, 'pbkdf2:sha256:1000'))
+        with app.app_context():
+            upgrade_database()
+            seed(posts, 1, 'pbkdf2:sha256:1000')
+            post_ids = db.session.scalars(db.select(Post.id)).all()
+            db.session.remove()
+            db.engine.dispose()
+        for name in servers:
+            results[name] = measure(name, tmp, post_ids, requests, concurrency, workers, threads)
+    return results
+
+
+def report(results):
+    print(f'  {"Server":10} {"Req/s":>9} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"Fehler":>7}')
+    for name, values in results.items():
+        print(f'  {name:10} {values["rps"]:9.1f} {values["p50_ms"]:9.2f} {values["p95_ms"]:9.2f} '
+              f'{values["p99_ms"]:9.2f} {values["errors"]:7}')
+    if 'run.py' in results and 'gunicorn' in results:
+        factor = results['gunicorn']['rps'] / results['run.py']['rps']
+        print(f'\ngunicorn: {factor:.1f}x Durchsatz gegenüber run.py')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--servers', nargs='+', choices=('run.py', 'gunicorn'), default=['run.py', 'gunicorn'])
+    parser.add_argument('--posts', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=1000, help='Requests pro Server')
+    parser.add_argument('--concurrency', type=int, default=16, help='Gleichzeitige Besucher')
+    parser.add_argument('--workers', type=int, help='gunicorn-Prozesse (Standard: gunicorn.conf.py)')
+    parser.add_argument('--threads', type=int, help='Threads pro gunicorn-Prozess (Standard: gunicorn.conf.py)')
+    args = parser.parse_args()
+
+    print(f'{args.posts} Beiträge, {args.requests} Requests pro Server, {args.concurrency} Besucher, '
+          f'{os.cpu_count()} CPU(s)')
+    report(run(args.servers, args.posts, args.requests, args.concurrency, args.workers, args.threads))
+
+
+if __name__ == '__main__':
+    main()
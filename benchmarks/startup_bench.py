@@ -0,0 +1,97 @@
+# ==============================================================================
+# benchmarks/startup_bench.py
+# ==============================================================================
+# Misst die Startzeit eines Worker-Prozesses: Import + create_app() in einem
+# frischen Interpreter (kalt) und create_app() allein (warm), dazu die Zahl der
+# Datenbankverbindungen beim Start. Zum Vergleich die Arbeit, die create_app()
+# früher in jedem Worker erledigt hat (create_all + Seed-Abfragen).
+#
+#   python benchmarks/startup_bench.py --repeat 10 --workers 16
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from app import create_app, db  # noqa: E402
+from app.models import Post, User  # noqa: E402
+from app.schema import upgrade_database  # noqa: E402
+from config import Config  # noqa: E402
+
+COLD_START = (
+    'import time; start = time.perf_counter(); '
+    'from app import create_app; create_app(); '
+    'print(time.perf_counter() - start)'
+)
+
+
+def median_ms(timings):
+    return statistics.median(timings) * 1000
+
+
+def cold_start(repeat, env):
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', COLD_START], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+
+def legacy_boot_work(app):
+    # Entspricht dem früheren Block am Ende von create_app()
+    with app.app_context():
+        db.create_all()
+        Post.query.first()
+        User.query.filter_by(is_admin=True).first()
+        db.session.remove()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=16, help='Für die Hochrechnung eines Rolling Restarts')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+        env = {**os.environ, 'DATABASE_URL': database_url, 'PAGE_CACHE_DIR': os.path.join(tmp, 'cache')}
+
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = database_url
+            PAGE_CACHE_DIR = os.path.join(tmp, 'cache')
+
+        setup = create_app(BenchConfig)
+        with setup.app_context():
+            upgrade_database()
+
+        cold = cold_start(args.repeat, env)
+        warm, connects = [], []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            app = create_app(BenchConfig)
+            warm.append(time.perf_counter() - start)
+            connects.append(app.extensions['db_stats'].snapshot()['pool_events'].get('connect', 0))
+        legacy = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            legacy_boot_work(app)
+            legacy.append(time.perf_counter() - start)
+
+    print(f'{"Kaltstart (Import + create_app)":40} {median_ms(cold):8.1f} ms')
+    print(f'{"create_app() allein":40} {median_ms(warm):8.1f} ms')
+    print(f'{"DB-Verbindungen beim Start":40} {max(connects):8d}')
+    print(f'{"früher zusätzlich: create_all + Seed":40} {median_ms(legacy):8.1f} ms (plus DB-Verbindung pro Worker)')
+    print(f'{f"Hochrechnung {args.workers} Worker (kalt)":40} {median_ms(cold) * args.workers / 1000:8.2f} s CPU')
+
+
+if __name__ == '__main__':
+    main()
@@ -23,6 +23,44 @@ class Config:
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # --- Verbindungs-Pool und Datenbank-Statistiken (app/database.py) ---
+    # Daraus wird SQLALCHEMY_ENGINE_OPTIONS gebaut; Pool-Größen gelten nur für MySQL/PostgreSQL.
+    # Faustregel: (DB_POOL_SIZE + DB_MAX_OVERFLOW) x Worker-Prozesse < max_connections der Datenbank
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    # Wartezeit (Sekunden) auf eine freie Verbindung, danach Fehler statt hängender Requests
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 10))
+    # Verbindungen vor MySQLs wait_timeout bzw. Proxy-Timeouts erneuern (Sekunden)
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    # Obergrenze pro SQL-Anweisung in Millisekunden, 0 = aus
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 0))
+    # Header 'Server-Timing: db;dur=...' mit Anzahl und Dauer der Abfragen pro Request
+    DB_SERVER_TIMING = os.environ.get('DB_SERVER_TIMING', 'false').lower() in ('1', 'true', 'yes')
+
+    # --- Abfrage-Profiler für Entwicklung und Tests (app/profiler.py) ---
+    # Protokolliert Abfragen pro Request, warnt bei N+1-Mustern und zeigt EXPLAIN langsamer SELECTs.
+    # Im Debug-Modus ('python run.py') immer an
+    QUERY_PROFILER = os.environ.get('QUERY_PROFILER', 'false').lower() in ('1', 'true', 'yes')
+    # Dieselbe Anweisung so oft in einem Request gilt als N+1-Verdacht
+    QUERY_PROFILER_REPEAT_THRESHOLD = int(os.environ.get('QUERY_PROFILER_REPEAT_THRESHOLD', 3))
+    # Warnung ab so vielen Abfragen pro Request
+    QUERY_PROFILER_MAX_QUERIES = int(os.environ.get('QUERY_PROFILER_MAX_QUERIES', 20))
+    # Ab dieser Dauer (Millisekunden) wird der Ausführungsplan mitprotokolliert
+    QUERY_PROFILER_SLOW_MS = float(os.environ.get('QUERY_PROFILER_SLOW_MS', 100))
+    # N+1-Verdacht als Fehler statt Warnung (Tests)
+    QUERY_PROFILER_RAISE = os.environ.get('QUERY_PROFILER_RAISE', 'false').lower() in ('1', 'true', 'yes')
+
+    # --- Lese-Replikate (app/replicas.py) ---
+    # Kommagetrennte URLs; werden als SQLALCHEMY_BINDS replica_0, replica_1, ... eingetragen.
+    # GET-Requests dieser Blueprints lesen von einem Replikat, alles andere vom Primary.
+    DB_REPLICA_URLS = [url.strip() for url in os.environ.get('DB_REPLICA_URLS', '').split(',') if url.strip()]
+    DB_REPLICA_BLUEPRINTS = ('main',)
+    # Nach einem Schreibzugriff liest die Sitzung so lange (Sekunden) vom Primary (read-your-writes)
+    DB_REPLICA_STICKY_SECONDS = int(os.environ.get('DB_REPLICA_STICKY_SECONDS', 5))
+    # Abstand der Health-Checks (SELECT 1) pro Replikat; ausgefallene werden ebenso oft erneut geprüft
+    DB_REPLICA_CHECK_INTERVAL = int(os.environ.get('DB_REPLICA_CHECK_INTERVAL', 10))
+
     # --- KORREKTUR DES UPLOAD-PFADES ---
 
     # 1. Definiere den Basis-Pfad (Projektstammverzeichnis)
@@ -36,5 +74,138 @@ class Config:
 
     # --- ENDE KORREKTUR ---
 
+    # Lebensdauer (Sekunden) der zwischengespeicherten angemeldeten User pro Prozess (app/principals.py);
+    # Passwort- und Rollenänderungen über das ORM verwerfen den Eintrag sofort
+    PRINCIPAL_CACHE_TTL = int(os.environ.get('PRINCIPAL_CACHE_TTL', 60))
+
+    # --- Passwort-Hashing und Login-Schutz (app/passwords.py) ---
+    # Werkzeug-Format 'scrypt:n:r:p' bzw. 'pbkdf2:sha256:iterationen' oder 'argon2' (benötigt argon2-cffi).
+    # Ältere Hashes werden beim nächsten erfolgreichen Login auf diese Einstellung umgestellt.
+    # Kosten mit 'python benchmarks/password_bench.py' auf der Zielmaschine abstimmen.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    ARGON2_TIME_COST = int(os.environ.get('ARGON2_TIME_COST', 3))
+    ARGON2_MEMORY_COST = int(os.environ.get('ARGON2_MEMORY_COST', 65536))  # in KiB
+    ARGON2_PARALLELISM = int(os.environ.get('ARGON2_PARALLELISM', 1))
+    # Höchstens so viele Hash-Prüfungen gleichzeitig pro Prozess, weitere warten im Puffer
+    # oder werden bei vollem Puffer sofort mit 503 abgewiesen
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', 8))
+    PASSWORD_HASH_TIMEOUT = 10
+    # Login-Versuche pro Client-IP und Zeitfenster (Sekunden), prozesslokal
+    LOGIN_RATE_LIMIT = int(os.environ.get('LOGIN_RATE_LIMIT', 10))
+    LOGIN_RATE_PERIOD = 60
+    # Anzahl vertrauenswürdiger Reverse-Proxies vor der App (nginx, CDN, 'flask edge proxy').
+    # Nur dann zählt die Client-IP aus X-Forwarded-For (Rate-Limit), sonst hätten alle Besucher
+    # die IP des Proxys. 0 = Header ignorieren (direkt erreichbar, Header wären fälschbar)
+    TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', 0))
+
     # Erlaubte Dateiendungen für den Upload
-    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
\ No newline at end of file
+    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+
+    # --- Upload-Grenzen (app/uploads.py) ---
+    # Obergrenze pro Request; Flask antwortet darüber mit 413, bevor der Body gelesen wird
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))
+    # Uploads in Teilen (/admin/uploads): Gesamtgröße und Größe eines Teils (< MAX_CONTENT_LENGTH)
+    UPLOAD_MAX_SIZE = int(os.environ.get('UPLOAD_MAX_SIZE', 64 * 1024 * 1024))
+    UPLOAD_SESSION_CHUNK = 4 * 1024 * 1024
+    # Angefangene Uploads; muss für alle Worker-Prozesse desselben Servers dasselbe Verzeichnis sein
+    UPLOAD_SESSION_DIR = os.environ.get('UPLOAD_SESSION_DIR', os.path.join(basedir, 'instance', 'upload_sessions'))
+    # Abgebrochene Uploads verwirft 'flask storage gc' nach dieser Zeit (Sekunden)
+    UPLOAD_SESSION_TTL = 24 * 3600
+
+    # --- Statische Assets und Uploads ausliefern (app/assets.py) ---
+    # Fingerprint-URLs (/assets/<hash>/...) und Uploads gelten so lange als unveränderlich
+    ASSET_MAX_AGE = 365 * 24 * 3600
+    # Bytes vom Reverse-Proxy ausliefern lassen: X-Sendfile (Apache/lighttpd) ...
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', 'false').lower() in ('1', 'true', 'yes')
+    # ... oder X-Accel-Redirect auf interne nginx-Locations, z.B. '/_static/' und '/_uploads/'
+    X_ACCEL_STATIC_PREFIX = os.environ.get('X_ACCEL_STATIC_PREFIX')
+    X_ACCEL_UPLOADS_PREFIX = os.environ.get('X_ACCEL_UPLOADS_PREFIX')
+
+    # --- Datei-Speicher für Uploads (app/storage.py) ---
+    # 'local' = UPLOAD_FOLDER, 's3' = S3-kompatibler Objektspeicher (benötigt boto3,
+    # Zugangsdaten über AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY)
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'local')
+    S3_BUCKET = os.environ.get('S3_BUCKET')
+    S3_PREFIX = os.environ.get('S3_PREFIX', 'uploads/')
+    S3_ENDPOINT_URL = os.environ.get('S3_ENDPOINT_URL')  # z.B. MinIO: http://localhost:9000
+    S3_REGION = os.environ.get('S3_REGION')
+    # Öffentliche Basis-URL des Buckets; ohne sie leitet /uploads/<key> auf eine signierte URL weiter
+    S3_PUBLIC_URL = os.environ.get('S3_PUBLIC_URL')
+    # Uploads werden in Blöcken dieser Größe gelesen, gehasht und geschrieben
+    UPLOAD_CHUNK_SIZE = 64 * 1024
+    # Unbenutzte Dateien löscht 'flask storage gc' erst nach dieser Schonfrist (Sekunden)
+    STORAGE_GC_GRACE = 3600
+
+    # --- Hintergrund-Jobs (app/tasks.py) ---
+    # 'thread' = Threadpool im Webprozess, 'external' = separater Worker ('python run.py worker'),
+    # 'sync' = sofort im Request ausführen (nur für Tests sinnvoll)
+    TASK_QUEUE_MODE = os.environ.get('TASK_QUEUE_MODE', 'thread')
+    TASK_WORKERS = int(os.environ.get('TASK_WORKERS', 2))
+    TASK_MAX_ATTEMPTS = 5
+    # Basis-Wartezeit (Sekunden) für das exponentielle Backoff bei Wiederholungen
+    TASK_RETRY_DELAY = 2
+    TASK_POLL_INTERVAL = 5
+    # Nach dieser Zeit gilt ein 'running'-Job als verwaist und wird erneut freigegeben
+    TASK_LEASE_SECONDS = 300
+
+    # --- Seiten-Cache für Startseite und Detailansicht (app/cache.py) ---
+    # 'lru' = In-Memory pro Prozess (Invalidierung über Marker-Datei), 'filesystem' = gemeinsam
+    # für alle Worker, 'null' = aus
+    PAGE_CACHE_TYPE = os.environ.get('PAGE_CACHE_TYPE', 'lru')
+    PAGE_CACHE_MAXSIZE = int(os.environ.get('PAGE_CACHE_MAXSIZE', 256))
+    PAGE_CACHE_DIR = os.environ.get('PAGE_CACHE_DIR', os.path.join(basedir, 'instance', 'page_cache'))
+
+    # --- Fragment-Cache für {% cache %} in Templates (app/fragments.py) ---
+    # Gleiche Backends wie der Seiten-Cache; Einträge sind nach Beitrag und updated_at getrennt
+    FRAGMENT_CACHE_TYPE = os.environ.get('FRAGMENT_CACHE_TYPE', 'lru')
+    FRAGMENT_CACHE_MAXSIZE = int(os.environ.get('FRAGMENT_CACHE_MAXSIZE', 20000))
+    FRAGMENT_CACHE_DIR = os.environ.get('FRAGMENT_CACHE_DIR', os.path.join(basedir, 'instance', 'fragment_cache'))
+
+    # --- Öffentliche Seiten für Reverse-Proxy/CDN (app/edge.py) ---
+    # So lange (Sekunden) dürfen geteilte Caches eine öffentliche Seite ausliefern (s-maxage);
+    # Änderungen an Beiträgen verwerfen sie vorher über Surrogate-Keys
+    EDGE_MAX_AGE = int(os.environ.get('EDGE_MAX_AGE', 300))
+    # Header mit den Surrogate-Keys: 'Surrogate-Key' (Fastly, 'flask edge proxy'), 'xkey' (Varnish), 'Cache-Tag'
+    EDGE_SURROGATE_KEY_HEADER = os.environ.get('EDGE_SURROGATE_KEY_HEADER', 'Surrogate-Key')
+    # Kommagetrennte Basis-URLs der Caches; nach Änderungen geht je ein PURGE mit den Keys dorthin
+    EDGE_PURGE_URLS = [url.strip() for url in os.environ.get('EDGE_PURGE_URLS', '').split(',') if url.strip()]
+    # Einträge im lokalen Caching-Proxy ('flask edge proxy')
+    EDGE_PROXY_MAX_ENTRIES = int(os.environ.get('EDGE_PROXY_MAX_ENTRIES', 1000))
+    # Kompilierte Templates ('flask templates compile' beim Deploy); leer = aus
+    JINJA_BYTECODE_CACHE_DIR = os.environ.get('JINJA_BYTECODE_CACHE_DIR', os.path.join(basedir, 'instance', 'jinja_cache'))
+
+    # Wird in jeden ETag eingerechnet; bei Template-Änderungen im Deploy erhöhen
+    ETAG_VERSION = os.environ.get('ETAG_VERSION', '6')
+
+    # --- Metriken im Prometheus-Format unter /metrics (app/metrics.py, benötigt prometheus_client) ---
+    # Für mehrere Worker-Prozesse zusätzlich PROMETHEUS_MULTIPROC_DIR auf ein leeres Verzeichnis setzen
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    # Scraper muss 'Authorization: Bearer <token>' senden. Ohne Token ist /metrics nur mit
+    # DEBUG/TESTING erreichbar, im Betrieb antwortet der Endpoint dann mit 403
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+    # --- Massenimport und -export von Beiträgen (app/bulk.py) ---
+    # Beiträge pro Transaktion bzw. pro Abfrage beim Export
+    BULK_BATCH_SIZE = int(os.environ.get('BULK_BATCH_SIZE', 500))
+    # Threads, die Bilder prüfen, hashen und im Datei-Speicher ablegen
+    BULK_IMAGE_WORKERS = int(os.environ.get('BULK_IMAGE_WORKERS', 4))
+    # Obergrenze für POST /admin/posts/import (statt MAX_CONTENT_LENGTH)
+    BULK_IMPORT_MAX_SIZE = int(os.environ.get('BULK_IMPORT_MAX_SIZE', 2 * 1024 * 1024 * 1024))
+
+    # --- Volltextsuche (app/search.py) ---
+    # 'auto' wählt nach Datenbank: SQLite -> FTS5, MySQL -> FULLTEXT, sonst Python-Index ('memory')
+    SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', 'auto')
+    # Bewertet werden nur die neuesten N Treffer; hält häufige Begriffe bei 100k Beiträgen im ms-Bereich
+    SEARCH_RANK_WINDOW = int(os.environ.get('SEARCH_RANK_WINDOW', 2000))
+
+    # --- Atom- und JSON-Feed (app/feeds.py) ---
+    # Werden nach jeder Änderung im Hintergrund neu geschrieben und als Dateien ausgeliefert
+    FEED_DIR = os.environ.get('FEED_DIR', os.path.join(basedir, 'instance', 'feeds'))
+    FEED_SIZE = int(os.environ.get('FEED_SIZE', 20))
+    # Absolute Links im Feed (die Jobs laufen ohne Request)
+    FEED_BASE_URL = os.environ.get('FEED_BASE_URL', 'http://localhost:5000')
+    FEED_TITLE = os.environ.get('FEED_TITLE', 'Tauchgleiter Blog')
+
+    # Beitragstexte als Markdown rendern (benötigt das optionale Paket 'markdown')
+    POST_MARKDOWN = os.environ.get('POST_MARKDOWN', 'false').lower() in ('1', 'true', 'yes')
@@ -0,0 +1,92 @@
+# ==============================================================================
+# gunicorn.conf.py – Produktionsbetrieb mit mehreren Prozessen
+# ==============================================================================
+#
+#   python run.py serve                          # startet gunicorn mit dieser Datei
+#   gunicorn -c gunicorn.conf.py run:app         # gleichwertig
+#
+# Der Master lädt die App einmal (preload_app) und forkt danach die Worker; jeder
+# Worker bedient mit mehreren Threads (gthread) parallel Requests. Einstellungen
+# kommen aus der Umgebung (WEB_*), damit dieselbe Datei überall passt.
+#
+# Signale an den Master (PID in WEB_PIDFILE bzw. im Log):
+#   HUP   Neu laden ohne Ausfall: Konfiguration und App-Code werden im Master neu
+#         geladen, neue Worker gestartet, die alten beenden laufende Requests und
+#         gehen dann (graceful_timeout). Schlägt der Import fehl, laufen die alten
+#         Worker mit dem alten Code weiter.
+#   TTIN/TTOU  einen Worker mehr/weniger, TERM  geordnet beenden
+
+import multiprocessing
+import os
+import sys
+
+bind = os.environ.get('WEB_BIND', '0.0.0.0:8000')
+
+# Prozesse × Threads = gleichzeitige Requests. Jeder Prozess hat eigene DB-Pools
+# (DB_POOL_SIZE + DB_MAX_OVERFLOW), die Datenbank muss workers × Pool Verbindungen zulassen.
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 4))
+
+# App vor dem Fork laden: Import und create_app() nur einmal, Worker teilen sich den Speicher (copy-on-write)
+preload_app = True
+
+# Worker nach so vielen Requests (plus Zufallsanteil, damit nicht alle gleichzeitig) ersetzen,
+# um langsam wachsenden Speicher (Caches, Fragmentierung) zu begrenzen; 0 = nie
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 1000))
+max_requests_jitter = max_requests // 10
+
+# Laufende Requests dürfen beim Neuladen/Beenden so lange zu Ende laufen
+graceful_timeout = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30))
+timeout = int(os.environ.get('WEB_TIMEOUT', 60))
+keepalive = 5
+
+pidfile = os.environ.get('WEB_PIDFILE')
+accesslog = os.environ.get('WEB_ACCESS_LOG', '-')
+errorlog = '-'
+# Heartbeat-Dateien der Worker im RAM statt auf einer (evtl. langsamen) Platte
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+
+def _app_modules(server):
+    # Module, die beim Neuladen frisch importiert werden: WSGI-Modul (run:app), App-Paket, Config
+    entry = getattr(server.app, 'app_uri', 'run:app').split(':')[0]
+    return [name for name in sys.modules
+            if name in (entry, 'config', 'app') or name.startswith('app.')]
+
+
+def on_reload(server):
+    """HUP: mit preload_app behält gunicorn sonst den beim Start geladenen Code."""
+    saved = {name: sys.modules.pop(name) for name in _app_modules(server)}
+    # Die Prometheus-Metriken hängen an der globalen Registry und würden beim Import doppelt angemeldet
+    metrics = saved.get('app.metrics')
+    collectors = metrics.unregister() if metrics is not None else ()
+    old_callable, server.app.callable = server.app.callable, None
+    try:
+        server.app.wsgi()
+    except Exception:
+        server.log.exception('Neuladen des App-Codes fehlgeschlagen, die Worker laufen mit dem alten Code weiter')
+        for name in _app_modules(server):
+            sys.modules.pop(name, None)
+        sys.modules.update(saved)
+        if collectors:
+            metrics.register(collectors)
+        server.app.callable = old_callable
+    else:
+        server.log.info('App-Code neu geladen')
+
+
+def post_fork(server, worker):
+    # Verbindungen aus dem Master nie im Kind weiterverwenden (geteilte Sockets);
+    # close=False lässt sie dem Master, der Worker öffnet eigene
+    from app import db
+    with server.app.wsgi().app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    # Metrik-Dateien des beendeten Workers zusammenfassen (nur mit PROMETHEUS_MULTIPROC_DIR)
+    from app.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
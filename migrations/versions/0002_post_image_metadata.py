@@ -0,0 +1,34 @@
+"""Bild-Metadaten am Beitrag: Abmessungen, dominante Farbe, Platzhalter
+
+Bestehende Beiträge füllt 'flask images backfill'.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 18:02:11.418305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('image_width', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('image_height', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('image_color', sa.String(length=7), nullable=True))
+        batch_op.add_column(sa.Column('image_placeholder', sa.String(length=400), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_column('image_placeholder')
+        batch_op.drop_column('image_color')
+        batch_op.drop_column('image_height')
+        batch_op.drop_column('image_width')
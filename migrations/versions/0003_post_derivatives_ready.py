@@ -0,0 +1,28 @@
+"""Vermerk am Beitrag, ob die Bild-Derivate im Datei-Speicher liegen
+
+Bestehende Beiträge markiert 'flask images backfill'.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 21:40:37.512904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('derivatives_ready', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_column('derivatives_ready')
@@ -1,6 +1,20 @@
+import os
+import sys
 from app import create_app
 
 app = create_app()
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == 'worker':
+        # Separater Prozess für Hintergrund-Jobs: python run.py worker
+        from app.tasks import run_worker
+        run_worker(app)
+    elif len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        # Produktion: gunicorn mit mehreren Prozessen und Threads, Einstellungen in gunicorn.conf.py.
+        # Weitere Argumente gehen an gunicorn, z.B. python run.py serve --workers 2
+        root = os.path.dirname(os.path.abspath(__file__))
+        os.execvp(sys.executable, [sys.executable, '-m', 'gunicorn', '--chdir', root,
+                                   '--config', os.path.join(root, 'gunicorn.conf.py'), *sys.argv[2:], 'run:app'])
+    else:
+        # Nur für die Entwicklung: ein Prozess, Debugger und Reloader
+        app.run(debug=True)
\ No newline at end of file
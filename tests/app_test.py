@@ -4,10 +4,12 @@
 
 import pytest
 import io
+from PIL import Image
 from werkzeug.datastructures import FileStorage
 # Die Fixtures 'app' und 'client' werden automatisch von conftest.py geladen.
 from app.models import Post, User
 from app import db
+from app.profiler import assert_max_queries
 
 
 # ==============================================================================
@@ -16,7 +18,9 @@ from app import db
 
 # Test 1: Testet die Erreichbarkeit der Startseite
 def test_index_route(client):
-    response = client.get('/')
+    # ETag-Validatoren und eine Abfrage für die Karten, unabhängig von der Anzahl der Beiträge
+    with assert_max_queries(2):
+        response = client.get('/')
     assert response.status_code == 200
     assert b'Aktuelle Projekte' in response.data  # Prüft auf Titel im HTML
     assert b'Test Post 1' in response.data  # Prüft auf den initialen Post
@@ -44,8 +48,9 @@ def test_admin_dashboard_access(client):
         remember_me='False'
     ), follow_redirects=True)
 
-    # Prüft den Dashboard-Zugriff
-    response = client.get('/admin/dashboard')
+    # Prüft den Dashboard-Zugriff (Liste und Gesamtzahl; der Admin kommt aus dem Principal-Cache)
+    with assert_max_queries(2):
+        response = client.get('/admin/dashboard')
     assert response.status_code == 200
     assert b'Admin Dashboard' in response.data
     assert b'Test Post 1' in response.data
@@ -60,8 +65,11 @@ def test_new_post_creation(client, app):
         remember_me='False'
     ), follow_redirects=True)
 
-    # Dummy-Bild für den Upload erstellen (benötigt io und FileStorage)
-    data_io = io.BytesIO(b'dummy_image_data')
+    # Kleines echtes JPEG für den Upload erstellen (benötigt io und FileStorage);
+    # der Inhalt wird anhand der Magic Bytes geprüft, Fantasie-Daten werden abgewiesen
+    buffer = io.BytesIO()
+    Image.new('RGB', (40, 30), 'navy').save(buffer, 'JPEG')
+    data_io = io.BytesIO(buffer.getvalue())
     image_filestorage = FileStorage(
         data_io, filename='test_upload.jpg', content_type='image/jpeg'
     )
@@ -0,0 +1,66 @@
+# ==============================================================================
+# tests/assets_test.py
+# ==============================================================================
+
+import gzip
+import os
+import re
+from app.assets import PRECOMPRESSED
+
+
+def css_url(client):
+    response = client.get('/')
+    match = re.search(rb'href="(/assets/[0-9a-f]+/css/main\.css)"', response.data)
+    assert match, 'CSS-Link ohne Fingerprint'
+    return match.group(1).decode()
+
+
+# Test 1: url_for('static') im Template liefert eine Fingerprint-URL, die unveränderlich gecacht wird
+def test_fingerprinted_css_is_immutable(client):
+    url = css_url(client)
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/css'
+    assert response.cache_control.immutable
+    assert response.cache_control.max_age == 365 * 24 * 3600
+
+
+# Test 2: Ein veralteter Fingerprint liefert die aktuelle Datei, aber ohne Langzeit-Cache
+def test_stale_fingerprint_is_not_cached(client):
+    response = client.get('/assets/000000000000/css/main.css')
+    assert response.status_code == 200
+    assert response.cache_control.no_cache
+    assert not response.cache_control.immutable
+    assert client.get('/assets/000000000000/css/gibt-es-nicht.css').status_code == 404
+
+
+# Test 3: 'flask assets build' komprimiert vor, ausgeliefert wird je nach Accept-Encoding
+def test_precompressed_variants(client, app):
+    css_path = os.path.join(app.static_folder, 'css', 'main.css')
+    try:
+        result = app.test_cli_runner().invoke(args=['assets', 'build'])
+        assert result.exit_code == 0, result.output
+        assert os.path.isfile(css_path + '.gz')
+
+        url = css_url(client)
+        response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.vary
+        with open(css_path, 'rb') as f:
+            assert gzip.decompress(response.data) == f.read()
+
+        assert 'Content-Encoding' not in client.get(url, headers={'Accept-Encoding': 'identity'}).headers
+    finally:
+        for ext, _ in PRECOMPRESSED:
+            if os.path.exists(css_path + ext):
+                os.remove(css_path + ext)
+
+
+# Test 4: Mit X-Accel-Redirect liefert nginx die Bytes aus, Python nur die Header
+def test_x_accel_redirect(client, app, monkeypatch):
+    monkeypatch.setitem(app.config, 'X_ACCEL_STATIC_PREFIX', '/_static/')
+    url = css_url(client)
+    response = client.get(url)
+    assert response.headers['X-Accel-Redirect'] == '/_static/css/main.css'
+    assert response.data == b''
+    assert response.cache_control.immutable
@@ -0,0 +1,38 @@
+# ==============================================================================
+# tests/benchmark_test.py
+# ==============================================================================
+# CI-Teil des Lasttests (benchmarks/load_bench.py): Die kleine Variante darf
+# pro Request nicht mehr Datenbankabfragen brauchen als in der Baseline.
+# Dazu ein kurzer Lauf des Produktionsservers (benchmarks/server_bench.py).
+
+import pytest
+from benchmarks import server_bench
+from benchmarks.load_bench import load_baseline, regressions, run
+
+
+# Test 1: Alle Szenarien laufen fehlerfrei und ohne zusätzliche Abfragen
+def test_load_bench_matches_baseline():
+    results = run()
+    baseline = load_baseline()
+    assert set(results) == set(baseline)
+    assert regressions(results, baseline) == []
+
+
+# Test 2: Mehr Abfragen, fehlende Szenarien und (mit Toleranz) langsamere Requests fallen auf
+def test_regressions_are_reported():
+    baseline = {'main.index': {'queries': 1, 'p95_ms': 10.0}, 'main.login': {'queries': 1, 'p95_ms': 10.0}}
+    results = {'main.index': {'queries': 3, 'p95_ms': 25.0, 'errors': 0}}
+
+    problems = regressions(results, baseline)
+    assert problems == ['main.index: 3.00 Abfragen pro Request (Baseline 1.00)', 'main.login: Szenario fehlt']
+
+    problems = regressions(results, baseline, tolerance=1.0)
+    assert 'main.index: p95 25.0 ms (Baseline 10.0 ms)' in problems
+
+
+# Test 3: gunicorn (run.py serve) startet mit mehreren Workern und beantwortet alle Requests
+def test_server_bench_gunicorn():
+    pytest.importorskip('gunicorn')
+    results = server_bench.run(servers=('gunicorn',), posts=20, requests=40, concurrency=4, workers=2, threads=2)
+    assert results['gunicorn']['requests'] == 40
+    assert results['gunicorn']['errors'] == 0
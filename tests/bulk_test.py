@@ -0,0 +1,154 @@
+# ==============================================================================
+# tests/bulk_test.py
+# ==============================================================================
+
+import io
+import json
+import tarfile
+from PIL import Image
+from app import db
+from app.images import DERIVATIVE_SIZES, derivative_name
+from app.models import Post, Upload
+from app.search import get_search_backend
+from app.tasks import due_job_ids, run_worker
+
+
+def image_bytes():
+    buffer = io.BytesIO()
+    Image.effect_noise((40, 30), 64).convert('RGB').save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+def login(client):
+    client.post('/login', data=dict(email='test_admin@blog.de', password='Sicher123!'))
+
+
+def ndjson(*records):
+    return ''.join(json.dumps(record) + '\n' for record in records).encode('utf-8')
+
+
+# Test 1: NDJSON-Import legt gültige Beiträge an, überspringt ungültige Zeilen und aktualisiert die Suche
+def test_import_ndjson(client, app):
+    body = ndjson({'title': 'Importiert Tauchgang', 'content': 'Wracktauchen am Bodensee.'},
+                  {'title': 'x', 'content': 'Titel zu kurz'}) + b'{kaputt\n' + \
+        ndjson({'title': 'Importiert Nachttauchgang', 'content': 'Mit Lampe.', 'created_at': '2024-05-01T20:00:00'})
+    with app.app_context():
+        login(client)
+        response = client.post('/admin/posts/import', data=body, content_type='application/x-ndjson')
+        assert response.status_code == 200
+        result = response.get_json()
+        assert result['imported'] == 2 and result['skipped'] == 2
+        assert result['errors'][0].startswith('ndjson:2:')
+
+        post = db.session.scalar(db.select(Post).where(Post.title == 'Importiert Nachttauchgang'))
+        assert post.excerpt == 'Mit Lampe.' and post.created_at.year == 2024
+        hits = get_search_backend().search('Wracktauchen', 10)
+        assert [hit.title.striptags() for hit in hits] == ['Importiert Tauchgang']
+
+
+# Test 2: Export als tar.gz mit Bild und erneuter Import ergeben dieselben Beiträge; das Bild liegt nur einmal vor
+def test_export_import_roundtrip(client, app):
+    with app.app_context():
+        login(client)
+        data = image_bytes()
+        archive = io.BytesIO()
+        with tarfile.open(fileobj=archive, mode='w:gz') as tar:
+            info = tarfile.TarInfo('images/foto.jpg')
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+            records = ndjson({'title': 'Mit Bild', 'content': 'Riff', 'image': 'images/foto.jpg'})
+            info = tarfile.TarInfo('posts/000001.ndjson')
+            info.size = len(records)
+            tar.addfile(info, io.BytesIO(records))
+        response = client.post('/admin/posts/import', data=archive.getvalue(), content_type='application/gzip')
+        assert response.get_json()['imported'] == 1
+        key = db.session.scalar(db.select(Post.image_file).where(Post.title == 'Mit Bild'))
+        assert db.session.get(Upload, key).refcount == 1
+
+        response = client.get('/admin/posts/export?format=tar.gz')
+        assert response.status_code == 200
+        assert 'posts.tar.gz' in response.headers['Content-Disposition']
+        exported = response.get_data()
+        with tarfile.open(fileobj=io.BytesIO(exported), mode='r:gz') as tar:
+            names = tar.getnames()
+            assert f'images/{key}' in names and names.index(f'images/{key}') < names.index('posts/000001.ndjson')
+            titles = [json.loads(line)['title'] for line in tar.extractfile('posts/000001.ndjson')]
+        count = db.session.scalar(db.select(db.func.count(Post.id)))
+        assert len(titles) == count
+
+        response = client.post('/admin/posts/import', data=exported, content_type='application/gzip')
+        assert response.get_json() == {'imported': count, 'skipped': 0, 'errors': []}
+        assert db.session.scalar(db.select(db.func.count(Post.id))) == 2 * count
+        db.session.expire_all()
+        assert db.session.get(Upload, key).refcount == 2
+
+
+# Test 3: Unbekannte Formate werden mit 415 abgewiesen, Nicht-Admins kommen nicht an den Export
+def test_import_rejects_unknown_type(client, app):
+    with app.app_context():
+        client.post('/login', data=dict(email='normal_user@blog.de', password='Standard456!'))
+        assert client.get('/admin/posts/export').status_code == 302
+        client.get('/logout')
+        login(client)
+        response = client.post('/admin/posts/import', data=b'a,b', content_type='text/csv')
+        assert response.status_code == 415
+
+
+# Test 4: Felder mit falschem Typ überspringen nur den Datensatz
+def test_import_skips_wrong_types(client, app):
+    body = ndjson({'title': 'Falsches Datum', 'content': 'x', 'created_at': 123},
+                  {'title': 'Bild als Liste', 'content': 'x', 'image': ['a.jpg']},
+                  {'title': 'Schlüssel als Zahl', 'content': 'x', 'image_file': 7},
+                  {'title': 'Korrekt typisiert', 'content': 'x', 'updated_at': '2024-05-01T20:00:00+02:00'})
+    with app.app_context():
+        login(client)
+        response = client.post('/admin/posts/import', data=body, content_type='application/x-ndjson')
+        assert response.status_code == 200
+        result = response.get_json()
+        assert result['imported'] == 1 and result['skipped'] == 3
+        assert [error.split(': ', 1)[0] for error in result['errors']] == ['ndjson:1', 'ndjson:2', 'ndjson:3']
+
+
+# Test 5: 'flask posts import' und 'flask posts export' sind registriert
+def test_cli_import_export(app, tmp_path):
+    source = tmp_path / 'neu.ndjson'
+    source.write_bytes(ndjson({'title': 'Per CLI importiert', 'content': 'Kommandozeile'}))
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['posts', 'import', str(source)])
+    assert result.exit_code == 0 and '1 Beitrag/Beiträge importiert' in result.output
+
+    target = tmp_path / 'alle.ndjson'
+    result = runner.invoke(args=['posts', 'export', str(target)])
+    assert result.exit_code == 0
+    assert 'Per CLI importiert' in target.read_text(encoding='utf-8')
+
+
+# Test 6: Importierte Bilder bekommen ihr srcset, sobald der Worker die Derivate erzeugt hat
+def test_imported_image_gets_srcset_after_worker(client, app, monkeypatch):
+    monkeypatch.setitem(app.config, 'TASK_QUEUE_MODE', 'external')
+    data = image_bytes()
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode='w') as tar:
+        info = tarfile.TarInfo('images/import.jpg')
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+        records = ndjson({'title': 'Importiert mit Bild', 'content': 'Riff', 'image': 'images/import.jpg'})
+        info = tarfile.TarInfo('posts/000001.ndjson')
+        info.size = len(records)
+        tar.addfile(info, io.BytesIO(records))
+    with app.app_context():
+        login(client)
+        assert client.post('/admin/posts/import', data=archive.getvalue(),
+                           content_type='application/x-tar').get_json()['imported'] == 1
+        key = db.session.scalar(db.select(Post.image_file).where(Post.title == 'Importiert mit Bild'))
+        derivative = derivative_name(key, next(iter(DERIVATIVE_SIZES)), 'webp')
+        assert derivative not in client.get('/').get_data(as_text=True)
+
+    while True:
+        with app.app_context():
+            if not due_job_ids(limit=1):
+                break
+        run_worker(app, once=True)
+
+    with app.app_context():
+        assert derivative in client.get('/').get_data(as_text=True)
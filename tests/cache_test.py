@@ -0,0 +1,80 @@
+# ==============================================================================
+# tests/cache_test.py
+# ==============================================================================
+
+from sqlalchemy import event
+from app import db
+from app.cache import LRUCache, FileSystemCache
+
+
+# Test 1: Der LRU-Cache verdrängt den am längsten nicht genutzten Eintrag
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+
+
+# Test 2: Invalidierung über die Marker-Datei erreicht auch andere Prozesse (Instanzen)
+def test_lru_cache_marker_invalidates_other_instances(tmp_path):
+    marker = str(tmp_path / 'invalidated')
+    worker_a = LRUCache(marker_file=marker)
+    worker_b = LRUCache(marker_file=marker)
+    worker_b.set('seite', b'alt')
+
+    worker_a.clear()
+    assert worker_b.get('seite') is None
+
+
+# Test 3: Der Dateisystem-Cache speichert und leert Einträge
+def test_filesystem_cache_roundtrip(tmp_path):
+    cache = FileSystemCache(str(tmp_path))
+    cache.set('/?page=1|anon', (b'<html>', 200, []))
+    assert FileSystemCache(str(tmp_path)).get('/?page=1|anon') == (b'<html>', 200, [])
+    cache.clear()
+    assert cache.get('/?page=1|anon') is None
+
+
+# Test 4: Anonyme Wiederholungsanfragen erreichen die Datenbank nicht
+def test_cached_index_skips_database(client, app):
+    first = client.get('/')
+    assert first.status_code == 200
+
+    statements = []
+    with app.app_context():
+        engine = db.engine
+
+    def count(*args):
+        statements.append(args[2])
+
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        second = client.get('/')
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+
+    assert second.data == first.data
+    assert statements == []
+
+
+# Test 5: Ein neuer Beitrag über das Admin-Formular invalidiert den Cache
+def test_new_post_invalidates_page_cache(client):
+    assert b'Cache-Test Beitrag' not in client.get('/').data
+
+    client.post('/login', data=dict(
+        email='test_admin@blog.de',
+        password='Sicher123!',
+        remember_me='False'
+    ), follow_redirects=True)
+    client.post('/admin/post/new', data=dict(
+        title='Cache-Test Beitrag',
+        content='Muss sofort auf der Startseite erscheinen.',
+        submit='Speichern'
+    ), follow_redirects=True)
+    client.get('/logout', follow_redirects=True)
+
+    assert b'Cache-Test Beitrag' in client.get('/').data
@@ -0,0 +1,99 @@
+# ==============================================================================
+# tests/conditional_test.py
+# ==============================================================================
+
+import sqlite3
+from sqlalchemy import create_engine
+from app import db
+from app.models import Post
+from app.schema import upgrade_schema
+
+
+def login(client):
+    client.post('/login', data=dict(
+        email='test_admin@blog.de',
+        password='Sicher123!',
+        remember_me='False'
+    ), follow_redirects=True)
+
+
+# Test 1: Die Detailseite liefert ETag und Last-Modified, Wiederholungen erhalten 304
+def test_post_detail_not_modified(client, app):
+    with app.app_context():
+        post_id = Post.query.filter_by(title='Test Post 1').first().id
+
+    response = client.get(f'/post/{post_id}')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert response.headers['Last-Modified']
+
+    repeat = client.get(f'/post/{post_id}', headers={'If-None-Match': etag})
+    assert repeat.status_code == 304
+    assert repeat.data == b''
+
+    since = client.get(f'/post/{post_id}', headers={'If-Modified-Since': response.headers['Last-Modified']})
+    assert since.status_code == 304
+
+
+# Test 2: Nach einer Änderung passt der alte ETag nicht mehr
+def test_post_update_changes_etag(client, app):
+    with app.app_context():
+        post_id = Post.query.filter_by(title='Test Post 1').first().id
+    etag = client.get(f'/post/{post_id}').headers['ETag']
+
+    login(client)
+    client.post(f'/admin/post/{post_id}/update', data=dict(
+        title='Test Post 1',
+        content='Geänderter Inhalt des ersten Testbeitrags.',
+        submit='Speichern'
+    ), follow_redirects=True)
+    client.get('/logout', follow_redirects=True)
+
+    response = client.get(f'/post/{post_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert 'Geänderter Inhalt'.encode() in response.data
+    assert response.headers['ETag'] != etag
+
+
+# Test 3: Auf der Startseite ändert ein gelöschter Beitrag den ETag der Seite
+def test_index_etag_changes_after_delete(client, app):
+    with app.app_context():
+        post = Post(title='Kurzlebig', content='...')
+        db.session.add(post)
+        db.session.commit()
+        post_id = post.id
+    # Die Startseite wurde in diesem Modul noch nicht abgerufen, der Seiten-Cache ist also leer
+
+    etag = client.get('/').headers['ETag']
+    assert client.get('/', headers={'If-None-Match': etag}).status_code == 304
+
+    login(client)
+    client.post(f'/admin/post/{post_id}/delete', follow_redirects=True)
+    client.get('/logout', follow_redirects=True)
+
+    assert client.get('/', headers={'If-None-Match': etag}).status_code == 200
+
+
+# Test 4: Unbekannte Beiträge ergeben weiterhin 404
+def test_post_detail_missing(client):
+    assert client.get('/post/999999').status_code == 404
+
+
+# Test 5: upgrade_schema ergänzt die Spalte updated_at in einer alten Datenbank
+def test_upgrade_schema_adds_updated_at(app, tmp_path):
+    path = tmp_path / 'alt.db'
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE post (id INTEGER PRIMARY KEY, user_id INTEGER, title VARCHAR(100) NOT NULL, '
+                 'content TEXT NOT NULL, image_file VARCHAR(120), created_at DATETIME)')
+    conn.execute("INSERT INTO post (title, content, created_at) VALUES ('Alt', 'x', '2025-01-01 10:00:00')")
+    conn.commit()
+    conn.close()
+
+    engine = create_engine(f'sqlite:///{path}')
+    with app.app_context():
+        added = upgrade_schema(engine)
+    assert 'post.updated_at' in added
+
+    conn = sqlite3.connect(path)
+    assert conn.execute('SELECT updated_at FROM post').fetchone()[0] == '2025-01-01 10:00:00'
+    conn.close()
@@ -6,6 +6,7 @@ import pytest
 import os
 import shutil
 from app import create_app, db
+from app.search import ensure_search_schema
 from app.models import User, Post
 from config import Config
 from werkzeug.security import generate_password_hash
@@ -25,6 +26,22 @@ class TestConfig(Config):
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
     # CSRF für die Tests deaktivieren
     WTF_CSRF_ENABLED = False
+    # Hintergrund-Jobs direkt im Request ausführen, damit Tests deterministisch bleiben
+    TASK_QUEUE_MODE = 'sync'
+    # Marker-Datei des Seiten-Caches ebenfalls in einem temporären Verzeichnis
+    PAGE_CACHE_DIR = os.path.join(os.getcwd(), 'test_cache')
+    # Fragment-Cache und kompilierte Templates ebenfalls temporär
+    FRAGMENT_CACHE_DIR = os.path.join(os.getcwd(), 'test_cache', 'fragments')
+    JINJA_BYTECODE_CACHE_DIR = os.path.join(os.getcwd(), 'test_cache', 'jinja')
+    # Erzeugte Feeds
+    FEED_DIR = os.path.join(os.getcwd(), 'test_cache', 'feeds')
+    # Angefangene Uploads in Teilen
+    UPLOAD_SESSION_DIR = os.path.join(os.getcwd(), 'test_uploads', '.sessions')
+    # Die Tests melden sich sehr oft von derselben IP an
+    LOGIN_RATE_LIMIT = 1000
+    # Jeder Request im Test wird auf wiederholte Abfragen (N+1) geprüft
+    QUERY_PROFILER = True
+    QUERY_PROFILER_RAISE = True
 
 
 # Fixture für die App-Instanz und den Datenbank-Kontext (SCOPE='module')
@@ -41,6 +58,8 @@ def app():
         # Löscht alte Tabellen und erstellt neue
         db.drop_all()
         db.create_all()
+        # create_app legt kein Schema mehr an (siehe 'flask schema upgrade')
+        ensure_search_schema()
 
         # Erstellt Admin und Test-User
         if not User.query.filter_by(email='test_admin@blog.de').first():
@@ -71,6 +90,8 @@ def app():
     # Löscht den temporären Upload-Ordner und dessen Inhalt
     if os.path.exists(app.config['UPLOAD_FOLDER']):
         shutil.rmtree(app.config['UPLOAD_FOLDER'])
+    if os.path.exists(app.config['PAGE_CACHE_DIR']):
+        shutil.rmtree(app.config['PAGE_CACHE_DIR'])
 
 
 # Fixture für den Test-Client (SCOPE='function')
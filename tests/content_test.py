@@ -0,0 +1,76 @@
+# ==============================================================================
+# tests/content_test.py
+# ==============================================================================
+
+import pytest
+from sqlalchemy import event
+from app import db
+from app.models import Post
+from app.content import render_plain, render_markdown, make_excerpt, EXCERPT_LENGTH
+
+
+# Test 1: Klartext wird escaped, Absätze und Zeilenumbrüche bleiben erhalten
+def test_render_plain_escapes_and_keeps_breaks():
+    html = render_plain('Erste <b>Zeile</b>\nzweite Zeile\n\nNeuer Absatz')
+    assert '<b>' not in html
+    assert html == '<p>Erste &lt;b&gt;Zeile&lt;/b&gt;<br>\nzweite Zeile</p>\n<p>Neuer Absatz</p>'
+
+
+# Test 2: Abgeleitete Felder werden beim Setzen von content berechnet
+def test_derived_fields_set_on_assignment(app):
+    with app.app_context():
+        post = Post(title='Lang', content='Wort ' * 450)
+        assert post.excerpt == ('Wort ' * 450)[:EXCERPT_LENGTH] + '...'
+        assert post.word_count == 450
+        assert post.reading_time == 3
+
+        post.content = 'Kurz'
+        assert post.excerpt == make_excerpt('Kurz') == 'Kurz'
+        assert post.content_html == '<p>Kurz</p>'
+
+
+# Test 3: Markdown rendert Formatierung, rohes HTML wird nicht übernommen
+def test_render_markdown_escapes_raw_html():
+    pytest.importorskip('markdown')
+    html = render_markdown('**fett**\n\n<script>alert(1)</script>')
+    assert '<strong>fett</strong>' in html
+    assert '<script>' not in html
+
+
+# Test 4: Der Backfill-Befehl füllt Beiträge ohne gerendertes HTML nach
+def test_backfill_command(app):
+    with app.app_context():
+        post = Post(title='Altbestand', content='Text aus der Zeit vor der Migration')
+        db.session.add(post)
+        db.session.commit()
+        db.session.execute(db.update(Post).where(Post.id == post.id).values(
+            excerpt=None, content_html=None, word_count=None, reading_time=None))
+        db.session.commit()
+        post_id = post.id
+
+    result = app.test_cli_runner().invoke(args=['posts', 'backfill'])
+    assert result.exit_code == 0, result.output
+
+    with app.app_context():
+        post = db.session.get(Post, post_id)
+        assert post.content_html == '<p>Text aus der Zeit vor der Migration</p>'
+        assert post.word_count == 7
+
+
+# Test 5: Die Startseite lädt die content-Spalte nicht
+def test_index_does_not_select_content(client, app):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM post' in statement:
+            statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            response = client.get('/?nocache=1')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+    assert response.status_code == 200
+    assert statements
+    assert not any('post.content AS' in statement for statement in statements)
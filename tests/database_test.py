@@ -0,0 +1,88 @@
+# ==============================================================================
+# tests/database_test.py
+# ==============================================================================
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from app.database import engine_options, install_statement_timeout
+
+
+def login(client, app, email, password):
+    with app.app_context():
+        client.post('/login', data=dict(
+            email=email,
+            password=password,
+            remember_me='False'
+        ), follow_redirects=True)
+
+
+def get(client, app, url):
+    # Eigener App-Kontext pro Request, damit die Zähler in g nicht über Requests hinweg wachsen
+    with app.app_context():
+        return client.get(url)
+
+
+# Test 1: Pool-Optionen gelten nur für Server-Datenbanken, das Timeout für PostgreSQL als Verbindungsoption
+def test_engine_options_from_config():
+    config = {'SQLALCHEMY_DATABASE_URI': 'mysql+pymysql://u:p@db/blog', 'DB_POOL_PRE_PING': True,
+              'DB_POOL_SIZE': 7, 'DB_MAX_OVERFLOW': 3, 'DB_POOL_TIMEOUT': 5, 'DB_POOL_RECYCLE': 600,
+              'DB_STATEMENT_TIMEOUT_MS': 2000}
+    assert engine_options(config) == {'pool_pre_ping': True, 'pool_size': 7, 'max_overflow': 3,
+                                      'pool_timeout': 5, 'pool_recycle': 600}
+
+    postgres = engine_options({**config, 'SQLALCHEMY_DATABASE_URI': 'postgresql://u:p@db/blog'})
+    assert postgres['connect_args'] == {'options': '-c statement_timeout=2000'}
+
+    sqlite = engine_options({**config, 'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+                             'SQLALCHEMY_ENGINE_OPTIONS': {'pool_pre_ping': False}})
+    assert sqlite == {'pool_pre_ping': False}
+
+
+# Test 2: Das Statement-Timeout bricht unter SQLite lange Abfragen ab, kurze laufen normal
+def test_sqlite_statement_timeout():
+    engine = create_engine('sqlite://')
+    install_statement_timeout(engine, 50)
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT 1')).scalar() == 1
+        with pytest.raises(OperationalError, match='interrupted'):
+            conn.execute(text(
+                'WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT count(*) FROM n'
+            )).scalar()
+        # Die Verbindung bleibt danach nutzbar
+        assert conn.execute(text('SELECT 2')).scalar() == 2
+
+
+# Test 3: Der Kennzahlen-Endpoint ist nur für Admins und zählt Abfragen pro Endpoint
+def test_db_metrics_endpoint(client, app):
+    response = get(client, app, '/admin/metrics/db')
+    assert response.status_code == 302
+
+    login(client, app, 'normal_user@blog.de', 'Standard456!')
+    response = get(client, app, '/admin/metrics/db')
+    assert response.status_code == 302
+    get(client, app, '/logout')
+
+    login(client, app, 'test_admin@blog.de', 'Sicher123!')
+    get(client, app, '/about')
+    get(client, app, '/post/1')
+    response = get(client, app, '/admin/metrics/db')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['pool']['default']['class']
+    assert data['pool_events']['checkout'] >= 1
+    assert data['endpoints']['main.post_detail']['requests'] >= 1
+    assert data['endpoints']['main.post_detail']['queries'] >= 1
+    assert 'no-store' in response.headers['Cache-Control']
+
+
+# Test 4: Mit DB_SERVER_TIMING steht die Abfragezahl im Server-Timing-Header
+def test_server_timing_header(client, app):
+    app.config['DB_SERVER_TIMING'] = True
+    try:
+        response = get(client, app, '/post/1')
+    finally:
+        app.config['DB_SERVER_TIMING'] = False
+    assert response.status_code == 200
+    assert response.headers['Server-Timing'].startswith('db;dur=')
+    assert 'Abfragen' in response.headers['Server-Timing']
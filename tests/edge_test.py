@@ -0,0 +1,93 @@
+# ==============================================================================
+# tests/edge_test.py
+# ==============================================================================
+
+import http.client
+import threading
+from werkzeug.serving import make_server
+from werkzeug.test import Client
+from app import db
+from app.edge_proxy import EdgeCache
+from app.models import Post
+
+
+def login(client):
+    client.post('/login', data=dict(email='test_admin@blog.de', password='Sicher123!'))
+
+
+def post_id(app):
+    with app.app_context():
+        return db.session.scalar(db.select(Post.id).order_by(Post.id))
+
+
+# Test 1: Öffentliche Seiten sind für anonyme Besucher und Admins gleich und dürfen geteilt gecacht werden
+def test_public_page_is_shared(client, app):
+    with app.app_context():
+        anonymous = client.get('/about')
+    assert anonymous.status_code == 200
+    assert anonymous.cache_control.public and anonymous.cache_control.s_maxage == app.config['EDGE_MAX_AGE']
+    assert 'Set-Cookie' not in anonymous.headers and 'Cookie' not in anonymous.vary
+    assert anonymous.headers['Surrogate-Key'] == 'pages'
+
+    with app.app_context():
+        login(client)
+        admin = client.get(f'/post/{post_id(app)}')
+        assert 'Set-Cookie' not in admin.headers and 'Cookie' not in admin.vary
+        assert admin.headers['Surrogate-Key'] == f'post-{post_id(app)} pages'
+        assert b'Admin Dashboard' not in admin.data
+        assert client.get('/about').data == anonymous.data
+
+
+# Test 2: Navigation und Flash-Meldungen kommen über /fragments/user, ohne Cookie gibt es nichts
+def test_user_fragment(client, app):
+    with app.app_context():
+        response = client.get('/fragments/user')
+        assert response.status_code == 204
+        assert response.cache_control.public and 'Cookie' in response.vary
+
+        login(client)
+        response = client.get('/fragments/user')
+        fragment = response.get_json()
+        assert 'Admin Dashboard' in fragment['nav'] and 'Willkommen' in fragment['flashes']
+        assert response.cache_control.private and response.cache_control.no_store
+
+        # Die Meldung nach dem Logout bleibt auf der (öffentlichen) Startseite in der Session
+        client.get('/logout')
+        assert client.get('/').status_code == 200
+        fragment = client.get('/fragments/user').get_json()
+        assert 'Admin Login' in fragment['nav'] and 'abgemeldet' in fragment['flashes']
+
+
+# Test 3: Der Caching-Proxy liefert Wiederholungen aus dem Cache und verwirft Seiten nach einer Änderung
+def test_edge_cache_purge(client, app):
+    proxy = EdgeCache(app)
+    server = make_server('127.0.0.1', 0, proxy, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    app.config['EDGE_PURGE_URLS'] = [f'http://127.0.0.1:{server.server_port}']
+    browser = Client(proxy)
+    try:
+        pid = post_id(app)
+        target = f'/post/{pid}'
+        with app.app_context():
+            assert browser.get(target).headers['X-Cache'] == 'MISS'
+            cached = browser.get(target)
+            assert cached.headers['X-Cache'] == 'HIT' and 'Surrogate-Key' not in cached.headers
+            assert browser.get('/').headers['X-Cache'] == 'MISS'
+
+            login(client)
+            client.post(f'/admin/post/{pid}/update', data=dict(title='Geänderter Titel', content='Neuer Inhalt'))
+        with app.app_context():
+            response = browser.get(target)
+            assert response.headers['X-Cache'] == 'MISS' and 'Geänderter Titel' in response.get_data(as_text=True)
+            assert browser.get('/').headers['X-Cache'] == 'MISS'
+
+            # PURGE nur von localhost
+            connection = http.client.HTTPConnection('127.0.0.1', server.server_port)
+            connection.request('PURGE', '/', headers={'Surrogate-Key': 'pages'})
+            assert connection.getresponse().status == 200
+            assert browser.get(target).headers['X-Cache'] == 'MISS'
+            assert browser.open(target, method='PURGE', environ_base={'REMOTE_ADDR': '10.0.0.1'}).status_code == 403
+    finally:
+        app.config['EDGE_PURGE_URLS'] = []
+        server.shutdown()
@@ -0,0 +1,69 @@
+# ==============================================================================
+# tests/feeds_test.py
+# ==============================================================================
+
+import json
+import os
+from app import db
+from app.models import Post
+
+
+def login(client, app):
+    with app.app_context():
+        client.post('/login', data=dict(email='test_admin@blog.de', password='Sicher123!'))
+
+
+def entry_path(app, post_id, fmt):
+    return os.path.join(app.config['FEED_DIR'], 'entries', f'{post_id}.{fmt}')
+
+
+# Test 1: Neuer Beitrag landet in beiden Feeds, Abruf mit ETag liefert 304
+def test_created_post_appears_in_feeds(client, app):
+    login(client, app)
+    with app.app_context():
+        client.post('/admin/post/new', data={'title': 'Feed-Test', 'content': 'Tauchgang <b>ok</b>'})
+        post_id = db.session.scalar(db.select(Post.id).where(Post.title == 'Feed-Test'))
+
+    response = client.get('/feed.atom')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/atom+xml'
+    assert b'<title>Feed-Test</title>' in response.data
+    assert f'/post/{post_id}</id>'.encode() in response.data
+    etag = response.headers['ETag']
+
+    assert client.get('/feed.atom', headers={'If-None-Match': etag}).status_code == 304
+
+    feed = json.loads(client.get('/feed.json').data)
+    assert feed['version'] == 'https://jsonfeed.org/version/1.1'
+    assert feed['items'][0]['title'] == 'Feed-Test'
+    assert feed['items'][0]['url'].endswith(f'/post/{post_id}')
+
+
+# Test 2: Eine Änderung rendert nur den betroffenen Eintrag neu
+def test_update_only_rerenders_changed_entry(client, app):
+    login(client, app)
+    with app.app_context():
+        for title in ('Feed A', 'Feed B'):
+            client.post('/admin/post/new', data={'title': title, 'content': 'Inhalt'})
+        first, second = db.session.scalars(
+            db.select(Post.id).where(Post.title.in_(['Feed A', 'Feed B'])).order_by(Post.id)).all()
+
+    untouched = os.stat(entry_path(app, first, 'atom')).st_mtime_ns
+    with app.app_context():
+        client.post(f'/admin/post/{second}/update', data={'title': 'Feed B neu', 'content': 'Inhalt'})
+
+    assert os.stat(entry_path(app, first, 'atom')).st_mtime_ns == untouched
+    assert b'Feed B neu' in client.get('/feed.atom').data
+
+
+# Test 3: Gelöschte Beiträge verschwinden aus Feed und Eintragsverzeichnis
+def test_deleted_post_removed_from_feeds(client, app):
+    login(client, app)
+    with app.app_context():
+        client.post('/admin/post/new', data={'title': 'Feed weg', 'content': 'Inhalt'})
+        post_id = db.session.scalar(db.select(Post.id).where(Post.title == 'Feed weg'))
+        client.post(f'/admin/post/{post_id}/delete')
+
+    assert not os.path.exists(entry_path(app, post_id, 'json'))
+    feed = json.loads(client.get('/feed.json').data)
+    assert 'Feed weg' not in [item['title'] for item in feed['items']]
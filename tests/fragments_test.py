@@ -0,0 +1,64 @@
+# ==============================================================================
+# tests/fragments_test.py
+# ==============================================================================
+
+import os
+from datetime import datetime, timedelta
+from flask import render_template_string
+from app import db
+from app.fragments import compile_command, get_fragment_cache
+from app.models import Post
+
+TEMPLATE = "{% cache 'test', post_id, version %}<b>{{ render() }}</b>{% endcache %}"
+
+
+# Test 1: Ein Fragment wird nur einmal gerendert, bis sich ein Teil des Schlüssels ändert
+def test_fragment_rendered_once_per_key(app):
+    calls = []
+
+    def render():
+        calls.append(1)
+        return '<Titel>'
+
+    with app.test_request_context():
+        first = render_template_string(TEMPLATE, post_id=1, version='a', render=render)
+        second = render_template_string(TEMPLATE, post_id=1, version='a', render=render)
+        assert first == second == '<b>&lt;Titel&gt;</b>'
+        assert len(calls) == 1
+
+        render_template_string(TEMPLATE, post_id=1, version='b', render=render)
+        render_template_string(TEMPLATE, post_id=2, version='a', render=render)
+        assert len(calls) == 3
+
+
+# Test 2: Karten auf der Startseite werden über Requests hinweg wiederverwendet und nach einer Änderung neu gebaut
+def test_index_cards_are_reused(client, app):
+    with app.app_context():
+        app.extensions['page_cache'].clear()
+        get_fragment_cache().clear()
+        assert b'Test Post 1' in client.get('/').data
+
+        # Eintrag der Karte manipulieren: der nächste Request muss genau diesen Inhalt ausliefern
+        cache = get_fragment_cache()
+        card_keys = [key for key in cache._data if 'main/index.html' in key]
+        assert card_keys
+        for key in card_keys:
+            cache.set(key, '<div>aus dem Fragment-Cache</div>')
+        app.extensions['page_cache'].clear()
+        assert b'aus dem Fragment-Cache' in client.get('/').data
+
+        # Ein neuer Stand des Beitrags (updated_at) ergibt einen neuen Schlüssel
+        post = db.session.scalars(db.select(Post).order_by(Post.id)).first()
+        post.updated_at = datetime.now() + timedelta(seconds=1)
+        db.session.commit()
+        app.extensions['page_cache'].clear()
+        response = client.get('/')
+        assert b'aus dem Fragment-Cache' not in response.data
+        assert post.title.encode() in response.data
+
+
+# Test 3: 'flask templates compile' legt den Bytecode aller Templates ab
+def test_compile_templates(app):
+    result = app.test_cli_runner().invoke(compile_command)
+    assert 'Template(s) kompiliert' in result.output
+    assert any(name.endswith('.cache') for name in os.listdir(app.config['JINJA_BYTECODE_CACHE_DIR']))
@@ -0,0 +1,143 @@
+# ==============================================================================
+# tests/images_test.py
+# ==============================================================================
+
+import io
+import os
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+from app import db
+from app.images import (create_derivatives, derivative_name, image_metadata, mark_derivatives_ready, DERIVATIVE_DIR,
+                        DERIVATIVE_SIZES, METADATA_FIELDS)
+from app.models import Post
+from app.signals import post_changed
+from app.storage import get_storage
+
+
+# Test 1: Aus einem großen Foto entstehen alle Größen in JPEG und WebP, ohne EXIF
+def test_create_derivatives_resizes_and_strips_exif(app, tmp_path):
+    source = tmp_path / 'foto.jpg'
+    exif = Image.Exif()
+    exif[0x010F] = 'Testkamera'  # Make-Tag
+    Image.new('RGB', (2400, 1600), 'navy').save(source, 'JPEG', exif=exif)
+
+    with app.app_context():
+        written = create_derivatives(str(source))
+
+    assert len(written) == len(DERIVATIVE_SIZES) * 2
+    for size, max_width in DERIVATIVE_SIZES.items():
+        for ext in ('jpg', 'webp'):
+            path = tmp_path / DERIVATIVE_DIR / derivative_name('foto.jpg', size, ext)
+            with Image.open(path) as image:
+                assert image.width == max_width
+                assert not image.getexif()
+    # Das Original bleibt unverändert erhalten
+    assert os.path.getsize(source) > 0
+
+
+# Test 2: Kleine Bilder werden nicht hochskaliert
+def test_create_derivatives_never_upscales(app, tmp_path):
+    source = tmp_path / 'klein.png'
+    Image.new('RGBA', (200, 100), (255, 0, 0, 128)).save(source, 'PNG')
+
+    with app.app_context():
+        create_derivatives(str(source))
+
+    with Image.open(tmp_path / DERIVATIVE_DIR / derivative_name('klein.png', 'detail', 'jpg')) as image:
+        assert image.size == (200, 100)
+
+
+# Test 3: Nicht lesbare Dateien werden übersprungen statt einen Fehler zu werfen
+def test_create_derivatives_skips_invalid_files(app, tmp_path):
+    source = tmp_path / 'kaputt.jpg'
+    source.write_bytes(b'dummy_image_data')
+
+    with app.app_context():
+        assert create_derivatives(str(source)) == []
+
+
+# Test 4: Metadaten berücksichtigen die EXIF-Drehung; der Platzhalter ist eine kleine data:-URI
+def test_image_metadata(app, tmp_path):
+    source = tmp_path / 'hochkant.jpg'
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: 90° im Uhrzeigersinn
+    Image.new('RGB', (1200, 800), (200, 30, 30)).save(source, 'JPEG', exif=exif)
+
+    with app.app_context():
+        metadata = image_metadata(str(source))
+        assert (metadata['image_width'], metadata['image_height']) == (800, 1200)
+        assert metadata['image_color'].startswith('#c') and len(metadata['image_color']) == 7
+        assert metadata['image_placeholder'].startswith('data:image/webp;base64,')
+        assert len(metadata['image_placeholder']) < 400
+
+        (tmp_path / 'kaputt.jpg').write_bytes(b'dummy_image_data')
+        assert image_metadata(str(tmp_path / 'kaputt.jpg')) == dict.fromkeys(METADATA_FIELDS)
+
+
+# Test 5: Beim Upload gespeicherte Metadaten landen als Abmessungen, lazy-Attribute und Platzhalter im HTML
+def test_lazy_image_markup(client, app):
+    data = io.BytesIO()
+    Image.new('RGB', (640, 480), (20, 90, 160)).save(data, 'JPEG')
+    data.seek(0)
+    with app.app_context():
+        client.post('/login', data=dict(email='test_admin@blog.de', password='Sicher123!'))
+        client.post('/admin/post/new', data=dict(
+            title='Bild mit Platzhalter',
+            content='Inhalt',
+            image=FileStorage(data, filename='blau.jpg', content_type='image/jpeg'),
+        ))
+        post = db.session.scalar(db.select(Post).where(Post.title == 'Bild mit Platzhalter'))
+        assert (post.image_width, post.image_height) == (640, 480)
+
+        page = client.get(f'/post/{post.id}').get_data(as_text=True)
+        assert 'width="640" height="480"' in page and 'fetchpriority="high"' in page
+        assert post.image_placeholder in page
+
+        page = client.get('/').get_data(as_text=True)
+        assert page.count('loading="lazy"') == page.count('<img') - 1
+
+
+# Test 6: Der Job vermerkt fertige Derivate am Beitrag, die Startseite fragt den Datei-Speicher nicht mehr
+def test_derivatives_ready_flag(client, app, monkeypatch):
+    data = io.BytesIO()
+    Image.new('RGB', (900, 600), (200, 40, 40)).save(data, 'JPEG')
+    data.seek(0)
+    with app.app_context():
+        client.post('/login', data=dict(email='test_admin@blog.de', password='Sicher123!'))
+        client.post('/admin/post/new', data=dict(
+            title='Bild mit Derivaten',
+            content='Inhalt',
+            image=FileStorage(data, filename='rot.jpg', content_type='image/jpeg'),
+        ))
+        post = db.session.scalar(db.select(Post).where(Post.title == 'Bild mit Derivaten'))
+        assert post.derivatives_ready
+
+        def no_storage_lookup(self, key):
+            raise AssertionError(f'Datei-Speicher abgefragt: {key}')
+
+        monkeypatch.setattr(type(get_storage()), 'exists', no_storage_lookup)
+        app.extensions['page_cache'].clear()
+        app.extensions['fragment_cache'].clear()
+        page = client.get('/').get_data(as_text=True)
+        assert 'type="image/webp"' in page
+
+
+# Test 7: Setzt der Vermerk um, gelten die Beiträge als geändert (Seiten-Cache, Feeds, Reverse-Proxy)
+def test_mark_derivatives_ready_sends_post_changed(app):
+    changed = []
+
+    def receiver(sender, post_id, action, **extra):
+        changed.append((post_id, action))
+
+    with app.app_context():
+        post = Post(title='Noch ohne Derivate', content='Inhalt', image_file='wartet.jpg')
+        db.session.add(post)
+        db.session.commit()
+        with post_changed.connected_to(receiver):
+            assert mark_derivatives_ready('wartet.jpg') == 1
+            assert mark_derivatives_ready('wartet.jpg') == 0
+        assert changed == [(post.id, 'updated')]
+        post_id = post.id
+        db.session.delete(post)
+        db.session.commit()
+        post_changed.send(app, post_id=post_id, action='deleted')
@@ -0,0 +1,97 @@
+# ==============================================================================
+# tests/metrics_test.py
+# ==============================================================================
+
+import io
+import pytest
+from app import db
+from app.storage import store
+
+# Ohne das optionale Paket gibt es keine Metriken
+REGISTRY = pytest.importorskip('prometheus_client').REGISTRY
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def get(client, app, url, **kwargs):
+    # Eigener App-Kontext pro Request (wie im Betrieb)
+    with app.app_context():
+        return client.get(url, **kwargs)
+
+
+# Test 1: Latenz, Anfragen, DB-Abfragen und Templates werden pro Endpoint erfasst
+def test_request_metrics(client, app):
+    before_count = sample('http_request_duration_seconds_count', endpoint='main.post_detail')
+    before_queries = sample('db_queries_total', endpoint='main.post_detail')
+    before_render = sample('template_render_seconds_count', template='main/post_detail.html')
+
+    app.extensions['page_cache'].clear()
+    assert get(client, app, '/post/1').status_code == 200
+
+    assert sample('http_request_duration_seconds_count', endpoint='main.post_detail') == before_count + 1
+    assert sample('http_requests_total', endpoint='main.post_detail', method='GET', status='200') >= 1
+    assert sample('db_queries_total', endpoint='main.post_detail') > before_queries
+    assert sample('template_render_seconds_count', template='main/post_detail.html') == before_render + 1
+
+
+# Test 2: Treffer und Fehltreffer im Seiten-Cache werden gezählt
+def test_page_cache_metrics(client, app):
+    app.extensions['page_cache'].clear()
+    misses = sample('page_cache_requests_total', result='miss')
+    hits = sample('page_cache_requests_total', result='hit')
+    get(client, app, '/post/1')
+    get(client, app, '/post/1')
+    assert sample('page_cache_requests_total', result='miss') == misses + 1
+    assert sample('page_cache_requests_total', result='hit') == hits + 1
+
+
+# Test 3: Upload-Bytes und Deduplizierung
+def test_upload_metrics(app):
+    data = b'metrics-upload-' * 100
+    before_bytes = sample('upload_bytes_total')
+    before_dedup = sample('uploads_total', deduplicated='true')
+    with app.app_context():
+        store(io.BytesIO(data), '.png')
+        store(io.BytesIO(data), '.png')
+        db.session.rollback()
+    assert sample('upload_bytes_total') == before_bytes + 2 * len(data)
+    assert sample('uploads_total', deduplicated='true') == before_dedup + 1
+
+
+# Test 4: /metrics liefert das Textformat, optional nur mit Token
+def test_metrics_endpoint(client, app):
+    response = get(client, app, '/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert b'http_request_duration_seconds_bucket' in response.data
+
+    app.config['METRICS_TOKEN'] = 'geheim'
+    try:
+        assert get(client, app, '/metrics').status_code == 403
+        response = get(client, app, '/metrics', headers={'Authorization': 'Bearer geheim'})
+        assert response.status_code == 200
+    finally:
+        app.config['METRICS_TOKEN'] = None
+
+    # Ohne Token nur in Entwicklung und Tests
+    app.testing = False
+    try:
+        assert get(client, app, '/metrics').status_code == 403
+    finally:
+        app.testing = True
+
+
+# Test 5: Fehlt prometheus_client trotz METRICS_ENABLED, wird das als Fehler protokolliert
+def test_missing_package_is_logged(monkeypatch, caplog):
+    from flask import Flask
+    from app import metrics
+
+    monkeypatch.setattr(metrics, 'Counter', None)
+    app = Flask(__name__)
+    app.config.update(METRICS_ENABLED=True, METRICS_TOKEN=None)
+    metrics.init_app(app)
+    assert 'prometheus_client' in caplog.text
+    assert 'metrics' not in app.view_functions
+
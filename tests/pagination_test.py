@@ -0,0 +1,85 @@
+# ==============================================================================
+# tests/pagination_test.py
+# ==============================================================================
+
+import re
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models import Post
+from app.pagination import paginate_posts, encode_cursor, decode_cursor
+
+
+@pytest.fixture(scope='module', autouse=True)
+def many_posts(app):
+    # 12 Beiträge mit eindeutigen Zeitstempeln, zwei davon mit identischem created_at
+    with app.app_context():
+        base = datetime(2024, 1, 1, 12, 0)
+        for i in range(12):
+            created_at = base + timedelta(hours=i if i != 11 else 10)
+            db.session.add(Post(title=f'Meilenstein {i:02d}', content='...', created_at=created_at))
+        db.session.commit()
+
+
+def titles(page):
+    return [post.title for post in page.items]
+
+
+# Test 1: Vorwärts und rückwärts blättern liefert lückenlos alle Beiträge in fester Reihenfolge
+def test_keyset_pages_cover_all_posts(app):
+    with app.app_context():
+        expected = [post.title for post in db.session.scalars(
+            db.select(Post).order_by(Post.created_at.desc(), Post.id.desc()))]
+
+        seen, page, pages = [], paginate_posts(db.select(Post), per_page=5), []
+        while True:
+            pages.append(page)
+            seen += titles(page)
+            if not page.has_next:
+                break
+            page = paginate_posts(db.select(Post), per_page=5, after=page.next_cursor)
+        assert seen == expected
+        assert not pages[0].has_prev and pages[-1].has_prev
+
+        # Von der letzten Seite zurück zur vorletzten
+        back = paginate_posts(db.select(Post), per_page=5, before=pages[-1].prev_cursor)
+        assert titles(back) == titles(pages[-2])
+
+
+# Test 2: Ungültige Cursor führen zur ersten Seite statt zu einem Fehler
+def test_invalid_cursor_falls_back_to_first_page(app):
+    with app.app_context():
+        assert decode_cursor('kaputt!!') is None
+        first = paginate_posts(db.select(Post), per_page=5)
+        assert titles(paginate_posts(db.select(Post), per_page=5, after='kaputt!!')) == titles(first)
+
+
+# Test 3: Cursor kodieren (created_at, id) verlustfrei
+def test_cursor_roundtrip(app):
+    with app.app_context():
+        post = db.session.scalars(db.select(Post).limit(1)).first()
+        assert decode_cursor(encode_cursor(post)) == (post.created_at, post.id)
+
+
+# Test 4: Die Startseite verlinkt die nächste Seite per Cursor
+def test_index_links_next_page(client):
+    response = client.get('/')
+    match = re.search(rb'href="/home\?after=([\w-]+)"', response.data)
+    assert match
+    older = client.get('/?after=' + match.group(1).decode())
+    assert older.status_code == 200
+    assert b'Neuere Beitr' in older.data
+
+
+# Test 5: Das Dashboard zeigt die Gesamtzahl und nur ein Lösch-Modal
+def test_dashboard_single_modal(client, app):
+    client.post('/login', data=dict(
+        email='test_admin@blog.de',
+        password='Sicher123!',
+        remember_me='False'
+    ), follow_redirects=True)
+    response = client.get('/admin/dashboard')
+    with app.app_context():
+        total = db.session.scalar(db.select(db.func.count(Post.id)))
+    assert f'{total} Beiträge insgesamt'.encode() in response.data
+    assert response.data.count(b'class="modal fade"') == 1
@@ -0,0 +1,151 @@
+# ==============================================================================
+# tests/passwords_test.py
+# ==============================================================================
+
+import os
+import threading
+import pytest
+from werkzeug.security import generate_password_hash
+from app import create_app, db
+from app.models import User
+from app.passwords import (BoundedExecutor, HashingOverloaded, RateLimiter, hash_password,
+                           needs_rehash, verify_password)
+from tests.conftest import TestConfig
+
+
+def login(client, email, password):
+    return client.post('/login', data=dict(
+        email=email,
+        password=password,
+        remember_me='False'
+    ))
+
+
+# Test 1: Ein veralteter Hash wird beim erfolgreichen Login auf die Config-Einstellung umgestellt
+def test_outdated_hash_is_upgraded_on_login(client, app):
+    with app.app_context():
+        user = User(email='altbestand@blog.de', is_admin=False,
+                    password_hash=generate_password_hash('Alt123!', method='pbkdf2:sha256:1000'))
+        db.session.add(user)
+        db.session.commit()
+
+    response = login(client, 'altbestand@blog.de', 'Alt123!')
+    assert response.status_code == 302
+
+    with app.app_context():
+        user = User.query.filter_by(email='altbestand@blog.de').first()
+        assert user.password_hash.startswith(app.config['PASSWORD_HASH_METHOD'] + '$')
+        assert not needs_rehash(user.password_hash)
+        assert user.check_password('Alt123!')
+
+
+# Test 2: Argon2 als Verfahren, Kostenänderungen lösen ein Rehash aus
+def test_argon2_method(app, monkeypatch):
+    pytest.importorskip('argon2')
+    monkeypatch.setitem(app.config, 'PASSWORD_HASH_METHOD', 'argon2')
+    monkeypatch.setitem(app.config, 'ARGON2_MEMORY_COST', 1024)
+    with app.app_context():
+        hashed = hash_password('Geheim1!')
+        assert hashed.startswith('$argon2id$')
+        assert verify_password(hashed, 'Geheim1!') and not verify_password(hashed, 'falsch')
+        assert not needs_rehash(hashed)
+        assert needs_rehash(generate_password_hash('Geheim1!', method='scrypt'))
+
+        monkeypatch.setitem(app.config, 'ARGON2_TIME_COST', 4)
+        assert needs_rehash(hashed)
+
+
+# Test 3: Zu viele Login-Versuche von einer IP werden ohne Hash-Prüfung abgewiesen
+def test_login_rate_limit(client, app, monkeypatch):
+    monkeypatch.setitem(app.extensions, 'login_limiter', RateLimiter(2, 60))
+    for _ in range(2):
+        assert login(client, 'test_admin@blog.de', 'Falsch!').status_code == 200
+    response = login(client, 'test_admin@blog.de', 'Sicher123!')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+    assert 'Zu viele Anmeldeversuche'.encode() in response.data
+
+
+# Test 4: Der Hash-Executor weist bei vollem Puffer sofort ab, der Login antwortet mit 503
+def test_bounded_executor_rejects_when_full(client, app, monkeypatch):
+    executor = BoundedExecutor(workers=1, queue_size=0)
+    release = threading.Event()
+    try:
+        executor.submit(release.wait)
+        with pytest.raises(HashingOverloaded):
+            executor.submit(release.wait)
+
+        monkeypatch.setitem(app.extensions, 'password_executor', executor)
+        response = login(client, 'test_admin@blog.de', 'Sicher123!')
+        assert response.status_code == 503
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+# Test 5: Hinter einem Reverse-Proxy zählt das Limit je Client aus X-Forwarded-For
+def test_login_rate_limit_behind_proxy(tmp_path):
+    class ProxyConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tmp_path, 'proxy.db')
+        TRUSTED_PROXY_HOPS = 1
+        LOGIN_RATE_LIMIT = 2
+
+    app = create_app(ProxyConfig)
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+
+    def attempt(ip):
+        return client.post('/login', data=dict(email='niemand@blog.de', password='Falsch!'),
+                           headers={'X-Forwarded-For': ip})
+
+    assert [attempt('203.0.113.1').status_code for _ in range(3)] == [200, 200, 429]
+    assert attempt('203.0.113.2').status_code == 200
+
+
+# Test 6: Ist der Hash-Executor beim Rehash ausgelastet, klappt der Login trotzdem, der Hash bleibt bis zum nächsten Mal
+def test_rehash_skipped_when_overloaded(client, app, monkeypatch):
+    old_hash = generate_password_hash('Alt123!', method='pbkdf2:sha256:1000')
+    with app.app_context():
+        db.session.add(User(email='ueberlast@blog.de', is_admin=False, password_hash=old_hash))
+        db.session.commit()
+
+    def overloaded(password):
+        raise HashingOverloaded()
+
+    monkeypatch.setattr('app.blueprints.main.routes.hash_password_bounded', overloaded)
+    assert login(client, 'ueberlast@blog.de', 'Alt123!').status_code == 302
+    with app.app_context():
+        assert User.query.filter_by(email='ueberlast@blog.de').first().password_hash == old_hash
+
+
+# Test 7: Gleichzeitige erste Logins legen nur einen Hash-Executor an
+def test_executor_created_once(app, monkeypatch):
+    from app import passwords
+
+    created = []
+    original = passwords.BoundedExecutor
+
+    class SlowExecutor(original):
+        def __init__(self, *args):
+            created.append(self)
+            threading.Event().wait(0.05)  # Zeitfenster für den zweiten Thread
+            super().__init__(*args)
+
+    monkeypatch.setattr(passwords, 'BoundedExecutor', SlowExecutor)
+    monkeypatch.delitem(app.extensions, 'password_executor', raising=False)
+    executors = []
+
+    def first_login():
+        with app.app_context():
+            executors.append(passwords._get_executor())
+
+    threads = [threading.Thread(target=first_login) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    try:
+        assert len(created) == 1 and all(executor is created[0] for executor in executors)
+    finally:
+        created[0].shutdown()
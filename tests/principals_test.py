@@ -0,0 +1,95 @@
+# ==============================================================================
+# tests/principals_test.py
+# ==============================================================================
+
+from flask import g
+from sqlalchemy import event
+from app import db
+from app.models import User
+from app.principals import Principal, get_principal_cache
+
+
+def login(client, email='test_admin@blog.de', password='Sicher123!'):
+    client.post('/login', data=dict(
+        email=email,
+        password=password,
+        remember_me='False'
+    ), follow_redirects=True)
+
+
+def get(client, app, url):
+    # Eigener App-Kontext pro Request (wie im Betrieb), sonst teilen sich alle Requests eines Tests g
+    with app.app_context():
+        return client.get(url)
+
+
+def count_user_queries(app, func):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM user' in statement:
+            statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        func()
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+    return len(statements)
+
+
+# Test 1: Angemeldete Seitenaufrufe laden den User aus dem Cache, ohne DB-Abfrage
+def test_authenticated_views_need_no_user_query(client, app):
+    login(client)
+    get(client, app, '/about')  # Cache füllen
+    assert count_user_queries(app, lambda: get(client, app, '/about')) == 0
+    assert count_user_queries(app, lambda: get(client, app, '/admin/dashboard')) == 0
+
+    with app.app_context():
+        user_id = User.query.filter_by(email='test_admin@blog.de').first().id
+        principal = get_principal_cache().get(user_id)
+    assert isinstance(principal, Principal) and principal.is_admin
+
+
+# Test 2: Rollenänderung wirkt sofort, obwohl der User zwischengespeichert ist
+def test_role_change_invalidates_cache(client, app):
+    login(client, 'normal_user@blog.de', 'Standard456!')
+    get(client, app, '/about')
+    with app.app_context():
+        user = User.query.filter_by(email='normal_user@blog.de').first()
+        assert get_principal_cache().get(user.id) is not None
+        user.is_admin = True
+        db.session.commit()
+        assert get_principal_cache().get(user.id) is None
+
+    try:
+        assert get(client, app, '/admin/dashboard').status_code == 200
+    finally:
+        with app.app_context():
+            User.query.filter_by(email='normal_user@blog.de').first().is_admin = False
+            db.session.commit()
+
+
+# Test 3: Ohne Cookies wird Flask-Login übersprungen, mit Session-Cookie nicht
+def test_anonymous_fast_path(app):
+    with app.app_context(), app.test_request_context('/'):
+        app.preprocess_request()
+        assert g._login_user.is_anonymous
+
+    with app.app_context(), app.test_request_context('/', headers={'Cookie': 'session=abc'}):
+        app.preprocess_request()
+        assert '_login_user' not in g
+
+
+# Test 4: Die Invalidierungs-Hooks hängen an db.session, nicht an der prozessweiten Session-Klasse
+def test_hooks_bound_to_db_session():
+    from sqlalchemy.orm import Session
+    from app import principals
+
+    for name, hook in (('after_flush', principals._collect_changed_users),
+                       ('after_commit', principals._invalidate_changed_users),
+                       ('after_rollback', principals._discard_changed_users)):
+        assert event.contains(db.session, name, hook)
+        assert not event.contains(Session, name, hook)
@@ -0,0 +1,60 @@
+# ==============================================================================
+# tests/profiler_test.py
+# ==============================================================================
+
+import logging
+import pytest
+from sqlalchemy.orm import lazyload
+from app import db
+from app.models import Post, User
+from app.profiler import NPlusOneError, assert_max_queries, capture_queries, profiled
+
+
+# Test 1: Der Autor kommt per JOIN mit dem Beitrag, ohne Abfrage pro Zeile
+def test_post_author_is_joined(app):
+    with app.app_context():
+        admin_id = db.session.scalar(db.select(User.id).where(User.email == 'test_admin@blog.de'))
+        db.session.add_all(Post(title=f'Autor {i}', content='x', user_id=admin_id) for i in range(3))
+        db.session.commit()
+        db.session.expunge_all()
+
+        with assert_max_queries(1):
+            authors = {post.author.email for post in db.session.scalars(db.select(Post))}
+        assert 'test_admin@blog.de' in authors
+
+        # Ohne JOIN: eine weitere Abfrage für den Autor
+        db.session.expunge_all()
+        with capture_queries() as log:
+            post = db.session.scalars(db.select(Post).options(lazyload(Post.author)).limit(1)).one()
+            assert post.author.email == 'test_admin@blog.de'
+        assert len(log) == 2
+
+
+# Test 2: Wiederholte Abfragen gelten als N+1-Verdacht, assert_max_queries listet alle Abfragen auf
+def test_repeated_queries_are_reported(app):
+    with app.app_context():
+        post_ids = db.session.scalars(db.select(Post.id)).all()
+        assert len(post_ids) >= 3
+        with pytest.raises(NPlusOneError, match='wiederholt'):
+            with profiled('Titel einzeln'):
+                for post_id in post_ids:
+                    db.session.scalar(db.select(Post.title).where(Post.id == post_id))
+
+        with pytest.raises(AssertionError, match='3 Abfragen statt höchstens 2'):
+            with assert_max_queries(2):
+                for post_id in post_ids[:3]:
+                    db.session.scalar(db.select(Post.title).where(Post.id == post_id))
+
+
+# Test 3: Langsame Abfragen eines Requests werden mit Ausführungsplan protokolliert
+def test_slow_query_explain(client, app, caplog):
+    app.config['QUERY_PROFILER_SLOW_MS'] = 0
+    try:
+        with app.app_context(), caplog.at_level(logging.WARNING, logger=app.logger.name):
+            client.get('/post/1')
+    finally:
+        app.config['QUERY_PROFILER_SLOW_MS'] = 100
+    messages = [record.getMessage() for record in caplog.records if 'langsame Abfrage' in record.getMessage()]
+    assert messages and messages[0].startswith('GET /post/1:')
+    # SQLite: 'SEARCH post USING INTEGER PRIMARY KEY (rowid=?)'
+    assert any('USING INTEGER PRIMARY KEY' in message for message in messages)
@@ -0,0 +1,54 @@
+# ==============================================================================
+# tests/queries_test.py
+# ==============================================================================
+
+import pytest
+from sqlalchemy import inspect
+from app import db
+from app.models import Post
+from app.queries import PostCard, PostRow, post_cards, post_rows, get_post_or_404
+
+
+@pytest.fixture(scope='module', autouse=True)
+def listed_posts(app):
+    with app.app_context():
+        for i in range(3):
+            db.session.add(Post(title=f'Liste {i}', content='Langer Inhalt ' * 500))
+        db.session.commit()
+
+
+# Test 1: Listen liefern schreibgeschützte DTOs statt ORM-Objekten
+def test_listing_returns_read_only_dtos(app):
+    with app.app_context():
+        cards = post_cards(per_page=2)
+        assert cards.items and all(type(card) is PostCard for card in cards.items)
+        assert cards.has_next and cards.next_cursor
+        with pytest.raises(AttributeError):
+            cards.items[0].title = 'geändert'
+
+        rows = post_rows(per_page=50)
+        assert all(type(row) is PostRow for row in rows.items)
+        assert rows.total == len(rows.items)
+        # Keine Beiträge in der Session, es wurde nichts hydriert
+        assert not any(isinstance(obj, Post) for obj in db.session.identity_map.values())
+
+
+# Test 2: Blättern mit DTO-Cursor liefert dieselbe Reihenfolge wie mit ORM-Objekten
+def test_dto_cursor_paging(app):
+    with app.app_context():
+        first = post_cards(per_page=2)
+        second = post_cards(per_page=2, after=first.next_cursor)
+        back = post_cards(per_page=2, before=second.prev_cursor)
+        assert [card.id for card in back.items] == [card.id for card in first.items]
+
+
+# Test 3: Der Text wird verzögert geladen, die Detailansicht holt ihn in derselben Abfrage
+def test_body_is_deferred_but_undeferred_for_detail(app):
+    with app.app_context():
+        post_id = db.session.scalar(db.select(Post.id).limit(1))
+        lazy = db.session.scalars(db.select(Post).where(Post.id == post_id)).one()
+        assert {'content', 'content_html'} <= inspect(lazy).unloaded
+        db.session.expunge_all()
+
+        full = get_post_or_404(post_id)
+        assert not {'content', 'content_html'} & inspect(full).unloaded
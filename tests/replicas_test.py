@@ -0,0 +1,126 @@
+# ==============================================================================
+# tests/replicas_test.py
+# ==============================================================================
+
+import os
+from app import create_app, db
+from app.content import derived_fields
+from app.models import Post, User
+from app.passwords import hash_password
+from app.replicas import STICKY_KEY
+from app.search import ensure_search_schema
+from sqlalchemy.exc import OperationalError
+from tests.conftest import TestConfig
+
+
+def make_app(tmp_path, replica_urls, caches=True):
+    """App mit Primary und Replikaten als getrennte SQLite-Dateien; der Titel verrät die Quelle.
+
+    caches=False schaltet Seiten- und Fragment-Cache ab, damit jeder Request die Datenbank liest.
+    """
+    class ReplicaConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tmp_path, 'primary.db')
+        DB_REPLICA_URLS = replica_urls
+        PAGE_CACHE_TYPE = TestConfig.PAGE_CACHE_TYPE if caches else 'null'
+        PAGE_CACHE_DIR = os.path.join(tmp_path, 'page_cache')
+        FRAGMENT_CACHE_TYPE = TestConfig.FRAGMENT_CACHE_TYPE if caches else 'null'
+        FRAGMENT_CACHE_DIR = os.path.join(tmp_path, 'fragment_cache')
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        password_hash = hash_password('Sicher123!')
+        for name, engine in db.engines.items():
+            try:
+                db.metadata.create_all(engine)
+            except OperationalError:
+                continue  # Absichtlich unerreichbares Replikat
+            with engine.begin() as conn:
+                conn.execute(db.insert(User), {'email': 'test_admin@blog.de', 'password_hash': password_hash,
+                                               'is_admin': True})
+                conn.execute(db.insert(Post), {'id': 1, 'title': f'Quelle {name or "primary"}', 'content': 'x',
+                                               **derived_fields('x')})
+        ensure_search_schema()
+    return app
+
+
+def replica_url(tmp_path, name):
+    return 'sqlite:///' + os.path.join(tmp_path, f'{name}.db')
+
+
+def login(client, app):
+    with app.app_context():
+        client.post('/login', data=dict(email='test_admin@blog.de', password='Sicher123!'))
+
+
+def source(client, app, url='/post/1'):
+    """Aus welcher Datenbank die Seite gelesen wurde (steht im Titel des Beitrags)."""
+    with app.app_context():
+        page = client.get(url).get_data(as_text=True)
+    return next(name for name in ('replica_0', 'replica_1', 'primary') if f'Quelle {name}' in page)
+
+
+# Test 1: Öffentliche GET-Requests lesen reihum von den Replikaten, das Admin-Dashboard vom Primary
+def test_public_reads_use_replicas(tmp_path):
+    app = make_app(tmp_path, [replica_url(tmp_path, 'r0'), replica_url(tmp_path, 'r1')], caches=False)
+    client = app.test_client()
+    assert {source(client, app) for _ in range(4)} == {'replica_0', 'replica_1'}
+    # Reverse-Proxy/CDN behalten Seiten vom Replikat nur kurz
+    with app.app_context():
+        assert client.get('/post/1').cache_control.s_maxage == app.config['DB_REPLICA_STICKY_SECONDS']
+
+    login(client, app)
+    assert source(client, app, '/admin/dashboard') == 'primary'
+
+
+# Test 2: Nach einem Schreibzugriff liest die Sitzung vom Primary (read-your-writes)
+def test_writes_stick_to_primary(tmp_path):
+    app = make_app(tmp_path, [replica_url(tmp_path, 'r0')], caches=False)
+    client = app.test_client()
+    login(client, app)
+    assert source(client, app) == 'replica_0'
+
+    with app.app_context():
+        client.post('/admin/post/1/update', data={'title': 'Quelle primary', 'content': 'x'})
+    assert source(client, app) == 'primary'
+
+    # Nach Ablauf der Frist wieder vom Replikat
+    with client.session_transaction() as session:
+        session[STICKY_KEY] = 0
+    assert source(client, app) == 'replica_0'
+
+
+# Test 3: Unerreichbare Replikate werden übersprungen, ohne gesundes Replikat liest der Primary
+def test_unhealthy_replica_falls_back(tmp_path):
+    missing = 'sqlite:///' + os.path.join(tmp_path, 'fehlt', 'r.db')
+    app = make_app(tmp_path, [missing, replica_url(tmp_path, 'r1')], caches=False)
+    client = app.test_client()
+    assert {source(client, app) for _ in range(3)} == {'replica_1'}
+
+    os.makedirs(tmp_path / 'solo')
+    app = make_app(tmp_path / 'solo', [missing], caches=False)
+    client = app.test_client()
+    assert source(client, app) == 'primary'
+    assert app.extensions['replicas'].status()['replica_0']['healthy'] is False
+
+
+# Test 4: Mit Seiten-Cache landen keine veralteten Seiten vom Replikat im Cache (schreiben, lesen, Replikat holt auf)
+def test_page_cache_stores_primary_state(tmp_path):
+    app = make_app(tmp_path, [replica_url(tmp_path, 'r0')])
+    admin, reader = app.test_client(), app.test_client()
+    login(admin, app)
+    with app.app_context():
+        admin.post('/admin/post/1/update', data={'title': 'Quelle neu', 'content': 'x'})
+
+    # Das Replikat hinkt nach und hat noch den alten Titel; ausgeliefert und gespeichert wird der neue
+    for client in (reader, reader, admin):
+        with app.app_context():
+            assert 'Quelle neu' in client.get('/post/1').get_data(as_text=True)
+
+    with app.app_context():
+        with db.engines['replica_0'].begin() as conn:
+            conn.execute(db.update(Post).where(Post.id == 1).values(title='Quelle neu'))
+    for client in (reader, admin):
+        with client.session_transaction() as session:
+            session.pop(STICKY_KEY, None)
+        with app.app_context():
+            assert 'Quelle neu' in client.get('/post/1').get_data(as_text=True)
@@ -0,0 +1,92 @@
+# ==============================================================================
+# tests/schema_test.py
+# ==============================================================================
+
+import sqlite3
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from app import create_app, db
+from app.models import Post, User
+from app.schema import upgrade_database, is_unversioned, include_in_migrations, seed_command
+from flask_migrate import upgrade as migrate_upgrade
+from conftest import TestConfig
+
+
+def make_app(tmp_path):
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "schema.db"}'
+    return create_app(FileConfig)
+
+
+# Test 1: create_app baut keine Datenbankverbindung auf und legt nichts an
+def test_create_app_has_no_database_side_effects(tmp_path):
+    app = make_app(tmp_path)
+    assert 'connect' not in app.extensions['db_stats'].snapshot()['pool_events']
+    assert not (tmp_path / 'schema.db').exists()
+
+
+# Test 2: Die Migrationen erzeugen genau das Schema der Modelle (plus Suchindex)
+def test_migrations_match_models(tmp_path):
+    app = make_app(tmp_path)
+    with app.app_context():
+        upgrade_database()
+        with db.engine.connect() as conn:
+            context = MigrationContext.configure(conn, opts={'include_name': include_in_migrations})
+            diff = compare_metadata(context, db.metadata)
+            assert diff == []
+            assert MigrationContext.configure(conn).get_current_revision() == '0003'
+        assert db.inspect(db.engine).has_table('post_fts')
+        # Ein zweiter Lauf ist ein No-op
+        assert upgrade_database() == []
+
+
+# Test 3: Eine mit db.create_all() angelegte Altdatenbank wird angeglichen und versioniert
+def test_unversioned_database_is_stamped(tmp_path):
+    conn = sqlite3.connect(tmp_path / 'schema.db')
+    conn.execute('CREATE TABLE post (id INTEGER PRIMARY KEY, user_id INTEGER, title VARCHAR(100) NOT NULL, '
+                 'content TEXT NOT NULL, image_file VARCHAR(120), created_at DATETIME)')
+    conn.commit()
+    conn.close()
+
+    app = make_app(tmp_path)
+    with app.app_context():
+        assert is_unversioned()
+        added = upgrade_database()
+        assert 'post.updated_at' in added
+        assert not is_unversioned()
+        with db.engine.connect() as conn:
+            assert MigrationContext.configure(conn).get_current_revision() == '0003'
+
+
+# Test 4: 'flask schema seed' legt Admin und Beispielbeitrag genau einmal an
+def test_seed_command(tmp_path):
+    app = make_app(tmp_path)
+    with app.app_context():
+        upgrade_database()
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(seed_command, ['--admin-password', 'Sicher123!'])
+    assert 'Standard-Admin-Benutzer hinzugefügt' in result.output
+    result = runner.invoke(seed_command, ['--admin-password', 'Sicher123!'])
+    assert 'bereits vorhanden' in result.output
+
+    with app.app_context():
+        assert User.query.filter_by(is_admin=True).count() == 1
+        post = Post.query.one()
+        assert post.user_id == User.query.filter_by(is_admin=True).one().id
+
+
+# Test 5: 'flask posts backfill' auf einer Datenbank mit Revision 0001 läuft über die Migrationen
+def test_backfill_on_old_revision_keeps_migrations_working(tmp_path):
+    app = make_app(tmp_path)
+    with app.app_context():
+        migrate_upgrade(revision='0001')
+    result = app.test_cli_runner().invoke(args=['posts', 'backfill'])
+    assert result.exit_code == 0, result.output
+
+    with app.app_context():
+        assert upgrade_database() == []
+        with db.engine.connect() as conn:
+            assert MigrationContext.configure(conn).get_current_revision() == '0003'
+            assert compare_metadata(MigrationContext.configure(
+                conn, opts={'include_name': include_in_migrations}), db.metadata) == []
@@ -0,0 +1,84 @@
+# ==============================================================================
+# tests/search_test.py
+# ==============================================================================
+
+import pytest
+from app import db
+from app.models import Post
+from app.search import SQLiteFTSBackend, InvertedIndexBackend, highlight, get_search_backend
+
+
+@pytest.fixture(scope='module', autouse=True)
+def searchable_posts(app):
+    with app.app_context():
+        db.session.add_all([
+            Post(title='Ballast-System getestet', content='Das variable Ballast-System (VBS) hält die Tiefe stabil.'),
+            Post(title='Druckkörper dicht', content='Vakuumtest bestanden, der Druckkörper bleibt dicht.'),
+            Post(title='Software-Update', content='Neue Regelung für den Ballast und die Schwerpunktverlagerung.'),
+        ])
+        db.session.commit()
+        # Direkt in die DB geschriebene Beiträge einmalig indizieren
+        get_search_backend().reindex()
+
+
+def login(client):
+    client.post('/login', data=dict(
+        email='test_admin@blog.de',
+        password='Sicher123!',
+        remember_me='False'
+    ), follow_redirects=True)
+
+
+# Test 1: Beide Backends finden dieselben Beiträge, Titeltreffer stehen vorne
+@pytest.mark.parametrize('backend_class', [SQLiteFTSBackend, InvertedIndexBackend])
+def test_backends_rank_title_matches_first(app, backend_class):
+    with app.app_context():
+        backend = backend_class()
+        backend.ensure_schema()
+        backend.reindex()
+        hits = backend.search('ballast', limit=10)
+        assert [hit.title.striptags() for hit in hits] == ['Ballast-System getestet', 'Software-Update']
+        assert '<mark>Ballast</mark>' in str(hits[0].title)
+
+
+# Test 2: Präfixsuche und UND-Verknüpfung mehrerer Begriffe
+@pytest.mark.parametrize('backend_class', [SQLiteFTSBackend, InvertedIndexBackend])
+def test_backends_prefix_and_conjunction(app, backend_class):
+    with app.app_context():
+        backend = backend_class()
+        backend.ensure_schema()
+        backend.reindex()
+        assert [hit.title.striptags() for hit in backend.search('druckk', 10)] == ['Druckkörper dicht']
+        assert [hit.title.striptags() for hit in backend.search('ballast schwerpunkt', 10)] == ['Software-Update']
+        # FTS-Syntax aus der Eingabe wird neutralisiert statt einen Fehler auszulösen
+        assert len(backend.search('ballast" (*', 10)) == 2
+
+
+# Test 3: Hervorhebung escaped HTML aus dem Inhalt
+def test_highlight_escapes_html():
+    marked = highlight('<script>alert(1)</script> Ballast', ['ballast'])
+    assert '<script>' not in str(marked)
+    assert '<mark>Ballast</mark>' in str(marked)
+
+
+# Test 4: Admin-Änderungen werden inkrementell in den Index übernommen
+def test_admin_crud_keeps_index_in_sync(client, app):
+    login(client)
+    client.post('/admin/post/new', data=dict(
+        title='Tauchgang im See',
+        content='Der Gleiter erreicht zwölf Meter Tiefe.',
+        submit='Speichern'
+    ), follow_redirects=True)
+    assert 'Tauchgang im See'.encode() in client.get('/search?q=zwölf').data.replace(b'<mark>', b'').replace(b'</mark>', b'')
+
+    with app.app_context():
+        post_id = Post.query.filter_by(title='Tauchgang im See').first().id
+    client.post(f'/admin/post/{post_id}/delete', follow_redirects=True)
+    assert b'Keine Beitr' in client.get('/search?q=zwölf').data
+
+
+# Test 5: Leere Suche zeigt nur den Hinweis
+def test_empty_search(client):
+    response = client.get('/search?q=')
+    assert response.status_code == 200
+    assert b'Gib oben einen Suchbegriff ein' in response.data
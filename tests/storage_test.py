@@ -0,0 +1,131 @@
+# ==============================================================================
+# tests/storage_test.py
+# ==============================================================================
+
+import hashlib
+import io
+import os
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+from app import db
+from app.models import Post, Upload
+from app.storage import S3Storage, store, get_storage
+
+
+def jpeg_bytes(color='teal'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (800, 600), color).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+def login(client):
+    client.post('/login', data=dict(
+        email='test_admin@blog.de',
+        password='Sicher123!',
+        remember_me='False'
+    ), follow_redirects=True)
+
+
+def create_post(client, title, data):
+    client.post('/admin/post/new', data=dict(
+        title=title,
+        content='Beitrag mit Foto.',
+        image=FileStorage(io.BytesIO(data), filename='foto.JPG', content_type='image/jpeg'),
+        submit='Speichern'
+    ), follow_redirects=True)
+
+
+# Test 1: Dasselbe Foto zweimal hochgeladen liegt nur einmal im Speicher
+def test_identical_uploads_are_deduplicated(client, app):
+    login(client)
+    data = jpeg_bytes()
+    create_post(client, 'Foto A', data)
+    create_post(client, 'Foto B', data)
+
+    key = hashlib.sha256(data).hexdigest() + '.jpg'
+    with app.app_context():
+        posts = Post.query.filter(Post.title.in_(['Foto A', 'Foto B'])).all()
+        assert [post.image_file for post in posts] == [key, key]
+        assert db.session.get(Upload, key).refcount == 2
+    assert os.path.isfile(os.path.join(app.config['UPLOAD_FOLDER'], key))
+
+
+# Test 2: Die Datei verschwindet erst mit dem letzten Beitrag, der sie verwendet
+def test_file_deleted_with_last_reference(client, app):
+    login(client)
+    data = jpeg_bytes('olive')
+    create_post(client, 'Geteilt 1', data)
+    create_post(client, 'Geteilt 2', data)
+    key = hashlib.sha256(data).hexdigest() + '.jpg'
+    path = os.path.join(app.config['UPLOAD_FOLDER'], key)
+    with app.app_context():
+        ids = [post.id for post in Post.query.filter(Post.title.like('Geteilt %')).order_by(Post.id)]
+        assert get_storage().exists('resized/' + key.replace('.jpg', '_thumb.webp'))
+
+    client.post(f'/admin/post/{ids[0]}/delete', follow_redirects=True)
+    assert os.path.isfile(path)
+    client.post(f'/admin/post/{ids[1]}/delete', follow_redirects=True)
+    assert not os.path.exists(path)
+    with app.app_context():
+        assert db.session.get(Upload, key) is None
+        assert not get_storage().exists('resized/' + key.replace('.jpg', '_thumb.webp'))
+
+
+# Test 3: 'flask storage gc' entfernt unbenutzte Uploads, --dry-run nur als Liste
+def test_gc_command_removes_orphans(app):
+    with app.test_request_context():
+        key = store(io.BytesIO(b'nie verwendet'), '.gif')
+        db.session.commit()
+    path = os.path.join(app.config['UPLOAD_FOLDER'], key)
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['storage', 'gc', '--grace', '0', '--dry-run'])
+    assert f'Würde löschen: {key}' in result.output
+    assert os.path.isfile(path)
+
+    result = runner.invoke(args=['storage', 'gc', '--grace', '0'])
+    assert result.exit_code == 0, result.output
+    assert not os.path.exists(path)
+
+
+# Test 4: Uploads werden aus UPLOAD_FOLDER mit langer Cache-Dauer ausgeliefert
+def test_uploads_route(client, app):
+    with app.test_request_context():
+        key = store(io.BytesIO(jpeg_bytes('maroon')), '.jpg')
+        db.session.commit()
+    response = client.get(f'/uploads/{key}')
+    assert response.status_code == 200
+    assert response.cache_control.max_age == 365 * 24 * 3600
+    assert client.get('/uploads/../config.py').status_code == 404
+
+
+# Test 5: S3-Backend gegen einen lokalen S3-kompatiblen Server (moto)
+def test_s3_backend_against_local_server(app, monkeypatch, tmp_path):
+    pytest.importorskip('boto3')
+    moto_server = pytest.importorskip('moto.server')
+    for name in ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY'):
+        monkeypatch.setenv(name, 'testing')
+
+    server = moto_server.ThreadedMotoServer(ip_address='127.0.0.1', port=0)
+    server.start()
+    try:
+        host, port = server.get_host_and_port()
+        backend = S3Storage('uploads', prefix='blog/', endpoint_url=f'http://{host}:{port}', region='us-east-1')
+        backend.client.create_bucket(Bucket='uploads')
+        monkeypatch.setitem(app.extensions, 'storage', backend)
+
+        data = jpeg_bytes('purple')
+        with app.test_request_context():
+            key = store(io.BytesIO(data), '.jpg')
+            assert store(io.BytesIO(data), '.jpg') == key
+            db.session.commit()
+
+        assert [k for k, _ in backend.keys()] == [key]
+        with backend.local_copy(key) as path:
+            with open(path, 'rb') as f:
+                assert f.read() == data
+        backend.delete(key)
+        assert not backend.exists(key)
+    finally:
+        server.stop()
@@ -0,0 +1,139 @@
+# ==============================================================================
+# tests/tasks_test.py
+# ==============================================================================
+
+import io
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+from app import db
+from app.images import DERIVATIVE_SIZES, derivative_name
+from app.models import Job, Post
+from app.tasks import task, enqueue, run_job, run_worker, due_job_ids, TASKS
+
+# Zählt die Aufrufe der Test-Jobs
+calls = []
+
+
+@task('test_flaky')
+def flaky(fail_times):
+    calls.append(fail_times)
+    if len(calls) <= fail_times:
+        raise RuntimeError('absichtlicher Fehler')
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+    yield
+
+
+# Test 1: Ein Job läuft im sync-Modus sofort und wird als 'done' markiert
+def test_enqueue_runs_job(app):
+    with app.test_request_context():
+        job = enqueue('test_flaky', fail_times=0)
+        assert db.session.get(Job, job.id).status == 'done'
+        assert calls == [0]
+
+
+# Test 2: Fehlgeschlagene Jobs werden mit Backoff erneut eingeplant und später erledigt
+def test_failed_job_is_retried(app):
+    with app.test_request_context():
+        job = enqueue('test_flaky', fail_times=1)
+        job = db.session.get(Job, job.id)
+        assert job.status == 'pending'
+        assert job.attempts == 1
+        assert 'absichtlicher Fehler' in job.last_error
+        # Noch nicht fällig, da run_after in der Zukunft liegt
+        assert job.id not in due_job_ids()
+
+        assert run_job(job.id) is True
+        assert db.session.get(Job, job.id).status == 'done'
+        assert db.session.get(Job, job.id).attempts == 2
+
+
+# Test 3: Nach max_attempts Fehlversuchen bleibt der Job 'failed'
+def test_job_fails_after_max_attempts(app):
+    with app.test_request_context():
+        job = enqueue('test_flaky', fail_times=99)
+        for _ in range(job.max_attempts - 1):
+            run_job(job.id)
+        job = db.session.get(Job, job.id)
+        assert job.status == 'failed'
+        assert job.attempts == job.max_attempts
+        # Ein abgeschlossener Job kann nicht erneut beansprucht werden
+        assert run_job(job.id) is False
+
+
+# Test 4: Unbekannte Job-Typen werden abgelehnt
+def test_enqueue_unknown_kind(app):
+    with app.test_request_context():
+        with pytest.raises(ValueError):
+            enqueue('gibt_es_nicht')
+    assert 'process_image' in TASKS and 'delete_upload' in TASKS
+
+
+# Test 5: Das Löschen eines Beitrags stellt das Löschen der Bilddatei als Job ein
+def test_delete_post_enqueues_file_deletion(client, app):
+    client.post('/login', data=dict(
+        email='test_admin@blog.de',
+        password='Sicher123!',
+        remember_me='False'
+    ), follow_redirects=True)
+
+    with app.app_context():
+        post = Post(title='Mit Bild', content='...', image_file='gibt-es-nicht.jpg')
+        db.session.add(post)
+        db.session.commit()
+        post_id = post.id
+
+    response = client.post(f'/admin/post/{post_id}/delete', follow_redirects=True)
+    assert response.status_code == 200
+
+    with app.app_context():
+        job = Job.query.filter_by(kind='delete_upload').order_by(Job.id.desc()).first()
+        assert job.payload == {'filename': 'gibt-es-nicht.jpg'}
+        assert job.status == 'done'
+
+
+
+# Test 6: Mit externem Worker erscheint das srcset, sobald der Job die Derivate erzeugt hat
+def test_srcset_appears_after_worker(client, app, monkeypatch):
+    monkeypatch.setitem(app.config, 'TASK_QUEUE_MODE', 'external')
+    data = io.BytesIO()
+    Image.new('RGB', (1600, 1200), (30, 120, 60)).save(data, 'JPEG')
+    data.seek(0)
+    with app.app_context():
+        client.post('/login', data=dict(email='test_admin@blog.de', password='Sicher123!'))
+        client.post('/admin/post/new', data=dict(
+            title='Bild für den Worker',
+            content='Inhalt',
+            image=FileStorage(data, filename='gruen.jpg', content_type='image/jpeg'),
+        ))
+        key = db.session.scalar(db.select(Post.image_file).where(Post.title == 'Bild für den Worker'))
+        derivative = derivative_name(key, next(iter(DERIVATIVE_SIZES)), 'webp')
+        # Noch ohne Derivate: nur das Original, und so landet die Startseite im Seiten-Cache
+        assert derivative not in client.get('/').get_data(as_text=True)
+
+    # Auch die vom Job eingestellten Folge-Jobs (Feeds) abarbeiten
+    while True:
+        with app.app_context():
+            if not due_job_ids(limit=1):
+                break
+        run_worker(app, once=True)
+
+    with app.app_context():
+        assert derivative in client.get('/').get_data(as_text=True)
+
+
+# Test 7: Nach einem fork() legt der Kindprozess Threadpool und Poller neu an
+def test_executor_recreated_in_forked_child(app, monkeypatch):
+    from app import tasks
+
+    parent = tasks._get_executor(app)
+    monkeypatch.setattr(tasks, '_pid', -1)
+    monkeypatch.setattr(tasks, '_poller', object())
+    child = tasks._get_executor(app)
+    assert child is not parent and tasks._poller is None
+    assert tasks._get_executor(app) is child
+    parent.shutdown()
@@ -0,0 +1,192 @@
+# ==============================================================================
+# tests/uploads_test.py
+# ==============================================================================
+
+import io
+import threading
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+from app import db
+from app import uploads
+from app.models import Post, Upload
+from app.uploads import InvalidUpload, UploadBusy, UploadSessions, check_image, get_upload_sessions
+
+
+def image_bytes(image_format='JPEG', size=(400, 300)):
+    buffer = io.BytesIO()
+    Image.effect_noise(size, 64).convert('RGB').save(buffer, image_format)
+    return buffer.getvalue()
+
+
+def login(client):
+    client.post('/login', data=dict(
+        email='test_admin@blog.de',
+        password='Sicher123!',
+        remember_me='False'
+    ), follow_redirects=True)
+
+
+def start_upload(client, data, filename='gross.jpg'):
+    response = client.post('/admin/uploads', json={'filename': filename, 'size': len(data)})
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def put_chunk(client, upload_id, offset, chunk):
+    return client.put(f'/admin/uploads/{upload_id}', data=chunk, headers={'Upload-Offset': str(offset)},
+                      content_type='application/octet-stream')
+
+
+# Test 1: Die Magic Bytes müssen zur Dateiendung passen
+def test_check_image_signatures(app):
+    with app.app_context():
+        check_image(image_bytes('JPEG')[:16], '.jpg')
+        check_image(image_bytes('PNG')[:16], '.PNG')
+        with pytest.raises(InvalidUpload):
+            check_image(image_bytes('PNG')[:16], '.jpg')
+        with pytest.raises(InvalidUpload):
+            check_image(b'<?php echo 1; ?>', '.gif')
+        with pytest.raises(InvalidUpload):
+            check_image(image_bytes('JPEG')[:16], '.exe')
+
+
+# Test 2: Eine als .jpg getarnte Textdatei wird im Formular abgewiesen
+def test_form_rejects_fake_image(client, app):
+    login(client)
+    response = client.post('/admin/post/new', data=dict(
+        title='Getarnte Datei',
+        content='Sollte nicht gespeichert werden.',
+        image=FileStorage(io.BytesIO(b'kein Bild, nur Text'), filename='foto.jpg', content_type='image/jpeg'),
+        submit='Speichern'
+    ), follow_redirects=True)
+    assert 'Der Dateiinhalt ist kein gültiges Bild dieses Typs.'.encode() in response.data
+    with app.app_context():
+        assert Post.query.filter_by(title='Getarnte Datei').first() is None
+
+
+# Test 3: Upload in Teilen mit Unterbrechung, danach Beitrag mit dem Schlüssel anlegen
+def test_chunked_upload_resumes_and_creates_post(client, app):
+    login(client)
+    data = image_bytes(size=(600, 400))
+    upload = start_upload(client, data)
+    half = len(data) // 2
+
+    assert put_chunk(client, upload['id'], 0, data[:half]).get_json()['offset'] == half
+    # Ein wiederholter Teil mit veraltetem Offset wird abgewiesen, der Stand bleibt erhalten
+    response = put_chunk(client, upload['id'], 0, data[:half])
+    assert response.status_code == 409 and response.get_json()['offset'] == half
+    assert client.get(f'/admin/uploads/{upload["id"]}').get_json() == {'offset': half, 'size': len(data)}
+
+    result = put_chunk(client, upload['id'], half, data[half:]).get_json()
+    assert result['offset'] == len(data)
+    key = result['key']
+    assert key.endswith('.jpg')
+
+    client.post('/admin/post/new', data=dict(
+        title='Beitrag mit Teil-Upload',
+        content='Bild kam in zwei Teilen.',
+        image_key=key,
+        submit='Speichern'
+    ), follow_redirects=True)
+    with app.app_context():
+        assert Post.query.filter_by(title='Beitrag mit Teil-Upload').one().image_file == key
+        assert db.session.get(Upload, key).refcount == 1
+        assert get_upload_sessions().get(upload['id']) is None
+
+
+# Test 4: Falscher Dateiinhalt im ersten Teil verwirft den Upload sofort
+def test_chunked_upload_rejects_invalid_first_chunk(client, app):
+    login(client)
+    data = b'MZ' + b'\0' * 1000
+    upload = start_upload(client, data, filename='tarnung.png')
+    assert put_chunk(client, upload['id'], 0, data).status_code == 400
+    assert client.get(f'/admin/uploads/{upload["id"]}').status_code == 404
+
+
+# Test 5: MAX_CONTENT_LENGTH und UPLOAD_MAX_SIZE begrenzen Formular und Teil-Uploads
+def test_upload_size_limits(client, app):
+    login(client)
+    data = image_bytes(size=(600, 400))
+    app.config['MAX_CONTENT_LENGTH'] = 1024
+    try:
+        response = client.post('/admin/post/new', data=dict(
+            title='Zu groß',
+            content='x',
+            image=FileStorage(io.BytesIO(data), filename='gross.jpg', content_type='image/jpeg'),
+            submit='Speichern'
+        ), follow_redirects=True)
+        assert 'Die Datei ist zu groß'.encode() in response.data
+
+        upload = start_upload(client, data)
+        assert put_chunk(client, upload['id'], 0, data).status_code == 413
+    finally:
+        app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
+
+    response = client.post('/admin/uploads', json={'filename': 'riesig.jpg', 'size': 10 ** 12})
+    assert response.status_code == 413
+
+
+class TrickleStream:
+    """Request-Body, der bei jedem read() nur wenige Bytes liefert (langsamer Client)."""
+
+    def __init__(self, data, step=3, started=None, release=None):
+        self.data = data
+        self.step = step
+        self.started = started
+        self.release = release
+
+    def read(self, size):
+        if self.started is not None:
+            self.started.set()
+            self.release.wait()
+        chunk, self.data = self.data[:self.step], self.data[self.step:]
+        return chunk
+
+
+# Test 6: Die Magic Bytes werden erst geprüft, wenn genug Bytes da sind, auch über mehrere Teile
+def test_chunked_upload_short_first_chunk(client, app, tmp_path):
+    login(client)
+    data = image_bytes()
+    upload = start_upload(client, data)
+    assert put_chunk(client, upload['id'], 0, data[:5]).get_json()['offset'] == 5
+    assert put_chunk(client, upload['id'], 5, data[5:]).get_json()['key'].endswith('.jpg')
+
+    with app.app_context():
+        sessions = UploadSessions(str(tmp_path))
+        upload_id = sessions.create('klein.png', len(data), owner_id=1)
+        with pytest.raises(InvalidUpload):
+            sessions.append(upload_id, 0, TrickleStream(data), chunk_size=1024)
+        upload_id = sessions.create('klein.jpg', len(data), owner_id=1)
+        assert sessions.append(upload_id, 0, TrickleStream(data), chunk_size=1024) == len(data)
+
+
+# Test 7: Ein zweiter gleichzeitiger Teil für denselben Upload wird abgewiesen statt dazwischenzuschreiben
+def test_concurrent_chunks_are_serialized(app, tmp_path):
+    data = image_bytes()
+    started, release = threading.Event(), threading.Event()
+    results = []
+    with app.app_context():
+        sessions = UploadSessions(str(tmp_path))
+        upload_id = sessions.create('parallel.jpg', len(data), owner_id=1)
+
+    def slow_put():
+        with app.app_context():
+            results.append(sessions.append(upload_id, 0, TrickleStream(data, 1024, started, release), 1024))
+
+    thread = threading.Thread(target=slow_put)
+    thread.start()
+    try:
+        assert started.wait(5)
+        with app.app_context():
+            with pytest.raises(UploadBusy):
+                sessions.append(upload_id, 0, io.BytesIO(data), 1024)
+            # Andere Worker-Prozesse haben eigene Instanzen; dort greift die Dateisperre
+            if uploads.fcntl is not None:
+                with pytest.raises(UploadBusy):
+                    UploadSessions(str(tmp_path)).append(upload_id, 0, io.BytesIO(data), 1024)
+    finally:
+        release.set()
+        thread.join()
+    assert results == [len(data)]
+    assert (tmp_path / f'{upload_id}.part').read_bytes() == data